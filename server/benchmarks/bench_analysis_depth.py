@@ -0,0 +1,46 @@
+"""Output tokens and latency per analysis depth (score, gaps, rewrite) against the local LLM stub.
+
+The stub decodes at STUB_TOKEN_LATENCY_MS per generated token (default 4 ms
+here, roughly a large hosted model), so latency follows output size.
+
+Run from the server directory: python benchmarks/bench_analysis_depth.py
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ai_analyzer import ANALYSIS_DEPTHS, DEPTH_COST, analysis_prompt
+from services.llm_stub import StubClient
+
+RESUME = "\n".join(
+    ["Alex Candidate | alex@example.com", "EXPERIENCE"] +
+    [line for i in range(5) for line in (
+        f"Senior Engineer at Company {i} (20{10 + i} - 20{12 + i})",
+        *(f"- Improved throughput of service {j} by {10 + j}% by redesigning its caching and batching layers"
+          for j in range(4)),
+    )] +
+    ["SKILLS", "Python, Go, Docker, Kubernetes, PostgreSQL, AWS", "EDUCATION", "BSc Computer Science"]
+)
+JD = "Senior backend engineer.\nRequirements:\n- Go\n- Kubernetes\n- PostgreSQL\n- Incident response"
+
+
+def main():
+    client = StubClient(base_latency_ms=300,
+                        token_latency_ms=float(os.getenv("STUB_TOKEN_LATENCY_MS", 4)))
+    baseline = None
+    for depth in reversed(ANALYSIS_DEPTHS):
+        prompt = analysis_prompt(RESUME, "Backend Engineer", JD, "Senior", depth)
+        started = time.perf_counter()
+        completion = client.chat.completions.create(messages=[{"role": "user", "content": prompt}],
+                                                    model="stub", response_format={"type": "json_object"})
+        elapsed = time.perf_counter() - started
+        usage = completion.usage
+        baseline = baseline or elapsed
+        print(f"{depth:>7}: {usage.prompt_tokens:5d} prompt + {usage.completion_tokens:5d} completion tokens, "
+              f"{elapsed * 1000:6.0f} ms ({elapsed / baseline:4.0%} of rewrite), quota cost {DEPTH_COST[depth]}")
+
+
+if __name__ == "__main__":
+    main()
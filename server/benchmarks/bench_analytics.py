@@ -0,0 +1,78 @@
+"""Admin analytics from rollups vs scanning analysis_json, as the table grows.
+
+Run from the server directory: python benchmarks/bench_analytics.py
+"""
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import models
+from database import Base, _json_serializer
+from services.analytics import _record, analytics_summary
+
+ROLES = ["Backend Engineer", "Data Scientist", "Product Manager", "Designer", "DevOps Engineer"]
+SKILLS = [f"skill-{i}" for i in range(400)]
+
+
+def scan_summary(db) -> dict:
+    """What the dashboard would cost without rollups."""
+    histogram, skills, per_day = [0] * 11, Counter(), Counter()
+    for analysis_json, created_at in db.query(models.ResumeAnalysis.analysis_json, models.ResumeAnalysis.created_at):
+        histogram[min(analysis_json["overall_score"], 100) // 10] += 1
+        skills.update(analysis_json["missing_skills"])
+        per_day[created_at.date()] += 1
+    return {"histogram": histogram, "skills": skills.most_common(20), "per_day": per_day}
+
+
+def best_ms(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{directory}/bench.db", json_serializer=_json_serializer)
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        now = datetime.datetime.utcnow()
+        total = 0
+        for target in (1000, 5000, 20000):
+            added, upkeep = target - total, 0.0
+            while total < target:
+                role = rng.choice(ROLES)
+                analysis_json = {
+                    "overall_score": rng.randint(20, 100),
+                    "missing_skills": [SKILLS[min(int(rng.paretovariate(1.2)) - 1, 399)] for _ in range(5)],
+                    "optimized_resume_content": "x" * 2000,
+                }
+                created_at = now - datetime.timedelta(minutes=rng.randint(0, 60 * 24 * 60))
+                db.add(models.ResumeAnalysis(user_id=1, original_text="text", target_role=role,
+                                             analysis_json=analysis_json, created_at=created_at))
+                started = time.perf_counter()
+                _record(db, role, analysis_json, created_at)
+                upkeep += time.perf_counter() - started
+                total += 1
+                if total % 1000 == 0:
+                    db.commit()
+            print(f"{total:6d} analyses: rollups {best_ms(lambda: analytics_summary(db)):6.1f} ms, "
+                  f"scan {best_ms(lambda: scan_summary(db), repeat=1):8.1f} ms, "
+                  f"upkeep {upkeep / added * 1000:.2f} ms per insert")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Latency of the local (no-LLM) ATS keyword scorer.
+
+Run from the server directory: python benchmarks/bench_ats_scorer.py
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ats_scorer import score_resume
+
+SKILLS = ["Python", "Java", "Go", "Docker", "Kubernetes", "AWS", "PostgreSQL", "React", "TypeScript",
+          "Kafka", "Terraform", "GraphQL", "Redis", "Spark", "Airflow", "CI/CD", "REST APIs", "gRPC"]
+VERBS = ["Built", "Led", "Designed", "Migrated", "Automated", "Reduced", "Scaled", "Shipped"]
+
+
+def make_resume(rng: random.Random, bullets: int) -> str:
+    lines = ["Alex Candidate | alex@example.com | +1 555 010 2030", "EXPERIENCE"]
+    for _ in range(bullets):
+        lines.append(f"- {rng.choice(VERBS)} {rng.choice(SKILLS)} services with {rng.choice(SKILLS)}, "
+                     f"improving throughput by {rng.randint(5, 80)}%")
+    lines += ["SKILLS", ", ".join(rng.sample(SKILLS, 8)), "EDUCATION", "BSc Computer Science"]
+    return "\n".join(lines)
+
+
+def make_jd(rng: random.Random) -> str:
+    must = ", ".join(rng.sample(SKILLS, 6))
+    nice = ", ".join(rng.sample(SKILLS, 4))
+    return f"We are hiring a Senior Platform Engineer. Must have {must}. Nice to have: {nice}. " * 3
+
+
+def main(number: int = 200):
+    rng = random.Random(7)
+    jd = make_jd(rng)
+    for bullets in (10, 40, 120):
+        resume = make_resume(rng, bullets)
+        seconds = min(timeit.repeat(lambda: score_resume(resume, "Platform Engineer", jd), number=number, repeat=3))
+        print(f"{bullets:>4} bullets ({len(resume.split()):>5} words): {seconds / number * 1000:6.2f} ms/analysis")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Cold start: import time of main.py and time to first request / readiness.
+
+"lazy" is the current behaviour. "eager" forces the parser and LLM SDK
+imports up front, which is what main.py used to do at import time.
+
+Run from the server directory: python benchmarks/bench_cold_start.py
+"""
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = """
+import time
+started = time.perf_counter()
+import main
+{extra}
+print(time.perf_counter() - started)
+"""
+EAGER = "from services.warmup import warm_up; warm_up()"
+
+
+def run_python(code: str, env: dict) -> str:
+    return subprocess.run(
+        [sys.executable, "-c", code], cwd=SERVER_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+
+def import_time_ms(extra: str, env: dict, runs: int = 5) -> float:
+    samples = [float(run_python(IMPORT_SNIPPET.format(extra=extra), env)) * 1000 for _ in range(runs)]
+    return statistics.median(samples)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(url: str, deadline: float) -> float:
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return time.perf_counter()
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.01)
+    raise TimeoutError(url)
+
+
+def time_to_first_request(env: dict) -> tuple:
+    port = free_port()
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=SERVER_DIR, env=env,
+    )
+    try:
+        base = f"http://127.0.0.1:{port}"
+        first = wait_for(base + "/", started + 30)
+        ready = wait_for(base + "/api/health/ready", started + 30)
+        return (first - started) * 1000, (ready - started) * 1000
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp}/bench.db")
+        print(f"import main (lazy):  {import_time_ms('', env):7.1f} ms")
+        print(f"import main (eager): {import_time_ms(EAGER, env):7.1f} ms")
+        first, ready = time_to_first_request(env)
+        print(f"time to first request: {first:7.1f} ms")
+        print(f"time to ready:         {ready:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
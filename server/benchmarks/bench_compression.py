@@ -0,0 +1,104 @@
+"""Bytes saved by response compression and latency of /api/users/me revalidation.
+
+Run from the server directory: python benchmarks/bench_compression.py
+"""
+import os
+import sys
+import time
+import orjson
+from fastapi import Depends
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app, get_db
+from models import Base, User, ResumeAnalysis
+from auth import get_current_user
+from services.ats_scorer import score_resume
+from services.compression import _Compressor, available_encodings
+from services.section_analysis import render_resume_markdown
+
+SECTIONS = {
+    "contact": {"name": "Alex Candidate", "email": "alex@example.com", "phone": "+1 555 010 2030"},
+    "experience": [
+        {"header": f"Senior Engineer at Company {i} (20{10 + i} - 20{12 + i})",
+         "bullets": [f"Improved throughput of service {j} by {10 + j}% by redesigning its caching and batching"
+                     for j in range(5)]}
+        for i in range(6)
+    ],
+    "skills": ["Python", "Go", "Docker", "Kubernetes", "PostgreSQL", "AWS", "Terraform", "Kafka"],
+    "education": ["BSc Computer Science, State University"],
+}
+
+
+def analysis_body() -> bytes:
+    markdown = render_resume_markdown(SECTIONS, "Backend engineer with ten years of platform experience.", {})
+    text = markdown.replace("#", "").replace("-", "")
+    payload = score_resume(text, "Backend Engineer")
+    payload["optimized_resume_content"] = markdown
+    payload["role_alignment_feedback"] = " ".join(
+        f"The {skill} experience at Company {i} maps directly onto the role's platform requirements."
+        for i in range(6) for skill in SECTIONS["skills"])
+    return orjson.dumps(payload)
+
+
+def timed(fn, seconds: float = 1.0) -> float:
+    """Mean milliseconds per call."""
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        fn()
+        count += 1
+    return (time.perf_counter() - start) / count * 1000
+
+
+def compress(encoding: str, body: bytes) -> bytes:
+    return _Compressor(encoding).finish(body)
+
+
+def bench_users_me(analyses: int):
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Session = sessionmaker(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = Session()
+    db.add(User(id=1, email="bench@example.com"))
+    db.add_all(ResumeAnalysis(user_id=1 + i % 50, original_text="text", analysis_json={}) for i in range(analyses))
+    db.commit()
+    db.close()
+
+    def override_get_db():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = lambda session=Depends(get_db): session.get(User, 1)
+    client = TestClient(app)
+    etag = client.get("/api/users/me").headers["etag"]
+    full = timed(lambda: client.get("/api/users/me"))
+    revalidated = timed(lambda: client.get("/api/users/me", headers={"If-None-Match": etag}))
+    app.dependency_overrides.clear()
+    print(f"/api/users/me with {analyses:>6} rows: 200 {full:6.2f} ms, 304 {revalidated:6.2f} ms")
+
+
+def main():
+    body = analysis_body()
+    print(f"analysis response: {len(body) / 1024:.1f} KiB")
+    for encoding in available_encodings():
+        data = compress(encoding, body)
+        print(f"  {encoding:>4}: {len(data) / 1024:5.1f} KiB ({1 - len(data) / len(body):.0%} saved), "
+              f"{timed(lambda: compress(encoding, body)):.3f} ms to compress")
+    # Time to put the body on a 10 Mbit/s mobile link
+    for label, size in [("identity", len(body))] + [(e, len(compress(e, body))) for e in available_encodings()]:
+        print(f"  {label:>8} transfer at 10 Mbit/s: {size * 8 / 10_000:.2f} ms")
+
+    for analyses in (1_000, 100_000):
+        bench_users_me(analyses)
+
+
+if __name__ == "__main__":
+    main()
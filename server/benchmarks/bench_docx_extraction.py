@@ -0,0 +1,57 @@
+"""Streaming DOCX extraction vs. the python-docx paths on a generated corpus.
+
+Documents range from a one-page resume to a long CV, each with a header,
+a skills table and a footer, so the table also shows how much text the
+paragraph-only extractor drops.
+
+Run from the server directory: python benchmarks/bench_docx_extraction.py
+"""
+import io
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import docx
+
+from services.docx_extractor import extract_docx_streaming
+from services.resume_parser import extract_docx_with_layout, extract_text_from_docx
+
+
+def make_docx(entries: int) -> bytes:
+    document = docx.Document()
+    document.sections[0].header.paragraphs[0].text = "Alex Candidate | alex@example.com | +1 555 010 2030"
+    document.sections[0].footer.paragraphs[0].text = "Page 1"
+    document.add_heading("Experience", level=1)
+    for i in range(entries):
+        document.add_paragraph(f"Engineer at Company {i} (2015 - 2018)").runs[0].bold = True
+        for j in range(4):
+            document.add_paragraph(f"Improved service {j} throughput by {10 + j}% by redesigning caching",
+                                   style="List Bullet")
+    document.add_heading("Skills", level=1)
+    table = document.add_table(rows=4, cols=3)
+    for r, row in enumerate(table.rows):
+        for c, cell in enumerate(row.cells):
+            cell.text = f"Skill {r * 3 + c}"
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def main(number: int = 20):
+    extractors = {
+        "python-docx paragraphs": extract_text_from_docx,
+        "python-docx + layout": lambda data: extract_docx_with_layout(data)[0],
+        "streaming": lambda data: extract_docx_streaming(data)[0],
+    }
+    for entries in (5, 50, 500):
+        data = make_docx(entries)
+        print(f"{entries} entries ({len(data) / 1024:.0f} KiB docx):")
+        for name, extract in extractors.items():
+            seconds = min(timeit.repeat(lambda: extract(data), number=number, repeat=3)) / number
+            print(f"  {name:<24} {seconds * 1000:8.2f} ms  {len(extract(data)):>7} chars")
+
+
+if __name__ == "__main__":
+    main()
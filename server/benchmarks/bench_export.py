@@ -0,0 +1,51 @@
+"""Renders per second of the DOCX/PDF exporter, uncached and cached.
+
+Run from the server directory: python benchmarks/bench_export.py
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.exporter import TEMPLATES, ExportCache, export_key, render, warm_templates
+from services.section_analysis import render_resume_markdown
+
+SECTIONS = {
+    "contact": {"name": "Alex Candidate", "email": "alex@example.com", "phone": "+1 555 010 2030"},
+    "experience": [
+        {"header": f"Senior Engineer at Company {i} (20{10 + i} - 20{12 + i})",
+         "bullets": [f"Improved throughput of service {j} by {10 + j}% by redesigning its caching and batching"
+                     for j in range(4)]}
+        for i in range(5)
+    ],
+    "skills": ["Python", "Go", "Docker", "Kubernetes", "PostgreSQL", "AWS"],
+    "education": ["BSc Computer Science, State University"],
+}
+
+
+def rate(fn, seconds: float = 2.0) -> float:
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        fn()
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    markdown = render_resume_markdown(SECTIONS, "Backend engineer with ten years of platform experience.", {})
+    warm_templates()
+    for fmt in ("pdf", "docx"):
+        for template in TEMPLATES:
+            size = len(render(markdown, template, fmt))
+            print(f"{fmt:>4} {template:<8} ({size / 1024:5.1f} KiB): "
+                  f"{rate(lambda: render(markdown, template, fmt)):8.1f} renders/s")
+
+    cache = ExportCache()
+    key = export_key(1, "classic", "pdf", markdown)
+    cache.put(key, render(markdown, "classic", "pdf"))
+    print(f"cache hit incl. key hash: {rate(lambda: cache.get(export_key(1, 'classic', 'pdf', markdown))):10.0f} /s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Hit rate and prompt tokens saved by the shared job-description cache.
+
+Replays a Zipf-distributed stream of job postings (a few popular postings
+pasted by many users) against an in-memory SQLite table and reports the
+hit rate, prompt tokens saved and preprocessing vs cached lookup latency.
+
+Run from the server directory: python benchmarks/bench_jd_cache.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from models import Base
+from services import jd_preprocessor
+from services.jd_preprocessor import build_profile, get_jd_profile, jd_cache_stats
+
+SKILLS = ["Python", "Java", "Go", "Docker", "Kubernetes", "AWS", "PostgreSQL", "React", "TypeScript",
+          "Kafka", "Terraform", "GraphQL", "Redis", "Spark", "Airflow", "CI/CD", "REST APIs", "gRPC"]
+BOILERPLATE = """About Us
+We are a fast-growing company on a mission to change how the world works. Our team spans four continents.
+
+Benefits
+- Competitive salary range and equity
+- 401(k) with company match
+- Health insurance, dental and vision
+- Unlimited PTO and paid parental leave
+- Home office and wellness stipend
+
+We are an equal opportunity employer and value diversity. All qualified applicants will receive
+consideration for employment without regard to race, color, religion, sex, sexual orientation, gender
+identity, national origin, disability or protected veteran status. Reasonable accommodation is available."""
+
+
+def make_jd(rng: random.Random, number: int) -> str:
+    must = rng.sample(SKILLS, 6)
+    nice = rng.sample([skill for skill in SKILLS if skill not in must], 3)
+    lines = [f"Senior Platform Engineer #{number}", "", "Responsibilities"]
+    lines += [f"- Build and operate {skill} services at scale" for skill in must[:3]]
+    lines += ["", "Requirements:"] + [f"- {rng.randint(2, 6)}+ years of {skill} experience" for skill in must]
+    lines += ["", "Nice to have"] + [f"- {skill}" for skill in nice]
+    return "\n".join(lines) + "\n\n" + BOILERPLATE
+
+
+def main(distinct: int = 200, requests: int = 5000):
+    rng = random.Random(11)
+    postings = [make_jd(rng, i) for i in range(distinct)]
+    weights = [1 / (rank + 1) for rank in range(distinct)]
+    stream = rng.choices(postings, weights=weights, k=requests)
+
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    jd_preprocessor.reset_jd_cache()
+
+    start = time.perf_counter()
+    for posting in stream:
+        get_jd_profile(db, posting)
+    elapsed = time.perf_counter() - start
+
+    stats = jd_cache_stats()
+    print(f"{requests} requests over {distinct} postings: hit rate {stats['hit_rate']:.1%} "
+          f"({stats['memory_hits']} memory, {stats['db_hits']} table, {stats['misses']} misses)")
+    print(f"prompt tokens: raw {stats['prompt_tokens_raw']}, compact {stats['prompt_tokens_compact']}, "
+          f"saved {stats['prompt_tokens_saved']} "
+          f"({stats['prompt_tokens_saved'] / stats['prompt_tokens_raw']:.1%})")
+
+    preprocess = time.perf_counter()
+    for posting in postings[:100]:
+        build_profile(posting)
+    preprocess = (time.perf_counter() - preprocess) / 100
+    print(f"preprocess: {preprocess * 1e6:8.1f} us/posting; "
+          f"average lookup incl. misses: {elapsed / requests * 1e6:8.1f} us")
+
+    jd_preprocessor._memory.clear()
+    jd_preprocessor.reset_jd_cache()
+    start = time.perf_counter()
+    for posting in postings:
+        get_jd_profile(db, posting)
+    table = (time.perf_counter() - start) / distinct
+    print(f"table hit (cold worker): {table * 1e6:8.1f} us/lookup")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
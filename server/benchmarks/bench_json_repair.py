@@ -0,0 +1,70 @@
+"""Salvage rate and completion tokens saved when rewrite outputs are cut off at random points.
+
+Each trial truncates a full stub rewrite output at a random length, as a
+token-limit stop would, and compares the repair-plus-follow-up path with
+retrying the whole analysis.
+
+Run from the server directory: python benchmarks/bench_json_repair.py
+"""
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import json_repair
+from services.ai_analyzer import analysis_prompt, analyze_resume_with_ai
+from services.json_repair import repair_json
+from services.llm_stub import StubClient
+
+RESUME = "\n".join(
+    ["Alex Candidate | alex@example.com", "EXPERIENCE"] +
+    [f"- Improved throughput of service {j} by {10 + j}% by redesigning its caching layer" for j in range(20)] +
+    ["SKILLS", "Python, Go, Docker, Kubernetes, PostgreSQL, AWS"]
+)
+
+
+class TruncatingClient:
+    def __init__(self, keep: int):
+        self.stub = StubClient()
+        self.keep = keep
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        self.calls += 1
+        completion = self.stub.chat.completions.create(**kwargs)
+        if self.calls == 1:
+            completion.choices[0].message.content = completion.choices[0].message.content[:self.keep]
+        return completion
+
+
+def main():
+    full = StubClient().chat.completions.create(
+        messages=[{"role": "user", "content": analysis_prompt(RESUME, "Backend Engineer")}], model="stub")
+    content = full.choices[0].message.content
+    rng = random.Random(3)
+    trials = 500
+
+    started = time.perf_counter()
+    for _ in range(trials):
+        repair_json(content[:rng.randrange(len(content))])
+    print(f"repair_json on {len(content)} chars: {(time.perf_counter() - started) / trials * 1000:.3f} ms")
+
+    json_repair.repair_stats.update(dict.fromkeys(json_repair.repair_stats, 0))
+    for _ in range(trials):
+        with patch("services.ai_analyzer.create_client", return_value=TruncatingClient(rng.randrange(len(content)))):
+            analyze_resume_with_ai(RESUME, "Backend Engineer")
+    stats = json_repair.repair_summary()
+    retry_tokens = trials * full.usage.completion_tokens
+    print(f"{trials} truncated outputs: salvage rate {stats['salvage_rate']:.0%} "
+          f"({stats['followups']} follow-ups, {stats['failed']} failed)")
+    print(f"follow-up completion tokens {stats['followup_tokens']} vs {retry_tokens} for full retries "
+          f"({stats['followup_tokens'] / retry_tokens:.0%})")
+
+
+if __name__ == "__main__":
+    main()
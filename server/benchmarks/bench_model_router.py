@@ -0,0 +1,71 @@
+"""Simulated p95 latency and tier mix of the model router against always using the strong model.
+
+Latencies are drawn from a simple per-model model (time to first token plus
+per-output-token decoding, with a heavy tail), so no API calls are made.
+
+Run from the server directory: python benchmarks/bench_model_router.py
+"""
+import os
+import random
+import sys
+from collections import Counter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import model_router
+from services.model_router import MODEL_TIERS, LatencyTracker, route_model
+
+# (first token ms, ms per output token) per tier
+SPEED = {"fast": (200, 0.6), "balanced": (400, 1.2), "strong": (800, 2.5)}
+WORD = "engineered "
+
+
+def simulated_latency(tier: str, input_tokens: int, rng: random.Random, congested: bool) -> float:
+    first, per_token = SPEED[tier]
+    output_tokens = 600 + input_tokens // 2  # the rewrite grows with the resume
+    ms = first + output_tokens * per_token
+    if congested and tier == "strong":
+        ms *= 2.5  # provider-side queueing on the largest model
+    return ms * rng.lognormvariate(0, 0.25) / 1000
+
+
+def requests(count: int, rng: random.Random) -> list:
+    out = []
+    for _ in range(count):
+        resume = WORD * rng.choice((150, 300, 600, 1200))
+        jd = WORD * 150 if rng.random() < 0.6 else None
+        out.append((resume, jd))
+    return out
+
+
+def p95(values: list) -> float:
+    values = sorted(values)
+    return values[int(len(values) * 0.95)]
+
+
+def run(label: str, batch: list, budget_ms: int, routing: bool, congested_after: int):
+    rng = random.Random(1)
+    tracker = LatencyTracker()
+    model_router.LLM_ROUTING = routing
+    tiers = {model: tier for tier, model in MODEL_TIERS}
+    latencies, mix = [], Counter()
+    for index, (resume, jd) in enumerate(batch):
+        route = route_model(resume, jd, "full", budget_ms, tracker)
+        seconds = simulated_latency(tiers[route.model], len(resume + (jd or "")) // 4, rng, index >= congested_after)
+        tracker.observe(route.model, seconds)
+        latencies.append(seconds * 1000)
+        mix[route.tier] += 1
+    print(f"{label:<14} p95 {p95(latencies[:congested_after]) / 1000:5.1f} s normal, "
+          f"{p95(latencies[congested_after:]) / 1000:5.1f} s congested; mix {dict(sorted(mix.items()))}")
+
+
+def main():
+    batch = requests(4000, random.Random(7))
+    budget_ms = 12000
+    print(f"{len(batch)} requests, budget {budget_ms / 1000:.0f} s, strong model congested for the second half")
+    run("always strong", batch, budget_ms, routing=False, congested_after=len(batch) // 2)
+    run("routed", batch, budget_ms, routing=True, congested_after=len(batch) // 2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""End-to-end latency: monolithic prompt vs. parallel section-level calls.
+
+Uses the local stub backend (LLM_BACKEND=stub), which sleeps per generated
+token to mimic serial decoding. Tune with STUB_TOKEN_LATENCY_MS and
+STUB_BASE_LATENCY_MS.
+
+Run from the server directory: python benchmarks/bench_parallel_analysis.py
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["LLM_BACKEND"] = "stub"
+os.environ.setdefault("STUB_TOKEN_LATENCY_MS", "2")
+os.environ.setdefault("STUB_BASE_LATENCY_MS", "150")
+
+from services.ai_analyzer import analyze_resume_with_ai
+from services.section_analysis import analyze_resume_sectioned
+from services.section_segmenter import segment_resume
+
+
+def make_resume(jobs: int, projects: int, bullets: int = 5) -> str:
+    lines = ["Alex Candidate", "alex@example.com | +1 555 010 2030", "SUMMARY", "Backend engineer.", "EXPERIENCE"]
+    for j in range(jobs):
+        lines.append(f"Senior Engineer at Company{j} (201{j % 10} - 202{j % 5})")
+        lines += [f"- Built service {j}.{b} in Python and reduced latency by {10 + b}% for 2M users" for b in range(bullets)]
+    lines.append("PROJECTS")
+    for p in range(projects):
+        lines.append(f"Project {p} (Go, Kafka)")
+        lines += [f"- Implemented feature {p}.{b} processing 10k events per second" for b in range(bullets)]
+    lines += ["SKILLS", "Python, Go, Kafka, Docker", "EDUCATION", "BSc Computer Science"]
+    return "\n".join(lines)
+
+
+def timed(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    for jobs, projects in ((1, 1), (3, 2), (6, 4)):
+        text = make_resume(jobs, projects)
+        sections = segment_resume(text)
+        mono = timed(lambda: analyze_resume_with_ai(text, "Backend Engineer", "Python, Go, Kafka"))
+        parallel = timed(lambda: analyze_resume_sectioned(text, sections, "Backend Engineer", "Python, Go, Kafka"))
+        print(f"{jobs} jobs + {projects} projects ({len(text.split())} words): "
+              f"monolithic {mono:7.0f} ms | parallel {parallel:7.0f} ms | speedup {mono / parallel:4.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Per-file latency of sandboxed parsing vs in-process parsing.
+
+Run from the server directory: python benchmarks/bench_parser_pool.py
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.exporter import TEMPLATES, render_pdf
+from services.parser_pool import ParserPool
+from services.resume_parser import extract_document
+
+SECTION = "## EXPERIENCE\n" + "\n".join(
+    f"* Improved service {i} throughput by {10 + i}% by redesigning its caching in Python and Go" for i in range(25)
+)
+
+
+def per_call_ms(fn, seconds: float = 2.0) -> float:
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        fn()
+        count += 1
+    return (time.perf_counter() - start) / count * 1000
+
+
+def main():
+    started = time.perf_counter()
+    pool = ParserPool(size=2, max_jobs=10 ** 9)
+    print(f"pool start (2 workers): {(time.perf_counter() - started) * 1000:.0f} ms")
+    try:
+        for copies in (1, 4):
+            data = render_pdf("# Jane Doe\n" + "\n".join([SECTION] * copies), TEMPLATES["classic"])
+            local = per_call_ms(lambda: extract_document(data, "resume.pdf"))
+            sandboxed = per_call_ms(lambda: pool.parse(data, "resume.pdf"))
+            print(f"{len(data) / 1024:4.0f} KiB: in-process {local:7.1f} ms, sandboxed {sandboxed:7.1f} ms")
+
+        recycling = ParserPool(size=1, max_jobs=1)
+        data = render_pdf("# Jane Doe\n" + SECTION, TEMPLATES["classic"])
+        print(f"recycle every job: {per_call_ms(lambda: recycling.parse(data, 'resume.pdf')):.1f} ms per file")
+        recycling.close()
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Speed and fidelity of the PDF extraction engines across document sizes.
+
+Fidelity is the share of the source markdown's words (bullet glyphs ignored)
+that the extracted text recovers.
+
+Run from the server directory: python benchmarks/bench_pdf_engines.py
+"""
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import resume_parser
+from services.exporter import TEMPLATES, render_pdf
+
+SECTION = "## EXPERIENCE\n" + "\n".join(
+    f"* Improved service {i} throughput by {10 + i}% by redesigning its caching in Python and Go" for i in range(25)
+)
+
+
+def words(text: str) -> list:
+    return [word for word in re.sub(r"[#*]", " ", text).split() if word != "•"]
+
+
+def timed(fn, data: bytes, seconds: float = 1.0) -> tuple:
+    result, count, start = None, 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        result = fn(data)
+        count += 1
+    return (time.perf_counter() - start) / count * 1000, result
+
+
+def main():
+    for copies in (1, 4, 16):
+        markdown = "# Jane Doe\n" + "\n".join([SECTION] * copies)
+        data = render_pdf(markdown, TEMPLATES["classic"])
+        truth = Counter(words(markdown))
+        print(f"{resume_parser.pdf_page_count(data)} pages, {len(data) / 1024:.0f} KiB")
+        engines = dict(resume_parser.PDF_ENGINES, auto=resume_parser.extract_pdf)
+        for name, engine in engines.items():
+            ms, result = timed(engine, data)
+            fidelity = sum((truth & Counter(words(result[0]))).values()) / sum(truth.values())
+            chosen = f" -> {result[2]}" if name == "auto" else ""
+            print(f"  {name:<10} {ms:8.1f} ms  fidelity {fidelity:.3f}{chosen}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Section segmentation throughput over a generated resume corpus.
+
+Run from the server directory: python benchmarks/bench_segmentation.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.section_segmenter import segment_resume
+
+HEADINGS = {
+    "summary": ["SUMMARY", "Professional Summary", "Profile"],
+    "experience": ["EXPERIENCE", "Work Experience", "Professional Experience:"],
+    "projects": ["PROJECTS", "Personal Projects"],
+    "skills": ["SKILLS", "Technical Skills:", "Core Competencies"],
+    "education": ["EDUCATION", "Education"],
+    "certifications": ["CERTIFICATIONS", "Licenses & Certifications"],
+}
+SKILLS = ["Python", "Go", "SQL", "Docker", "Kubernetes", "AWS", "React", "Kafka", "Terraform", "Redis"]
+VERBS = ["Built", "Led", "Designed", "Migrated", "Automated", "Reduced", "Scaled"]
+BULLETS = ["•", "-", "*", "▪"]
+
+
+def make_resume(rng: random.Random) -> tuple:
+    lines = [f"Candidate {rng.randint(1, 10**6)}", f"Engineer | c{rng.randint(1, 999)}@example.com | +1 555 {rng.randint(100, 999)} 0000"]
+    expected = {"contact"}
+    for section in rng.sample(list(HEADINGS), k=rng.randint(3, 6)):
+        expected.add(section)
+        lines.append(rng.choice(HEADINGS[section]))
+        bullet = rng.choice(BULLETS)
+        if section in ("experience", "projects"):
+            for _ in range(rng.randint(1, 5)):
+                lines.append(f"Engineer at Company{rng.randint(1, 99)} ({rng.randint(2005, 2020)} - Present)")
+                for _ in range(rng.randint(2, 6)):
+                    lines.append(f"{bullet} {rng.choice(VERBS)} {rng.choice(SKILLS)} services, cutting cost {rng.randint(5, 60)}%")
+        elif section == "skills":
+            lines.append("Languages: " + ", ".join(rng.sample(SKILLS, 5)))
+        else:
+            lines.extend(f"{bullet} Item {i}" for i in range(rng.randint(1, 3)))
+    return "\n".join(lines), expected
+
+
+def main(corpus_size: int = 2000):
+    rng = random.Random(11)
+    corpus = [make_resume(rng) for _ in range(corpus_size)]
+    started = time.perf_counter()
+    results = [segment_resume(text) for text, _ in corpus]
+    elapsed = time.perf_counter() - started
+    exact = sum(set(result) == expected for result, (_, expected) in zip(results, corpus))
+    words = sum(len(text.split()) for text, _ in corpus)
+    print(f"{corpus_size} resumes ({words / corpus_size:.0f} words avg): "
+          f"{elapsed / corpus_size * 1000:.3f} ms/resume, {corpus_size / elapsed:,.0f} resumes/s")
+    print(f"section sets recovered exactly: {exact}/{corpus_size}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Per-request serialization cost of an analysis result, before and after.
+
+Before: json round-trip for storage, FastAPI response-model validation and
+stdlib JSON rendering. After: one pydantic validation, one dump shared by the
+DB row and the orjson-rendered response.
+
+Run from the server directory: python benchmarks/bench_serialization.py
+"""
+import json
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from models import ResumeAnalysisResponse
+from services.serialization import FastJSONResponse, validate_analysis, dump_analysis
+
+BULLET = "Reduced p95 API latency by 40% by introducing a Redis read-through cache across 12 services"
+
+SAMPLE = {
+    "overall_score": 72,
+    "strengths": [f"Strength {i}: {BULLET}" for i in range(8)],
+    "weaknesses": [f"Gap {i}: no evidence of Kubernetes in production" for i in range(6)],
+    "ats_issues": [f"Issue {i}: tables and columns confuse parsers" for i in range(5)],
+    "role_alignment_feedback": "Detailed alignment feedback. " * 60,
+    "optimized_bullets": [BULLET for _ in range(15)],
+    "missing_skills": ["Kubernetes", "Terraform", "gRPC", "Kafka", "Airflow"],
+    "final_suggestions": "Implementation guidance paragraph. " * 40,
+    "optimized_resume_content": ("## EXPERIENCE\n**Engineer** at **Acme** (2019-2024)\n* " + BULLET + "\n") * 40,
+}
+RAW = json.dumps(SAMPLE)
+
+
+def before():
+    result = json.loads(RAW)
+    stored = json.loads(json.dumps(result))  # main.py storage round-trip
+    validated = ResumeAnalysisResponse.model_validate(result)  # response_model check
+    JSONResponse(jsonable_encoder(validated)).body
+    json.dumps(stored)  # JSON column serialization on commit
+
+
+def after():
+    result = json.loads(RAW)
+    payload = dump_analysis(validate_analysis(result))
+    FastJSONResponse(payload).body
+    FastJSONResponse(payload).render(payload)  # orjson-backed JSON column
+
+
+def main(number: int = 2000):
+    for name, fn in (("before", before), ("after", after)):
+        seconds = min(timeit.repeat(fn, number=number, repeat=5))
+        print(f"{name:>6}: {seconds / number * 1e6:8.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Embedding cost and top-k query latency of the similarity index.
+
+Builds an on-disk index of synthetic resumes, then times queries through a
+second, freshly memory-mapped instance (as another worker would see it).
+
+Run from the server directory: python benchmarks/bench_similarity_index.py
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.similarity_index import SimilarityIndex, embed
+
+SKILLS = ["Python", "Java", "Go", "Docker", "Kubernetes", "AWS", "PostgreSQL", "React", "TypeScript",
+          "Kafka", "Terraform", "GraphQL", "Redis", "Spark", "Airflow", "CI/CD", "REST APIs", "gRPC"]
+VERBS = ["Built", "Led", "Designed", "Migrated", "Automated", "Reduced", "Scaled", "Shipped"]
+ROLES = ["Backend Engineer", "Data Engineer", "Frontend Developer", "Platform Engineer", "ML Engineer"]
+
+
+def make_resume(rng: random.Random) -> str:
+    lines = ["EXPERIENCE"]
+    for _ in range(rng.randint(8, 20)):
+        lines.append(f"- {rng.choice(VERBS)} {rng.choice(SKILLS)} services with {rng.choice(SKILLS)}, "
+                     f"improving throughput by {rng.randint(5, 80)}%")
+    lines += ["SKILLS", ", ".join(rng.sample(SKILLS, 8))]
+    return "\n".join(lines)
+
+
+def main(distinct: int = 500, sizes=(10_000, 100_000), queries: int = 50):
+    rng = random.Random(5)
+    resumes = [(make_resume(rng), rng.choice(ROLES)) for _ in range(distinct)]
+
+    start = time.perf_counter()
+    vectors = [embed(text, role) for text, role in resumes]
+    print(f"embed: {(time.perf_counter() - start) / distinct * 1e6:8.1f} us/resume")
+
+    for size in sizes:
+        path = os.path.join(tempfile.mkdtemp(), "analyses.index")
+        writer = SimilarityIndex(path)
+        start = time.perf_counter()
+        for offset in range(0, size, 1000):
+            writer.add_many([(i + 1, i % 5000, vectors[i % distinct]) for i in range(offset, min(offset + 1000, size))])
+        build = time.perf_counter() - start
+
+        reader = SimilarityIndex(path)
+        start = time.perf_counter()
+        for i in range(queries):
+            reader.query(vectors[i], k=5)
+        everyone = (time.perf_counter() - start) / queries
+        start = time.perf_counter()
+        for i in range(queries):
+            reader.query(vectors[i], k=5, user_id=i)
+        one_user = (time.perf_counter() - start) / queries
+        print(f"{size:>7} rows ({os.path.getsize(path) / 2**20:6.1f} MiB): append {size / build:9.0f} rows/s, "
+              f"top-5 all {everyone * 1000:7.2f} ms, top-5 one user {one_user * 1000:6.2f} ms")
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
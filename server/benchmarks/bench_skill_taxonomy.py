@@ -0,0 +1,75 @@
+"""Skill extraction: Aho-Corasick index vs. naive per-skill regex scanning.
+
+Builds synthetic taxonomies of 10k and 100k entries (with aliases), then
+measures compile time, on-disk cache size and load time, and match time over
+a resume-sized text. The naive count is higher because it also reports
+skills nested inside longer ones, which the index resolves leftmost-longest.
+
+Run from the server directory: python benchmarks/bench_skill_taxonomy.py
+"""
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.skill_taxonomy import SkillIndex, load_skill_index
+
+SYLLABLES = ["ka", "lo", "mi", "ne", "tra", "zo", "qui", "ber", "pan", "dex", "vo", "ly", "sen", "gor", "ix"]
+
+
+def make_taxonomy(rng: random.Random, size: int) -> list:
+    names = set()
+    while len(names) < size:
+        words = [("".join(rng.choices(SYLLABLES, k=rng.randint(2, 4)))) for _ in range(rng.choice((1, 1, 2, 3)))]
+        names.add(" ".join(words))
+    return [{"name": name, "aliases": [name.replace(" ", "-")] if " " in name else []} for name in sorted(names)]
+
+
+def make_text(rng: random.Random, taxonomy: list, words: int = 700) -> str:
+    filler = ["built", "led", "the", "platform", "with", "team", "reduced", "latency", "by", "40%"]
+    out = []
+    while len(out) < words:
+        out.append(rng.choice(taxonomy)["name"] if rng.random() < 0.05 else rng.choice(filler))
+    return " ".join(out)
+
+
+def timed(fn, repeat: int = 3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return result, best * 1000
+
+
+def main():
+    rng = random.Random(42)
+    for size in (10_000, 100_000):
+        taxonomy = make_taxonomy(rng, size)
+        text = make_text(rng, taxonomy)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "taxonomy.json")
+            with open(path, "w") as f:
+                json.dump(taxonomy, f)
+
+            index, build_ms = timed(lambda: SkillIndex.build(taxonomy), repeat=1)
+            load_skill_index(path, cache_dir=tmp)  # populate cache
+            cache_file = next(name for name in os.listdir(tmp) if name.endswith(".marshal"))
+            cache_kb = os.path.getsize(os.path.join(tmp, cache_file)) / 1024
+            _, load_ms = timed(lambda: load_skill_index(path, cache_dir=tmp))
+            found, match_ms = timed(lambda: index.extract(text), repeat=20)
+
+        patterns = [re.compile(r"\b" + re.escape(entry["name"]) + r"\b", re.IGNORECASE) for entry in taxonomy]
+        naive, naive_ms = timed(lambda: [p.pattern for p in patterns if p.search(text)], repeat=1)
+
+        print(f"{size:>7} entries: build {build_ms:8.1f} ms | cache {cache_kb:8.0f} KiB, load {load_ms:7.1f} ms "
+              f"| match {match_ms:6.2f} ms ({len(found)} skills) | naive regex {naive_ms:9.1f} ms ({len(naive)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Request-path cost of storing analyses: commit per request vs write-behind.
+
+Run from the server directory: python benchmarks/bench_write_behind.py
+"""
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import models
+from database import Base, _json_serializer
+from services.write_behind import WriteBehindBuffer
+
+ROWS = 400
+THREADS = 8
+ROW = {
+    "user_id": 1,
+    "original_text": "Backend engineer with ten years of platform experience. " * 60,
+    "analysis_json": {"overall_score": 70, "optimized_resume_content": "x" * 4000, "missing_skills": ["Go"] * 5},
+    "target_role": "Backend Engineer",
+}
+
+
+def run(store) -> tuple:
+    latencies = []
+
+    def one(_):
+        started = time.perf_counter()
+        store()
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(THREADS) as pool:
+        list(pool.map(one, range(ROWS)))
+    latencies.sort()
+    return ROWS / (time.perf_counter() - started), latencies[len(latencies) // 2] * 1000, \
+        latencies[int(len(latencies) * 0.95)] * 1000
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{directory}/bench.db", json_serializer=_json_serializer,
+                               connect_args={"check_same_thread": False, "timeout": 30})
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+
+        def commit_per_request():
+            db = Session()
+            db.add(models.ResumeAnalysis(**ROW))
+            db.commit()
+            db.close()
+
+        rate, p50, p95 = run(commit_per_request)
+        print(f"commit per request: {rate:7.0f} rows/s, p50 {p50:6.2f} ms, p95 {p95:6.2f} ms")
+
+        buffer = WriteBehindBuffer(os.path.join(directory, "journal"), Session)
+        rate, p50, p95 = run(lambda: buffer.submit(**ROW))
+        buffer.close()
+        print(f"write-behind:       {rate:7.0f} rows/s, p50 {p50:6.2f} ms, p95 {p95:6.2f} ms "
+              f"({buffer.stats['batches']} batches, {buffer.stats['fsyncs']} journal fsyncs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,19 @@
+from sqlalchemy import create_engine, func, text
 from sqlalchemy.orm import Session
-from database import SessionLocal, engine
+from database import SessionLocal, engine, init_db
+from multiprocessing import Pool
+import argparse
+import csv
+import datetime
+import hashlib
+import io
 import models
 import auth
 import logging
+import math
+import orjson
+import random
+import time
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -43,5 +54,189 @@ def create_test_user():
     finally:
         db.close()
 
+# --- Bulk seeding for scale tests ---
+# python create_test_user.py seed --users 1000000 --seed 7 --workers 8
+#
+# Rows are generated in worker processes, one chunk of users (and their
+# analyses) at a time. Each chunk draws from its own RNG seeded with
+# (seed, chunk), so a seed always yields the same dataset whatever the
+# worker count. The parent writes chunks in order: COPY on Postgres,
+# executemany in one transaction per chunk on SQLite.
+
+SEED_PASSWORD = "password123"
+ROLES = ["Backend Engineer", "Frontend Engineer", "Data Scientist", "Product Manager", "DevOps Engineer",
+         "Designer", "QA Engineer", "Mobile Developer", "Data Engineer", "Engineering Manager"]
+SKILLS = ["Python", "Go", "Java", "TypeScript", "React", "Kubernetes", "Docker", "AWS", "GCP", "Terraform",
+          "PostgreSQL", "Redis", "Kafka", "Spark", "Airflow", "GraphQL", "Figma", "Swift", "Kotlin", "CI/CD"]
+WORDS = ("led built designed shipped reduced improved migrated scaled automated owned mentored launched "
+         "latency throughput reliability pipeline platform service api customers revenue cost team "
+         "microservices dashboard infrastructure deployment testing monitoring analytics roadmap").split()
+DAYS_OF_HISTORY = 365
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"  # what SQLAlchemy's DateTime stores on SQLite
+
+USER_COLUMNS = ("id", "email", "hashed_password", "created_at")
+ANALYSIS_COLUMNS = ("user_id", "original_text", "analysis_json", "created_at", "target_role", "jd_hash")
+
+
+CORPUS_WORDS = 50000
+
+
+class _Text:
+    """Random prose cut from one shuffled corpus per chunk: far cheaper than drawing word by word."""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.corpus = " ".join(rng.choices(WORDS, k=CORPUS_WORDS))
+
+    def prose(self, chars: int) -> str:
+        chars = min(chars, len(self.corpus) // 2)
+        start = self.rng.randrange(len(self.corpus) - chars)
+        return self.corpus[start:start + chars].strip()
+
+    def resume(self) -> str:
+        # Extracted resume text is roughly log-normal: median ~3.5k chars, long tail to ~20k
+        size = int(min(max(self.rng.lognormvariate(math.log(3500), 0.5), 600), 20000))
+        return "\n".join(self.prose(60) for _ in range(size // 60))
+
+    def analysis_json(self, resume_text: str) -> str:
+        rng = self.rng
+        items = lambda low, high: [self.prose(rng.randint(40, 120)) for _ in range(rng.randint(low, high))]
+        return orjson.dumps({
+            "overall_score": int(min(max(rng.gauss(68, 12), 5), 100)),
+            "strengths": items(3, 6),
+            "weaknesses": items(2, 5),
+            "ats_issues": items(1, 4),
+            "role_alignment_feedback": self.prose(rng.randint(200, 600)),
+            "optimized_bullets": items(4, 10),
+            "missing_skills": rng.sample(SKILLS, rng.randint(0, 6)),
+            "final_suggestions": self.prose(rng.randint(150, 400)),
+            "optimized_resume_content": self.prose(int(len(resume_text) * rng.uniform(0.8, 1.2))),
+        }).decode()
+
+
+def _analysis_count(rng: random.Random, mean: float) -> int:
+    # Heavy-tailed: most users run a handful of analyses, a few hit the 50 limit
+    if mean <= 0:
+        return 0
+    return min(int(rng.paretovariate(1.5) * mean / 3), 50)
+
+
+def generate_chunk(job: tuple) -> tuple:
+    """(users, analyses) rows for users first_id .. first_id + count - 1, deterministic per (seed, chunk)."""
+    seed, chunk, first_id, count, mean_analyses, password_hash, now = job
+    rng = random.Random(f"{seed}:{chunk}")
+    texts = _Text(rng)
+    users, analyses = [], []
+    for user_id in range(first_id, first_id + count):
+        signed_up = now - datetime.timedelta(seconds=rng.randint(0, DAYS_OF_HISTORY * 86400))
+        users.append((user_id, f"seed{seed}-user{user_id}@example.com", password_hash,
+                      signed_up.strftime(DATETIME_FORMAT)))
+        for _ in range(_analysis_count(rng, mean_analyses)):
+            resume_text = texts.resume()
+            created = signed_up + (now - signed_up) * rng.random()
+            jd_hash = hashlib.sha256(str(rng.random()).encode()).hexdigest() if rng.random() < 0.6 else None
+            analyses.append((user_id, resume_text, texts.analysis_json(resume_text),
+                             created.strftime(DATETIME_FORMAT), rng.choice(ROLES), jd_hash))
+    return users, analyses
+
+
+def _copy(conn, table: str, columns: tuple, rows: list) -> None:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def _supports_copy(bind) -> bool:
+    """COPY needs psycopg2's copy_expert; other drivers fall back to executemany."""
+    if bind.dialect.name != "postgresql":
+        return False
+    raw = bind.raw_connection()
+    try:
+        return hasattr(raw.cursor(), "copy_expert")
+    finally:
+        raw.close()
+
+
+def _insert(conn, table: str, columns: tuple, rows: list) -> None:
+    placeholders = ", ".join("?" for _ in columns) if conn.dialect.paramstyle == "qmark" else \
+        ", ".join("%s" for _ in columns)
+    conn.exec_driver_sql(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows)
+
+
+def seed_database(bind, users: int, mean_analyses: float = 4, seed: int = 0, workers: int = 4,
+                  chunk_size: int = 5000, as_of: datetime.date = None, log=logger.info) -> dict:
+    """Insert `users` generated users and their analyses; returns counts and rates.
+
+    Timestamps fall in the year before `as_of` (default today, UTC), which is
+    part of the dataset's identity along with the seed.
+    """
+    init_db(bind)
+    with bind.connect() as conn:
+        first_id = (conn.execute(func.max(models.User.id).select()).scalar() or 0) + 1
+    write = _copy if _supports_copy(bind) else _insert
+    # One shared hash: pbkdf2 per user would dominate the run
+    password_hash = auth.get_password_hash(SEED_PASSWORD)
+    now = datetime.datetime.combine(as_of or datetime.datetime.utcnow().date(), datetime.time())
+    jobs = [(seed, chunk, first_id + start, min(chunk_size, users - start), mean_analyses, password_hash, now)
+            for chunk, start in enumerate(range(0, users, chunk_size))]
+
+    stats = {"users": 0, "analyses": 0, "bytes": 0}
+    started = time.perf_counter()
+    with Pool(processes=max(1, workers)) as pool:
+        # imap keeps chunk order, so autoincrement analysis ids are reproducible too
+        for user_rows, analysis_rows in pool.imap(generate_chunk, jobs):
+            with bind.begin() as conn:
+                if bind.dialect.name == "sqlite":
+                    # A half-written seed run is thrown away anyway
+                    conn.exec_driver_sql("PRAGMA synchronous = OFF")
+                write(conn, "users", USER_COLUMNS, user_rows)
+                if analysis_rows:
+                    write(conn, "resume_analyses", ANALYSIS_COLUMNS, analysis_rows)
+            stats["users"] += len(user_rows)
+            stats["analyses"] += len(analysis_rows)
+            stats["bytes"] += sum(len(row[1]) + len(row[2]) for row in analysis_rows)
+            elapsed = time.perf_counter() - started
+            log(f"{stats['users']:,} users, {stats['analyses']:,} analyses "
+                f"({(stats['users'] + stats['analyses']) / elapsed:,.0f} rows/s)")
+
+    if bind.dialect.name == "postgresql":
+        # Explicit user ids bypassed the sequence
+        with bind.begin() as conn:
+            conn.execute(text("SELECT setval(pg_get_serial_sequence('users', 'id'), (SELECT MAX(id) FROM users))"))
+    elapsed = time.perf_counter() - started
+    stats["seconds"] = round(elapsed, 2)
+    stats["rows_per_second"] = round((stats["users"] + stats["analyses"]) / elapsed)
+    stats["first_user_id"] = first_id
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create the test login, or bulk-seed users and analyses.")
+    commands = parser.add_subparsers(dest="command")
+    seed = commands.add_parser("seed", help=f"generate users (password {SEED_PASSWORD!r}) and resume analyses")
+    seed.add_argument("--users", type=int, default=10000)
+    seed.add_argument("--mean-analyses", type=float, default=4, help="average analyses per user (capped at 50)")
+    seed.add_argument("--seed", type=int, default=0, help="same seed, same dataset")
+    seed.add_argument("--workers", type=int, default=4, help="generator processes")
+    seed.add_argument("--chunk-size", type=int, default=5000, help="users per chunk and transaction")
+    seed.add_argument("--as-of", type=datetime.date.fromisoformat, help="YYYY-MM-DD end of the history; default today")
+    seed.add_argument("--database-url", help="defaults to DATABASE_URL / the local SQLite file")
+    args = parser.parse_args()
+
+    if args.command != "seed":
+        create_test_user()
+        return
+    bind = create_engine(args.database_url) if args.database_url else engine
+    stats = seed_database(bind, args.users, args.mean_analyses, args.seed, args.workers, args.chunk_size, args.as_of)
+    logger.info(f"Seeded {stats['users']:,} users and {stats['analyses']:,} analyses "
+                f"({stats['bytes'] / 1e6:,.0f} MB of text/JSON) in {stats['seconds']}s: "
+                f"{stats['rows_per_second']:,} rows/s")
+    logger.info("Run `python -m services.analytics` to rebuild the dashboard rollups for the new rows.")
+
 if __name__ == "__main__":
-    create_test_user()
+    main()
@@ -1,25 +1,56 @@
-from sqlalchemy import create_engine
+from fastapi import Depends, Request
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
+from contextlib import contextmanager
+import orjson
 import os
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines
+    fcntl = None
 
 # Get DB URL from env or fallback to local sqlite
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
+# Optional read replica (a Postgres hot standby, or a second SQLite file locally)
+REPLICA_DATABASE_URL = os.getenv("DATABASE_REPLICA_URL")
+# After a client commits, its reads stay on the primary this long (replication lag)
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+REPLICA_CHECK_INTERVAL = float(os.getenv("REPLICA_CHECK_INTERVAL", 10))
+# Capped at READ_YOUR_WRITES_SECONDS (see ReadRouter)
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", READ_YOUR_WRITES_SECONDS))
+READ_AFTER_COOKIE = "read_after"
 
-connect_args = {}
+def _normalize_url(url: str) -> str:
+    # Render provides 'postgres://' but SQLAlchemy needs 'postgresql://'
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql://", 1)
+    return url
 
 if SQLALCHEMY_DATABASE_URL:
-    # Render provides 'postgres://' but SQLAlchemy needs 'postgresql://'
-    if SQLALCHEMY_DATABASE_URL.startswith("postgres://"):
-        SQLALCHEMY_DATABASE_URL = SQLALCHEMY_DATABASE_URL.replace("postgres://", "postgresql://", 1)
+    SQLALCHEMY_DATABASE_URL = _normalize_url(SQLALCHEMY_DATABASE_URL)
 else:
     SQLALCHEMY_DATABASE_URL = "sqlite:///./sql_app.db"
-    connect_args = {"check_same_thread": False}
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args=connect_args
-)
+def _json_serializer(obj) -> str:
+    return orjson.dumps(obj).decode()
+
+def make_engine(url: str):
+    connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    return create_engine(
+        url,
+        connect_args=connect_args,
+        json_serializer=_json_serializer,
+        json_deserializer=orjson.loads,
+    )
+
+engine = make_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -30,3 +61,251 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# --- Read replica routing ---
+# Read-only dependencies (the user lookup in get_current_user, usage counts,
+# history reads) take get_read_db, which hands out a replica session unless
+# the client wrote within READ_YOUR_WRITES_SECONDS or the replica failed its
+# last health check; then it returns the request's primary session from
+# get_db, which costs nothing extra because sessions connect lazily.
+# Clients are identified by their bearer token and pinned whenever a session
+# tagged with that token commits (signup, which has no token yet, calls
+# pin_client with the one it issues). That pin is per process, so the deadline
+# also travels with the client: ReadYourWritesMiddleware returns it as a
+# read_after cookie and an X-Read-After header (wall-clock seconds), and any
+# worker honours either on the next request. A replica lagging more than the
+# window could still miss a pinned client's write once the pin expires, so
+# lag beyond READ_YOUR_WRITES_SECONDS counts as unhealthy.
+
+def _read_only_guard(session, flush_context, instances):
+    if session.new or session.dirty or session.deleted:
+        raise RuntimeError("Attempted to write through a read-only replica session")
+
+class ReadRouter:
+    """Picks the replica or the primary for read-only sessions."""
+
+    def __init__(self, replica_engine=None, window: float = READ_YOUR_WRITES_SECONDS,
+                 check_interval: float = REPLICA_CHECK_INTERVAL, max_lag: float = REPLICA_MAX_LAG_SECONDS):
+        self.replica_engine = replica_engine
+        self.window = window
+        self.check_interval = check_interval
+        self.max_lag = min(max_lag, window)
+        self.replica_session = None
+        if replica_engine is not None:
+            self.replica_session = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+            event.listen(self.replica_session, "before_flush", _read_only_guard)
+        self._pins = {}  # client key -> monotonic deadline
+        self._lock = threading.Lock()
+        self._healthy = True
+        self._next_check = 0.0
+        self.counts = {"replica": 0, "primary": 0, "pinned": 0, "unhealthy": 0, "failovers": 0}
+
+    def pin(self, key: str) -> None:
+        if not key or self.replica_engine is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._pins[key] = now + self.window
+            if len(self._pins) > 10000:
+                self._pins = {k: deadline for k, deadline in self._pins.items() if deadline > now}
+
+    def pinned(self, key: str) -> bool:
+        with self._lock:
+            deadline = self._pins.get(key)
+        return deadline is not None and deadline > time.monotonic()
+
+    def _replica_lag(self, conn) -> float:
+        if conn.dialect.name != "postgresql":
+            return 0.0
+        # 0 when everything received is replayed; otherwise age of the last replayed transaction
+        return float(conn.execute(text(
+            "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+            "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+        )).scalar() or 0)
+
+    def _set_health(self, healthy: bool) -> None:
+        with self._lock:
+            if self._healthy and not healthy:
+                self.counts["failovers"] += 1
+            self._healthy = healthy
+
+    def replica_healthy(self) -> bool:
+        """Cached health; one caller per REPLICA_CHECK_INTERVAL re-checks it."""
+        now = time.monotonic()
+        with self._lock:
+            if now < self._next_check:
+                return self._healthy
+            self._next_check = now + self.check_interval
+        try:
+            with self.replica_engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                lag = self._replica_lag(conn)
+            healthy = lag <= self.max_lag
+            if not healthy:
+                print(f"Replica lag {lag:.1f}s over {self.max_lag}s, reading from the primary")
+        except Exception as e:
+            print(f"Replica health check Error: {e}")
+            healthy = False
+        self._set_health(healthy)
+        return healthy
+
+    def mark_unhealthy(self) -> None:
+        """Fail over now; the next scheduled check may bring the replica back."""
+        self._set_health(False)
+        with self._lock:
+            self._next_check = time.monotonic() + self.check_interval
+
+    def pinned_until(self, read_after: float) -> bool:
+        """A deadline carried by the client; ignored if it reaches past one window from now."""
+        now = time.time()
+        return read_after is not None and now < read_after <= now + self.window
+
+    def use_replica(self, key: str, read_after: float = None) -> bool:
+        if self.replica_engine is None:
+            reason = "primary"
+        elif (key and self.pinned(key)) or self.pinned_until(read_after):
+            reason = "pinned"
+        elif not self.replica_healthy():
+            reason = "unhealthy"
+        else:
+            reason = "replica"
+        with self._lock:
+            self.counts[reason] += 1
+        return reason == "replica"
+
+    def stats(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "replica_configured": self.replica_engine is not None,
+                "replica_healthy": self._healthy,
+                "pinned_clients": sum(deadline > now for deadline in self._pins.values()),
+                "reads": dict(self.counts),
+            }
+
+read_router = ReadRouter(make_engine(_normalize_url(REPLICA_DATABASE_URL)) if REPLICA_DATABASE_URL else None)
+
+def read_routing_stats() -> dict:
+    return read_router.stats()
+
+@event.listens_for(Session, "after_commit")
+def _pin_after_commit(session):
+    # Tagged by get_read_db with the request's client key and state
+    read_router.pin(session.info.get("client_key"))
+    state = session.info.get("request_state")
+    if state is not None and read_router.replica_engine is not None:
+        state.read_after = time.time() + read_router.window
+
+def pin_client(request: Request, key: str) -> None:
+    """Pin a client after a write made without a tagged session, e.g. signup before it has a token."""
+    read_router.pin(key)
+    if read_router.replica_engine is not None:
+        request.state.read_after = time.time() + read_router.window
+
+class ReadYourWritesMiddleware:
+    """ASGI middleware handing a client that committed its read-after deadline (see above)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        state = scope.setdefault("state", {})
+
+        async def send_wrapper(message):
+            read_after = state.get("read_after")
+            if message["type"] == "http.response.start" and read_after:
+                value = f"{read_after:.3f}".encode()
+                cookie = b"%s=%s; Max-Age=%d; Path=/; HttpOnly; SameSite=Lax" % (
+                    READ_AFTER_COOKIE.encode(), value, max(1, round(read_router.window)))
+                message = {**message, "headers": [*(message.get("headers") or []),
+                                                  (b"x-read-after", value), (b"set-cookie", cookie)]}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+def client_key(request: Request):
+    authorization = request.headers.get("authorization") if request is not None else None
+    if authorization and authorization.lower().startswith("bearer "):
+        return authorization[7:].strip() or None
+    return None
+
+def read_after(request: Request):
+    value = request.headers.get("x-read-after") or request.cookies.get(READ_AFTER_COOKIE)
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+def get_read_db(request: Request, primary: Session = Depends(get_db)):
+    """A replica session for read-only dependencies, or the request's primary session (see above)."""
+    key = client_key(request)
+    # Commits through this request's primary session pin the client
+    primary.info["client_key"] = key
+    primary.info["request_state"] = request.state
+    if not read_router.use_replica(key, read_after(request)):
+        yield primary
+        return
+    db = read_router.replica_session()
+    try:
+        yield db
+    except DBAPIError:
+        read_router.mark_unhealthy()
+        raise
+    finally:
+        db.close()
+
+# Arbitrary key for the Postgres advisory lock that serializes schema creation
+SCHEMA_LOCK_KEY = 727001
+
+@contextmanager
+def _schema_file_lock():
+    path = os.path.join(tempfile.gettempdir(), "resume-api-schema.lock")
+    with open(path, "w") as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _add_missing_columns(conn):
+    """Additive migration: ALTER TABLE ... ADD COLUMN for model columns an existing table lacks.
+
+    create_all never alters existing tables, so nullable columns added to
+    the models later are back-filled here. Nothing is ever dropped or retyped.
+    """
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                column_type = column.type.compile(dialect=conn.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+
+def init_db(bind=None):
+    """Create missing tables and columns once, safely across concurrently starting workers.
+
+    Postgres serializes on an advisory lock, SQLite on a local file lock, and
+    create_all only issues CREATE for tables that do not exist yet. The
+    gunicorn master runs this before forking and sets SCHEMA_INITIALIZED so
+    workers skip it entirely.
+    """
+    if bind is None and os.getenv("SCHEMA_INITIALIZED") == "1":
+        return
+    import models  # noqa: F401  registers the tables on Base.metadata
+
+    bind = bind or engine
+    if bind.dialect.name == "postgresql":
+        with bind.begin() as conn:
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+            Base.metadata.create_all(bind=conn)
+            _add_missing_columns(conn)
+    else:
+        with _schema_file_lock(), bind.begin() as conn:
+            Base.metadata.create_all(bind=conn)
+            _add_missing_columns(conn)
@@ -0,0 +1,56 @@
+# Production serving config: gunicorn -c gunicorn.conf.py main:app
+import os
+
+
+def available_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS/Windows
+        return os.cpu_count() or 1
+
+
+def worker_count() -> int:
+    # PDF parsing is CPU-bound, so one worker per usable core
+    return int(os.getenv("WEB_CONCURRENCY", available_cpus()))
+
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = worker_count()
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Import the app once in the master so workers share its pages copy-on-write
+preload_app = True
+
+# Recycle workers to cap memory growth from parser leaks; jitter avoids
+# every worker restarting at the same moment
+max_requests = int(os.getenv("MAX_REQUESTS", 500))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", 50))
+
+# LLM calls routinely take tens of seconds
+timeout = int(os.getenv("WORKER_TIMEOUT", 120))
+graceful_timeout = 30
+keepalive = 5
+
+
+def on_starting(server):
+    """Create the schema and load heavy modules once in the master, before any worker exists."""
+    from database import init_db
+    from services.warmup import warm_up
+
+    init_db()
+    os.environ["SCHEMA_INITIALIZED"] = "1"
+    # Imported pages are then shared copy-on-write by every worker
+    warm_up()
+
+
+def post_fork(server, worker):
+    # Connections opened in the master must not be shared across processes
+    from database import engine
+
+    engine.dispose(close=False)
+    # Workers inherit the similarity index warm-up built in the master, which
+    # is stale by the time max_requests recycles one; catch it up off the request path
+    import threading
+    from services.similarity_index import warm_similarity_index
+
+    threading.Thread(target=warm_similarity_index, name="similarity-catch-up", daemon=True).start()
@@ -1,24 +1,59 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends, status
+from fastapi import FastAPI, UploadFile, File, Form, Header, HTTPException, Depends, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.orm import Session, load_only
+from contextlib import asynccontextmanager
+import orjson
 import os
+import time
 from dotenv import load_dotenv
-from services.resume_parser import parse_resume
-from services.ai_analyzer import analyze_resume_with_ai
+from services.resume_parser import parse_resume, get_sections
+from services.parser_pool import ParserError, parser_pool_stats, start_parser_pool, stop_parser_pool
+from services.ai_analyzer import ANALYSIS_DEPTHS, DEPTH_COST, DEPTH_MODELS, analyze_resume_with_ai, is_error_result
+from services.model_router import route_model, router_stats
+from services.json_repair import repair_summary
+from services.llm_usage import usage_meter
+from services.ats_scorer import score_resume
+from services.incremental import analyze_incremental, build_history, find_prior_analysis
+from services.exporter import MEDIA_TYPES, RENDER_VERSION, TEMPLATES, export_analysis
+from services.similarity_index import REUSE_THRESHOLD, index_analysis, nearest_same_target, similar_analyses
+from services.jd_preprocessor import get_jd_profile, jd_cache_stats, jd_fingerprint, prompt_job_description
+from services.skill_taxonomy import prune_present_skills
+from services.analytics import USAGE_GROUPS, analytics_summary, llm_usage_summary, record_analysis
+from services.write_behind import get_write_behind, pending_count, pending_tokens, start_write_behind, stop_write_behind
+from services.idempotency import IdempotencyError, claim_key, complete_key, release_key, request_hash
+from services.compression import COMPRESSION, CompressionMiddleware, compression_summary
+from services.conditional import analysis_etag, bump_analyses_version, etag_matches, user_etag
+from services.profiling import PROFILE_DIR, ProfilingMiddleware, list_reports, report_path
+from services.serialization import FastJSONResponse, validate_analysis, dump_analysis
+from services.warmup import start_warm_up, readiness
 from models import ResumeAnalysisResponse
 import models
 import auth
-from database import engine, get_db
-import json
+from database import ReadYourWritesMiddleware, get_db, get_read_db, init_db, pin_client, read_routing_stats
 
 load_dotenv()
 api_key = os.getenv("GROQ_API_KEY")
 
-# Create Database Tables
-models.Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create Database Tables (no-op when the gunicorn master already did it)
+    if os.getenv("RUN_MIGRATIONS_ON_STARTUP", "1") == "1":
+        init_db()
+    # Pre-fork the sandboxed parser workers before any threads start
+    start_parser_pool()
+    # Replays journals a crashed worker left behind before taking new writes
+    start_write_behind()
+    # Load parsers and the LLM SDK off the request path
+    start_warm_up()
+    yield
+    stop_write_behind()
+    stop_parser_pool()
 
-app = FastAPI(title="Resume Optimization API")
+app = FastAPI(title="Resume Optimization API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -26,12 +61,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Read-After"],
 )
 
+# Read-your-writes deadline for clients that just committed (database.get_read_db)
+app.add_middleware(ReadYourWritesMiddleware)
+
+# Negotiated gzip/brotli; inside the profiler so its cost shows up in reports
+if COMPRESSION:
+    app.add_middleware(CompressionMiddleware)
+
+# Opt-in request profiling; not installed at all unless PROFILE_DIR is set
+if PROFILE_DIR:
+    app.add_middleware(ProfilingMiddleware)
+
 # --- Auth Routes ---
 
 @app.post("/api/auth/signup", response_model=models.Token)
-def signup(user: models.UserCreate, db: Session = Depends(get_db)):
+def signup(user: models.UserCreate, request: Request, db: Session = Depends(get_db)):
     db_user = db.query(models.User).filter(models.User.email == user.email).first()
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
@@ -43,6 +90,8 @@ def signup(user: models.UserCreate, db: Session = Depends(get_db)):
     db.refresh(new_user)
     
     access_token = auth.create_access_token(data={"sub": new_user.email})
+    # The replica may not have the user yet when the client first uses its token
+    pin_client(request, access_token)
     return {"access_token": access_token, "token_type": "bearer"}
 
 @app.post("/api/auth/token", response_model=models.Token)
@@ -59,32 +108,151 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
     return {"access_token": access_token, "token_type": "bearer"}
 
 @app.get("/api/users/me", response_model=models.UserResponse)
-def read_users_me(current_user: models.User = Depends(auth.get_current_user), db: Session = Depends(get_db)):
-    usage_count = db.query(models.ResumeAnalysis).filter(models.ResumeAnalysis.user_id == current_user.id).count()
+def read_users_me(response: Response, if_none_match: str = Header(None),
+                  current_user: models.User = Depends(auth.get_current_user), db: Session = Depends(get_read_db)):
+    # Polled by the frontend: revalidate against the version stamp before counting anything
+    headers = {"ETag": user_etag(current_user, pending_count(current_user.id)), "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    usage_count = usage_units(db, current_user.id)
     return {
         "id": current_user.id,
         "email": current_user.email,
-        "usage_count": usage_count
+        "usage_count": usage_count,
+        "usage_tokens": usage_tokens(db, current_user.id) if QUOTA == "tokens" else None
     }
 
 # --- Protected Analysis Route ---
 
+# full: LLM analysis; fast: local keyword scoring only (no LLM, not stored);
+# progressive: NDJSON stream with the local pre-score first, then the LLM result;
+# parallel: scoring and per-section bullet rewrites as concurrent smaller LLM calls;
+# incremental: like parallel, reusing the user's previous rewrites for unchanged entries
+ANALYSIS_MODES = ("full", "fast", "progressive", "parallel", "incremental")
+# score and gaps (see ai_analyzer.ANALYSIS_DEPTHS) are single compact calls
+COMPACT_DEPTH_MODES = ("full", "progressive")
+# In full analyses; compact depths are charged DEPTH_COST of one
+USAGE_LIMIT = int(os.getenv("USAGE_LIMIT", 50))
+# QUOTA=tokens limits users by LLM prompt + completion tokens (from their analyses) instead
+QUOTA = os.getenv("QUOTA", "analyses")
+TOKEN_LIMIT = int(os.getenv("TOKEN_LIMIT", 2000000))
+
+def usage_units(db: Session, user_id: int) -> float:
+    # Stored rows (rows from before depths existed count as one) plus results
+    # still in the write-behind buffer, counted as full analyses until stored
+    stored = db.query(func.sum(func.coalesce(models.ResumeAnalysis.usage_cost, 1.0))) \
+        .filter(models.ResumeAnalysis.user_id == user_id).scalar() or 0
+    return round(stored + pending_count(user_id), 2)
+
+def usage_tokens(db: Session, user_id: int) -> int:
+    # From the rows themselves, not the best-effort llm_usage_daily ledger,
+    # plus the tokens of results still in the write-behind buffer
+    analysis = models.ResumeAnalysis
+    stored = db.query(func.sum(func.coalesce(analysis.prompt_tokens, 0) + func.coalesce(analysis.completion_tokens, 0))) \
+        .filter(analysis.user_id == user_id).scalar() or 0
+    return int(stored) + pending_tokens(user_id)
+
+def check_quota(db: Session, user_id: int, cost: float) -> None:
+    if QUOTA == "tokens":
+        if usage_tokens(db, user_id) >= TOKEN_LIMIT:
+            raise HTTPException(
+                status_code=403,
+                detail=f"Usage limit exceeded. You have used your {TOKEN_LIMIT} LLM tokens."
+            )
+        return
+    if usage_units(db, user_id) + cost > USAGE_LIMIT:
+        raise HTTPException(
+            status_code=403, 
+            detail=f"Usage limit exceeded. You have reached the maximum of {USAGE_LIMIT} resume analyses."
+        )
+
+def store_analysis(db: Session, user_id: int, resume_text: str, analysis_result,
+                   target_role: str = None, job_description: str = None, history: dict = None,
+                   depth: str = "rewrite", **extra) -> dict:
+    # Validate once; the same payload is stored and returned
+    analysis = validate_analysis(analysis_result, DEPTH_MODELS[depth])
+    if "missing_skills" in DEPTH_MODELS[depth].model_fields:
+        analysis.missing_skills = prune_present_skills(analysis.missing_skills, resume_text)
+    payload = dump_analysis(analysis)
+
+    # Store Result (Text Only - Efficient Storage)
+    columns = dict(
+        user_id=user_id,
+        original_text=resume_text,
+        analysis_json=payload,
+        target_role=target_role,
+        jd_hash=jd_fingerprint(job_description),
+        sections_json=history,
+        analysis_depth=depth,
+        usage_cost=DEPTH_COST[depth],
+    )
+    # Mode, model, route, latency and tokens of the LLM stage (Route.columns,
+    # UsageMeter.columns); upgrade overrides
+    columns.update(extra)
+    buffer = get_write_behind()
+    if buffer is not None:
+        # Journaled now, committed with the next batch
+        buffer.submit(**columns)
+        return payload
+    db_analysis = models.ResumeAnalysis(**columns)
+    db.add(db_analysis)
+    bump_analyses_version(db, [user_id])
+    db.commit()
+    index_analysis(db, db_analysis)
+    record_analysis(db, db_analysis)
+    return payload
+
+def ndjson_line(stage: str, **fields) -> bytes:
+    return orjson.dumps({"stage": stage, **fields}) + b"\n"
+
+async def progressive_analysis(db: Session, user_id: int, resume_text: str, sections: dict, target_role: str,
+                               job_description: str, jd_profile: dict, experience_level: str,
+                               latency_budget_ms: int = None, depth: str = "rewrite"):
+    pre_score = score_resume(resume_text, target_role, job_description, sections, jd_profile)
+    yield ndjson_line("pre_score", result=dump_analysis(validate_analysis(pre_score)))
+    try:
+        route = route_model(resume_text, job_description, "progressive", latency_budget_ms)
+        started = time.perf_counter()
+        with usage_meter() as meter:
+            analysis_result = await run_in_threadpool(
+                analyze_resume_with_ai,
+                text=resume_text,
+                target_role=target_role,
+                job_description=prompt_job_description(jd_profile, job_description),
+                experience_level=experience_level,
+                model=route.model,
+                depth=depth
+            )
+        payload = store_analysis(db, user_id, resume_text, analysis_result, target_role, job_description,
+                                 build_history(sections), depth, analysis_mode="progressive",
+                                 **route.columns(time.perf_counter() - started), **meter.columns())
+        yield ndjson_line("final", result=payload)
+    except Exception as e:
+        print(f"Error: {e}")
+        yield ndjson_line("error", detail=str(e))
+
 @app.post("/api/analyze-resume", response_model=ResumeAnalysisResponse)
 async def analyze_resume(
     target_role: str = Form(...),
     job_description: str = Form(None),
     experience_level: str = Form(None),
+    mode: str = Form("full"),
+    depth: str = Form("rewrite"),
+    reuse_similar: bool = Form(False),
+    latency_budget_ms: int = Form(None),
     resume_file: UploadFile = File(...),
+    idempotency_key: str = Header(None),
     current_user: models.User = Depends(auth.get_current_user),
     db: Session = Depends(get_db)
 ):
-    # 1. Check Usage Limit
-    usage_count = db.query(models.ResumeAnalysis).filter(models.ResumeAnalysis.user_id == current_user.id).count()
-    if usage_count >= 50:
-        raise HTTPException(
-            status_code=403, 
-            detail="Usage limit exceeded. You have reached the maximum of 50 resume analyses."
-        )
+    if mode not in ANALYSIS_MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid mode. Choose one of: {', '.join(ANALYSIS_MODES)}.")
+    if depth not in ANALYSIS_DEPTHS:
+        raise HTTPException(status_code=400, detail=f"Invalid depth. Choose one of: {', '.join(ANALYSIS_DEPTHS)}.")
+    if depth != "rewrite" and mode not in COMPACT_DEPTH_MODES:
+        raise HTTPException(status_code=400,
+                            detail=f"depth={depth} is only available in modes: {', '.join(COMPACT_DEPTH_MODES)}.")
 
     if not resume_file.filename.endswith(('.pdf', '.docx', '.doc')):
         raise HTTPException(status_code=400, detail="Invalid file format. Please upload PDF or DOCX.")
@@ -93,31 +261,322 @@ async def analyze_resume(
     if not contents:
         raise HTTPException(status_code=400, detail="File is empty.")
 
+    # Retries with the same Idempotency-Key replay the first response instead of
+    # re-running (and re-billing) the analysis. Streams cannot be replayed.
+    idempotent = idempotency_key is not None and mode != "progressive"
+    if idempotent:
+        fingerprint = request_hash(contents, filename=resume_file.filename, target_role=target_role,
+                                   job_description=job_description, experience_level=experience_level,
+                                   mode=mode, depth=depth, reuse_similar=reuse_similar,
+                                   latency_budget_ms=latency_budget_ms)
+        try:
+            replay = await claim_key(db, current_user.id, idempotency_key, fingerprint)
+        except IdempotencyError as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e))
+        if replay is not None:
+            return FastJSONResponse(content=replay.response_body, status_code=replay.status_code,
+                                    headers={"Idempotent-Replayed": "true"})
+
+    try:
+        response = await run_analysis(db, current_user, contents, resume_file.filename, target_role,
+                                      job_description, experience_level, mode, reuse_similar, latency_budget_ms,
+                                      depth)
+    except BaseException:
+        if idempotent:
+            release_key(db, current_user.id, idempotency_key)
+        raise
+    if idempotent:
+        complete_key(db, current_user.id, idempotency_key, response.status_code, response.body)
+    return response
+
+async def run_analysis(db: Session, current_user: models.User, contents: bytes, filename: str, target_role: str,
+                       job_description: str, experience_level: str, mode: str, reuse_similar: bool,
+                       latency_budget_ms: int = None, depth: str = "rewrite"):
+    # 1. Check Usage Limit
+    check_quota(db, current_user.id, DEPTH_COST[depth])
+
     try:
         # 2. Process Resume
-        resume_text = parse_resume(contents, resume_file.filename)
-        
-        analysis_result = analyze_resume_with_ai(
-            text=resume_text, 
-            target_role=target_role, 
-            job_description=job_description, 
-            experience_level=experience_level
-        )
+        resume_text = await run_in_threadpool(parse_resume, contents, filename)
+        sections = get_sections(contents, resume_text)
+        # Shared across users; prompts get the compact requirements instead of the raw posting
+        jd_profile = get_jd_profile(db, job_description)
+        prompt_jd = prompt_job_description(jd_profile, job_description)
+
+        if mode == "fast":
+            local_result = score_resume(resume_text, target_role, job_description, sections, jd_profile)
+            return FastJSONResponse(content=dump_analysis(validate_analysis(local_result)))
+
+        if mode == "progressive":
+            return StreamingResponse(
+                progressive_analysis(db, current_user.id, resume_text, sections, target_role, job_description,
+                                     jd_profile, experience_level, latency_budget_ms, depth),
+                media_type="application/x-ndjson",
+            )
 
-        # 3. Store Result (Text Only - Efficient Storage)
-        db_analysis = models.ResumeAnalysis(
-            user_id=current_user.id,
-            original_text=resume_text,
-            analysis_json=json.loads(json.dumps(analysis_result)), # Ensure it's JSON serialization compatible
+        neighbour, similarity = None, 0.0
+        if reuse_similar:
+            # Nearest of the user's own analyses for this role and JD
+            neighbour, similarity = nearest_same_target(db, resume_text, target_role, job_description,
+                                                        current_user.id)
+        # A compact result cannot stand in for a deeper one, nor a failed run for anything
+        if neighbour is not None and (not covers_depth(neighbour, depth)
+                                      or is_error_result(neighbour.analysis_json)):
+            neighbour, similarity = None, 0.0
+        if neighbour is not None and similarity >= REUSE_THRESHOLD:
+            # Stored for this text's history, but no LLM call was made: not charged
+            payload = store_analysis(db, current_user.id, resume_text, neighbour.analysis_json,
+                                     target_role, job_description, neighbour.sections_json, depth,
+                                     analysis_mode=mode, usage_cost=0.0)
+            return FastJSONResponse(content={
+                **payload, "reused_from": {"analysis_id": neighbour.id, "similarity": similarity},
+            })
+
+        # Model tier from input size, JD and mode, within the latency budget
+        route = route_model(resume_text, job_description, mode, latency_budget_ms)
+        started = time.perf_counter()
+        with usage_meter() as meter:
+            if mode in ("parallel", "incremental"):
+                prior = None
+                if mode == "incremental":
+                    # The closest previous version is a better base than the latest one
+                    prior = neighbour if neighbour is not None and neighbour.sections_json else \
+                        find_prior_analysis(db, current_user.id, target_role, job_description)
+                analysis_result, history, recomputed = await run_in_threadpool(
+                    analyze_incremental,
+                    prior,
+                    text=resume_text,
+                    sections=sections,
+                    target_role=target_role,
+                    job_description=prompt_jd,
+                    experience_level=experience_level,
+                    model=route.model
+                )
+            else:
+                analysis_result = analyze_resume_with_ai(
+                    text=resume_text, 
+                    target_role=target_role, 
+                    job_description=prompt_jd, 
+                    experience_level=experience_level,
+                    model=route.model,
+                    depth=depth
+                )
+                history, recomputed = build_history(sections), None
+
+        if mode == "incremental" and recomputed.get("replayed_from"):
+            # Same text as the prior analysis: its result is returned, nothing stored or charged
+            return FastJSONResponse(content={**analysis_result, "recomputed": recomputed})
+
+        # 3. Validate and store
+        payload = store_analysis(db, current_user.id, resume_text, analysis_result, target_role, job_description,
+                                 history, depth, analysis_mode=mode, **route.columns(time.perf_counter() - started),
+                                 **meter.columns())
+
+        if mode == "incremental":
+            return FastJSONResponse(content={**payload, "recomputed": recomputed})
+        return FastJSONResponse(content=payload)
+    except ParserError as e:
+        print(f"Parser Error ({e.reason}): {e}")
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        print(f"Error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def covers_depth(analysis: models.ResumeAnalysis, depth: str) -> bool:
+    stored = analysis.analysis_depth or "rewrite"
+    return ANALYSIS_DEPTHS.index(stored) >= ANALYSIS_DEPTHS.index(depth)
+
+@app.get("/api/analyses")
+def list_analyses(limit: int = 20, current_user: models.User = Depends(auth.get_current_user),
+                  db: Session = Depends(get_read_db)):
+    rows = (
+        db.query(models.ResumeAnalysis)
+        .options(load_only(models.ResumeAnalysis.target_role, models.ResumeAnalysis.analysis_json,
+                           models.ResumeAnalysis.analysis_depth, models.ResumeAnalysis.created_at))
+        .filter(models.ResumeAnalysis.user_id == current_user.id)
+        .order_by(models.ResumeAnalysis.id.desc())
+        .limit(max(1, min(limit, 100)))
+    )
+    return [
+        {
+            "analysis_id": row.id,
+            "target_role": row.target_role,
+            "depth": row.analysis_depth or "rewrite",
+            "overall_score": (row.analysis_json or {}).get("overall_score"),
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+        }
+        for row in rows
+    ]
+
+@app.post("/api/analyses/{analysis_id}/upgrade")
+async def upgrade_analysis(analysis_id: int, depth: str = Form("rewrite"), experience_level: str = Form(None),
+                           latency_budget_ms: int = Form(None),
+                           current_user: models.User = Depends(auth.get_current_user),
+                           db: Session = Depends(get_db)):
+    """Re-run a stored compact analysis at a deeper depth from its stored text; no upload needed."""
+    if depth not in ANALYSIS_DEPTHS:
+        raise HTTPException(status_code=400, detail=f"Invalid depth. Choose one of: {', '.join(ANALYSIS_DEPTHS)}.")
+    prior = db.get(models.ResumeAnalysis, analysis_id)
+    if prior is None or prior.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Analysis not found.")
+    prior_depth = prior.analysis_depth or "rewrite"
+    if covers_depth(prior, depth):
+        raise HTTPException(status_code=400, detail=f"Analysis is already at depth {prior_depth}.")
+    # Only the difference is charged: a score upgraded to a rewrite costs one rewrite in total
+    cost = round(DEPTH_COST[depth] - DEPTH_COST[prior_depth], 2)
+    check_quota(db, current_user.id, cost)
+
+    # The raw JD is not kept, but its preprocessed profile is, under the same hash
+    jd = db.get(models.JobDescription, prior.jd_hash) if prior.jd_hash else None
+    prompt_jd = prompt_job_description(jd.profile_json if jd is not None else None)
+    route = route_model(prior.original_text, prompt_jd, "full", latency_budget_ms)
+    started = time.perf_counter()
+    with usage_meter() as meter:
+        analysis_result = await run_in_threadpool(
+            analyze_resume_with_ai,
+            text=prior.original_text,
+            target_role=prior.target_role,
+            job_description=prompt_jd,
+            experience_level=experience_level,
+            model=route.model,
+            depth=depth
         )
-        db.add(db_analysis)
-        db.commit()
-        
-        return analysis_result
+    try:
+        payload = store_analysis(db, current_user.id, prior.original_text, analysis_result, prior.target_role,
+                                 None, prior.sections_json, depth, jd_hash=prior.jd_hash, usage_cost=cost,
+                                 upgraded_from=prior.id, analysis_mode="upgrade",
+                                 **route.columns(time.perf_counter() - started), **meter.columns())
     except Exception as e:
         print(f"Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    return FastJSONResponse(content={**payload, "upgraded_from": prior.id})
+
+def analysis_owner(db: Session, analysis_id: int):
+    # Ownership check without loading the large text/JSON columns
+    return db.query(models.ResumeAnalysis.user_id).filter(models.ResumeAnalysis.id == analysis_id).scalar()
+
+@app.get("/api/analyses/{analysis_id}")
+def read_analysis(analysis_id: int, if_none_match: str = Header(None),
+                  current_user: models.User = Depends(auth.get_current_user), db: Session = Depends(get_read_db)):
+    if analysis_owner(db, analysis_id) != current_user.id:
+        raise HTTPException(status_code=404, detail="Analysis not found.")
+    headers = {"ETag": analysis_etag(analysis_id), "Cache-Control": "private, max-age=86400"}
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    analysis = db.get(models.ResumeAnalysis, analysis_id)
+    return FastJSONResponse({
+        "id": analysis.id,
+        "target_role": analysis.target_role,
+        "created_at": analysis.created_at.isoformat() if analysis.created_at else None,
+        "analysis": analysis.analysis_json,
+    }, headers=headers)
+
+@app.get("/api/analyses/{analysis_id}/similar")
+def read_similar_analyses(analysis_id: int, k: int = 5, current_user: models.User = Depends(auth.get_current_user),
+                          db: Session = Depends(get_read_db)):
+    analysis = db.get(models.ResumeAnalysis, analysis_id)
+    if analysis is None or analysis.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Analysis not found.")
+    neighbours = similar_analyses(db, analysis.original_text, analysis.target_role, current_user.id,
+                                  k=max(1, min(k, 50)), exclude_ids=(analysis_id,))
+    return [
+        {
+            "analysis_id": row.id,
+            "similarity": similarity,
+            "target_role": row.target_role,
+            "overall_score": (row.analysis_json or {}).get("overall_score"),
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+        }
+        for row, similarity in neighbours
+    ]
+
+@app.get("/api/analyses/{analysis_id}/export")
+def export_resume(analysis_id: int, format: str = "pdf", template: str = "classic",
+                  if_none_match: str = Header(None), current_user: models.User = Depends(auth.get_current_user),
+                  db: Session = Depends(get_read_db)):
+    if format not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Invalid format. Choose one of: {', '.join(MEDIA_TYPES)}.")
+    if template not in TEMPLATES:
+        raise HTTPException(status_code=400, detail=f"Invalid template. Choose one of: {', '.join(TEMPLATES)}.")
+    if analysis_owner(db, analysis_id) != current_user.id:
+        raise HTTPException(status_code=404, detail="Analysis not found.")
+    headers = {"ETag": analysis_etag(analysis_id, template, format, RENDER_VERSION),
+               "Cache-Control": "private, max-age=86400"}
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    analysis = db.get(models.ResumeAnalysis, analysis_id)
+    markdown = (analysis.analysis_json or {}).get("optimized_resume_content")
+    if not markdown:
+        raise HTTPException(status_code=404, detail="This analysis has no optimized resume to export.")
+
+    _, data = export_analysis(analysis_id, markdown, template, format)
+    headers["Content-Disposition"] = f'attachment; filename="resume-{analysis_id}-{template}.{format}"'
+    return Response(content=data, media_type=MEDIA_TYPES[format], headers=headers)
 
 @app.get("/")
 def read_root():
     return {"message": "Resume Optimization API is running"}
+
+@app.get("/api/health/ready")
+def read_readiness():
+    state = readiness()
+    return JSONResponse(status_code=200 if state["ready"] else 503, content=state)
+
+@app.get("/api/health/jd-cache")
+def read_jd_cache_stats():
+    # Hit rate of the shared job-description cache and prompt tokens it saved
+    return jd_cache_stats()
+
+@app.get("/api/admin/analytics")
+def read_analytics(role: str = None, days: int = 30, top: int = 20,
+                   admin: models.User = Depends(auth.get_admin_user), db: Session = Depends(get_read_db)):
+    # Reads the rollup tables only, never analysis_json
+    return analytics_summary(db, role, days=max(1, min(days, 366)), top=max(1, min(top, 100)))
+
+@app.get("/api/admin/llm-usage")
+def read_llm_usage(group_by: str = "user", days: int = 30, top: int = 20,
+                   admin: models.User = Depends(auth.get_admin_user), db: Session = Depends(get_read_db)):
+    # Reads the llm_usage_daily ledger only
+    if group_by not in USAGE_GROUPS:
+        raise HTTPException(status_code=400, detail=f"Invalid group_by. Choose one of: {', '.join(USAGE_GROUPS)}.")
+    return llm_usage_summary(db, days=max(1, min(days, 366)), group_by=group_by, top=max(1, min(top, 100)))
+
+@app.get("/api/admin/profiles")
+def read_profiles(admin: models.User = Depends(auth.get_admin_user)):
+    # Newest first; see services/profiling.py for how requests get profiled
+    return list_reports()
+
+@app.get("/api/admin/profiles/{report_id}/{kind}")
+def read_profile_file(report_id: str, kind: str, admin: models.User = Depends(auth.get_admin_user)):
+    # kind: "folded" (collapsed stacks for flamegraphs) or "alloc" (top allocations)
+    path = report_path(report_id, kind)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile report not found.")
+    return FileResponse(path, media_type="text/plain", filename=f"{report_id}.{kind}.txt")
+
+@app.get("/api/health/write-behind")
+def read_write_behind_stats():
+    # Buffered, flushed and replayed analysis writes (disabled without WRITE_BEHIND_DIR)
+    buffer = get_write_behind()
+    return buffer.snapshot() if buffer is not None else {"enabled": False}
+
+@app.get("/api/health/compression")
+def compression_health():
+    return compression_summary()
+
+@app.get("/api/health/model-router")
+def model_router_health():
+    return router_stats()
+
+@app.get("/api/health/db-routing")
+def db_routing_health():
+    return read_routing_stats()
+
+@app.get("/api/health/llm-repair")
+def llm_repair_health():
+    return repair_summary()
+
+@app.get("/api/health/parser-pool")
+def read_parser_pool_stats():
+    # Jobs, timeouts, kills and recycles of the sandboxed parser workers
+    return parser_pool_stats()
@@ -0,0 +1,13 @@
+"""Explicit schema setup step, e.g. run once per deploy before starting workers:
+
+    python migrate.py
+"""
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from database import init_db
+
+if __name__ == "__main__":
+    init_db()
+    print("Database schema is up to date.")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, Float, String, Text, DateTime, ForeignKey, JSON, Index, LargeBinary
 from sqlalchemy.orm import relationship
 from database import Base
 import datetime
@@ -10,6 +10,8 @@ class User(Base):
     email = Column(String, unique=True, index=True)
     hashed_password = Column(String)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    # Bumped with every stored analysis; the ETag of /api/users/me
+    analyses_version = Column(Integer, default=0)
 
     analyses = relationship("ResumeAnalysis", back_populates="owner")
 
@@ -21,11 +23,94 @@ class ResumeAnalysis(Base):
     original_text = Column(Text) # Storing extracted text to save space
     analysis_json = Column(JSON) # Storing the AI result
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    target_role = Column(String, nullable=True)
+    jd_hash = Column(String(64), nullable=True) # Normalized job description fingerprint
+    sections_json = Column(JSON, nullable=True) # Segmented sections + per-entry rewrites, for incremental re-analysis
+    write_id = Column(String(32), nullable=True, index=True) # Write-behind journal id, makes replays idempotent
+    llm_model = Column(String, nullable=True) # Model the router picked; None when no LLM call was made
+    llm_route = Column(String, nullable=True) # "<tier>: <reason>", for evaluating routing policies offline
+    llm_latency_ms = Column(Integer, nullable=True) # Observed latency of the LLM stage
+    analysis_depth = Column(String(16), nullable=True) # score, gaps or rewrite; None (older rows) is rewrite
+    usage_cost = Column(Float, nullable=True) # Quota charged, in full analyses; None counts as 1
+    upgraded_from = Column(Integer, nullable=True) # The compact analysis this one upgraded
+    analysis_mode = Column(String(16), nullable=True) # Request mode (full, parallel, ...) or "upgrade"
+    llm_calls = Column(Integer, nullable=True) # Completions made, follow-ups and section calls included
+    prompt_tokens = Column(Integer, nullable=True) # Summed over llm_calls, as reported by the provider
+    completion_tokens = Column(Integer, nullable=True)
 
     owner = relationship("User", back_populates="analyses")
 
+class JobDescription(Base):
+    __tablename__ = "job_descriptions"
+
+    # Preprocessed job descriptions, shared across users
+    content_hash = Column(String(64), primary_key=True) # jd_fingerprint of the raw text
+    profile_version = Column(Integer)
+    profile_json = Column(JSON) # Requirements profile incl. the compact prompt text
+    raw_tokens = Column(Integer)
+    compact_tokens = Column(Integer)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+# Analytics rollups, updated best-effort right after each ResumeAnalysis commit
+# (services/analytics.py); python -m services.analytics rebuilds them.
+# role is the normalized target role; "*" aggregates all roles.
+class AnalyticsDaily(Base):
+    __tablename__ = "analytics_daily"
+
+    day = Column(String(10), primary_key=True) # UTC date, YYYY-MM-DD
+    analyses = Column(Integer, default=0)
+    score_sum = Column(Integer, default=0)
+
+class AnalyticsScoreBucket(Base):
+    __tablename__ = "analytics_score_buckets"
+
+    role = Column(String(100), primary_key=True)
+    bucket = Column(Integer, primary_key=True) # overall_score // 10, 100 lands in bucket 10
+    analyses = Column(Integer, default=0)
+
+class AnalyticsSkillCounter(Base):
+    __tablename__ = "analytics_skill_counters"
+
+    # Space-Saving heavy-hitters sketch of missing_skills, bounded per role
+    role = Column(String(100), primary_key=True)
+    skill = Column(String(100), primary_key=True)
+    count = Column(Integer, default=0)
+    error = Column(Integer, default=0) # overestimate inherited from the evicted skill
+
+    __table_args__ = (Index("ix_analytics_skill_counters_role_count", "role", "count"),)
+
+class LlmUsageDaily(Base):
+    __tablename__ = "llm_usage_daily"
+
+    # LLM spend ledger: one row per day, user, role, mode and model
+    day = Column(String(10), primary_key=True) # UTC date, YYYY-MM-DD
+    user_id = Column(Integer, primary_key=True)
+    role = Column(String(100), primary_key=True)
+    mode = Column(String(16), primary_key=True)
+    model = Column(String(100), primary_key=True)
+    analyses = Column(Integer, default=0)
+    calls = Column(Integer, default=0)
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    latency_ms = Column(Integer, default=0) # Summed LLM stage latency
+
+    __table_args__ = (Index("ix_llm_usage_daily_user_id", "user_id"),)
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    # Client-supplied Idempotency-Key of an analyze request, scoped to the user
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64)) # Form fields + file content; a reused key must match
+    status = Column(String(16)) # pending | done
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(LargeBinary, nullable=True) # Replayed byte for byte
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    expires_at = Column(DateTime, index=True)
+
 # Pydantic Models for Response/Request
-from pydantic import BaseModel
+from pydantic import BaseModel, create_model
 from typing import Optional, List
 
 class UserCreate(BaseModel):
@@ -51,10 +136,25 @@ class ResumeAnalysisResponse(BaseModel):
     final_suggestions: str
     optimized_resume_content: str
 
+def _analysis_subset(name: str, fields: tuple):
+    # Compact response models keep ResumeAnalysisResponse's field types, so the
+    # full result always validates as any of them
+    return create_model(name, **{field: (ResumeAnalysisResponse.model_fields[field].annotation, ...)
+                                 for field in fields})
+
+# depth=score: the fit score and a short justification
+ScoreAnalysisResponse = _analysis_subset("ScoreAnalysisResponse", ("overall_score", "role_alignment_feedback"))
+# depth=gaps: everything except the rewritten bullets and resume
+GapAnalysisResponse = _analysis_subset("GapAnalysisResponse", (
+    "overall_score", "strengths", "weaknesses", "ats_issues", "role_alignment_feedback", "missing_skills",
+    "final_suggestions",
+))
+
 class UserResponse(BaseModel):
     id: int
     email: str
-    usage_count: int = 0
+    usage_count: float = 0 # Quota used, in full analyses (compact depths count fractionally)
+    usage_tokens: Optional[int] = None # LLM tokens used, when the quota is token-based
     
     class Config:
         from_attributes = True
@@ -1,26 +1,94 @@
-from groq import Groq
 import os
 import json
+import time
+from services.lazy import lazy_import
+from services.json_repair import coerce_fields, parse_llm_json, record_repair
+from services.llm_stub import StubClient
+from services.llm_usage import completion_tokens, record_call
+from services.model_router import latency_tracker
 from services.resume_parser import parse_resume
-from models import ResumeAnalysisResponse
+from models import GapAnalysisResponse, ResumeAnalysisResponse, ScoreAnalysisResponse
 
-def analyze_resume_with_ai(text: str, target_role: str, job_description: str = None, experience_level: str = None) -> dict:
-    client = Groq(
+groq = lazy_import("groq")
+
+MODEL = "openai/gpt-oss-120b"
+
+def create_client():
+    # LLM_BACKEND=stub runs against the local stand-in (benchmarks, offline dev)
+    if os.getenv("LLM_BACKEND") == "stub":
+        return StubClient()
+    return groq.Groq(
         api_key=os.getenv("GROQ_API_KEY"),
     )
 
-    prompt = f"""
+def complete(client, prompt: str, model: str = None):
+    """One JSON-mode chat completion; its latency feeds the model router, its tokens the usage meter."""
+    model = model or MODEL
+    started = time.perf_counter()
+    try:
+        completion = client.chat.completions.create(
+            messages=[
+                {
+                    "role": "user",
+                    "content": prompt,
+                }
+            ],
+            model=model,
+            response_format={"type": "json_object"},
+        )
+    finally:
+        # Failures count too: a timeout is the slowest call of all
+        latency_tracker.observe(model, time.perf_counter() - started)
+    record_call(completion, prompt)
+    return completion
+
+def complete_json(client, prompt: str, model: str = None) -> dict:
+    # Tolerates fences, trailing commas and truncation (see services.json_repair)
+    return parse_llm_json(complete(client, prompt, model).choices[0].message.content)
+
+def error_result(e: Exception) -> dict:
+    return {
+        "overall_score": 0,
+        "strengths": [],
+        "weaknesses": ["AI Analysis Failed"],
+        "ats_issues": [],
+        "role_alignment_feedback": "Could not analyze resume due to an error.",
+        "optimized_bullets": [],
+        "missing_skills": [],
+        "final_suggestions": f"Error: {str(e)}",
+        "optimized_resume_content": "Could not generate resume."
+    }
+
+def is_error_result(analysis: dict) -> bool:
+    """Whether a stored result is the error_result placeholder of a failed analysis."""
+    analysis = analysis or {}
+    return analysis.get("weaknesses") == ["AI Analysis Failed"] and not analysis.get("overall_score")
+
+# Analysis depths, cheapest first. Compact depths ask only for their own
+# fields, so the model never generates the rewritten resume, which is most
+# of the output tokens and therefore most of the latency.
+ANALYSIS_DEPTHS = ("score", "gaps", "rewrite")
+DEPTH_MODELS = {
+    "score": ScoreAnalysisResponse,
+    "gaps": GapAnalysisResponse,
+    "rewrite": ResumeAnalysisResponse,
+}
+# Share of one full analysis each depth is charged against the usage quota
+DEPTH_COST = {"score": 0.2, "gaps": 0.5, "rewrite": 1.0}
+
+ROLE = """
     <Role>
     You are a Brutally Honest Job Fit Analyzer and Elite Career Strategist. You specialize in recruitment, HR practices, and ATS optimization. You provide candid, evidence-based assessments of job fit without sugar-coating, while also possessing the capability to strategies optimize resumes to close those gaps.
     </Role>
+"""
 
+CONTEXT = """
     <Context>
-    The job market is highly competitive. Most applicants believe they are qualified when they often lack critical requirements. Honest feedback is rare but valuable. You must cut through the noise and tell the user exactly where they stand (0-100%) and then do your absolute best to rewrite their resume to maximize their chances.
+    The job market is highly competitive. Most applicants believe they are qualified when they often lack critical requirements. Honest feedback is rare but valuable. You must cut through the noise and tell the user exactly where they stand (0-100%){rewrite}.
     </Context>
+"""
 
-    <Instructions>
-    Analyze and transform the user's career materials through this methodology:
-
+FIT_ANALYSIS = """
     1. FIT ANALYSIS & SCORING
        - Parse the JD to identify essential requirements vs. nice-to-haves.
        - Identify exact matches and critical gaps.
@@ -29,7 +97,21 @@ def analyze_resume_with_ai(text: str, target_role: str, job_description: str = N
             - < 60%: POOR FIT. Missing critical skills/experience.
             - 60-79%: MODERATE FIT. Has potential but significant gaps exist.
             - 80-100%: STRONG FIT. Meets most/all requirements.
+"""
 
+INSTRUCTIONS = {
+    "score": FIT_ANALYSIS + """
+    2. BREVITY
+       - Justify the score in two or three sentences.
+       - Do NOT rewrite the resume or any bullet points.
+""",
+    "gaps": FIT_ANALYSIS + """
+    2. GAP ANALYSIS
+       - Identify critical improvement areas sorted by impact priority.
+       - List the requirements the resume does not evidence, and the ATS issues that would hide the rest.
+       - Do NOT rewrite the resume or any bullet points; keep every item to one sentence.
+""",
+    "rewrite": FIT_ANALYSIS + """
     2. STRATEGIC OPTIMIZATION
        - Regardless of the score, optimize the resume to maximize the score as much as possible.
        - Evaluate resume structure, content strength, and ATS compatibility.
@@ -55,14 +137,66 @@ def analyze_resume_with_ai(text: str, target_role: str, job_description: str = N
     4. IMPLEMENTATION GUIDANCE
        - Provide comprehensive explanation of all changes with rationale.
        - Explain how updates improve alignment with the job description.
-    </Instructions>
+""",
+}
 
-    <Constraints>
-    - Must maintain truthfulness about the user's experience while presenting it optimally.
-    - Avoid complex formatting elements that disrupt ATS parsing.
-    - All advice must be actionable and specific to the user's situation.
+ATS_CONSTRAINT = """
+    - Avoid complex formatting elements that disrupt ATS parsing."""
+MARKDOWN_CONSTRAINTS = """
     - Deliverables must be formatted in markdown for easy copying.
-    - Ensure no repeated action verbs across bullet points.
+    - Ensure no repeated action verbs across bullet points."""
+
+# One line of the <Output_Format> skeleton per response field
+OUTPUT_FIELDS = {
+    "overall_score": '<int, 0-100, your evidence-based Job Fit Score (as per criteria)>',
+    "strengths": '[<list of strings, specific matches found>]',
+    "weaknesses": '[<list of strings, critical gaps or mismatches found>]',
+    "ats_issues": '[<list of strings, formatting/keyword issues>]',
+    "role_alignment_feedback": '"<string, Detailed analysis of fit and alignment with role requirements>"',
+    "optimized_bullets": '[<list of strings, rewritten bullet points using XYZ formula as per instructions>]',
+    "missing_skills": '[<list of strings, critical keywords from the JD or Industry Standards that are missing>]',
+    "final_suggestions": '"<string, summary of the Strategic Assessment and Implementation Guidance>"',
+    "optimized_resume_content": '"<string, THE COMPLETE RESTRUCTURED RESUME IN MARKDOWN FORMAT. Follow this structure strictly:\n\n# NAME\n**Title** | **Location** | **Email** | **Phone** | **Links**\n\n## SUMMARY\n(Paragraph)\n\n## EXPERIENCE\n**Role** at **Company** (Date Range)\n* Bullet point...\n\n(IMPORTANT: Use a blank line here before the next job)\n**Role** at **Company** (Date Range)\n* Bullet point...\n\n## PROJECTS\n**Title** (Technologies used)\n* Bullet point...\n\n## SKILLS\n* **Category**: Skills...\n\n## EDUCATION\n**Degree** | **University** (Dates)\n\n(IMPORTANT: Include ## CERTIFICATIONS section ONLY if the user has valid certifications in their input resume. If none, OMIT this entire section.)\n## CERTIFICATIONS\n* **Name** (Issuer, Date)\n\nDo NOT use code blocks.>"',
+}
+COMPACT_FIELDS = {
+    "role_alignment_feedback": '"<string, two or three sentences on fit with the role requirements>"',
+    "final_suggestions": '"<string, the highest-impact changes to make, in priority order>"',
+}
+
+
+def output_format(depth: str, fields=None) -> str:
+    fields = fields or DEPTH_MODELS[depth].model_fields
+    skeleton = COMPACT_FIELDS if depth != "rewrite" else {}
+    lines = [f'      "{field}": {skeleton.get(field, OUTPUT_FIELDS[field])}' for field in fields]
+    return "{\n" + ",\n".join(lines) + "\n    }"
+
+
+def previous_answer(known: dict) -> str:
+    # Follow-ups see the fields already salvaged so the rest stays consistent;
+    # long ones (the rewritten resume) are left out to keep the prompt small
+    shown = {field: value for field, value in known.items() if len(json.dumps(value)) <= 1500}
+    return f"""
+    <Previous_Answer>
+    Your previous answer was cut off. You already returned these fields; return ONLY the fields in the format below, consistent with them:
+    {json.dumps(shown, indent=2)}
+    </Previous_Answer>
+"""
+
+
+def analysis_prompt(text: str, target_role: str, job_description: str = None, experience_level: str = None,
+                    depth: str = "rewrite", fields: list = None, known: dict = None) -> str:
+    """The analysis prompt for a depth; `fields` narrows the output to a follow-up for missing fields."""
+    rewrite = depth == "rewrite"
+    context = CONTEXT.format(rewrite=" and then do your absolute best to rewrite their resume to maximize their "
+                             "chances" if rewrite else "")
+    return f"""{ROLE}{context}
+    <Instructions>
+    Analyze {"and transform " if rewrite else ""}the user's career materials through this methodology:
+{INSTRUCTIONS[depth]}    </Instructions>
+
+    <Constraints>
+    - Must maintain truthfulness about the user's experience while presenting it optimally.{ATS_CONSTRAINT if rewrite else ""}
+    - All advice must be actionable and specific to the user's situation.{MARKDOWN_CONSTRAINTS if rewrite else ""}
     - Final output must be STRICTLY valid JSON as per the schema below.
     </Constraints>
 
@@ -73,47 +207,66 @@ def analyze_resume_with_ai(text: str, target_role: str, job_description: str = N
     Resume Content:
     {text}
     </User_Input>
-
+{previous_answer(known) if fields else ""}
     <Output_Format>
     Analyze the resume and return the result STRICTLY in the following JSON format:
-    {{
-      "overall_score": <int, 0-100, your evidence-based Job Fit Score (as per criteria)>,
-      "strengths": [<list of strings, specific matches found>],
-      "weaknesses": [<list of strings, critical gaps or mismatches found>],
-      "ats_issues": [<list of strings, formatting/keyword issues>],
-      "role_alignment_feedback": "<string, Detailed analysis of fit and alignment with role requirements>",
-      "optimized_bullets": [<list of strings, rewritten bullet points using XYZ formula as per instructions>],
-      "missing_skills": [<list of strings, critical keywords from the JD or Industry Standards that are missing>],
-      "final_suggestions": "<string, summary of the Strategic Assessment and Implementation Guidance>",
-      "optimized_resume_content": "<string, THE COMPLETE RESTRUCTURED RESUME IN MARKDOWN FORMAT. Follow this structure strictly:\n\n# NAME\n**Title** | **Location** | **Email** | **Phone** | **Links**\n\n## SUMMARY\n(Paragraph)\n\n## EXPERIENCE\n**Role** at **Company** (Date Range)\n* Bullet point...\n\n(IMPORTANT: Use a blank line here before the next job)\n**Role** at **Company** (Date Range)\n* Bullet point...\n\n## PROJECTS\n**Title** (Technologies used)\n* Bullet point...\n\n## SKILLS\n* **Category**: Skills...\n\n## EDUCATION\n**Degree** | **University** (Dates)\n\n(IMPORTANT: Include ## CERTIFICATIONS section ONLY if the user has valid certifications in their input resume. If none, OMIT this entire section.)\n## CERTIFICATIONS\n* **Name** (Issuer, Date)\n\nDo NOT use code blocks.>"
-    }}
+    {output_format(depth, fields)}
     </Output_Format>
     """
 
+
+def salvage_analysis(client, completion, prompt_args: dict, model: str = None, depth: str = "rewrite") -> dict:
+    """The analysis from a completion, repairing what it can and re-requesting only missing fields.
+
+    Raises ValueError when nothing usable came back or the follow-up did not
+    supply the missing fields; the caller falls back to the error result.
+    """
+    response_model = DEPTH_MODELS[depth]
+    content = completion.choices[0].message.content
+    spent = completion_tokens(completion)
     try:
-        completion = client.chat.completions.create(
-            messages=[
-                {
-                    "role": "user",
-                    "content": prompt,
-                }
-            ],
-            model="openai/gpt-oss-120b",
-            response_format={"type": "json_object"},
-        )
-        
-        content = completion.choices[0].message.content
-        return json.loads(content)
+        data, clean = json.loads(content), True
+    except (TypeError, ValueError):
+        clean = False
+        try:
+            data = parse_llm_json(content)
+        except ValueError:
+            record_repair("failed")
+            raise
+    values, missing = coerce_fields(data, response_model)
+    if not missing:
+        clean = clean and all(values[field] == data[field] for field in values)
+        # A full retry would have generated the whole answer again
+        record_repair("clean" if clean else "repaired", tokens_saved=0 if clean else spent)
+        return values
+    if len(missing) == len(response_model.model_fields):
+        record_repair("failed")
+        raise ValueError("No usable fields in the model output")
+
+    followup = complete(client, analysis_prompt(**prompt_args, depth=depth, fields=missing, known=values), model)
+    followup_tokens = completion_tokens(followup)
+    try:
+        extra, _ = coerce_fields(parse_llm_json(followup.choices[0].message.content), response_model)
+    except ValueError:
+        extra = {}
+    values.update({field: extra[field] for field in missing if field in extra})
+    still_missing = [field for field in missing if field not in values]
+    if still_missing:
+        record_repair("failed", followup_tokens=followup_tokens)
+        raise ValueError(f"Model output is missing fields: {', '.join(still_missing)}")
+    record_repair("followups", tokens_saved=spent - followup_tokens, followup_tokens=followup_tokens)
+    return values
+
+
+def analyze_resume_with_ai(text: str, target_role: str, job_description: str = None, experience_level: str = None,
+                           model: str = None, depth: str = "rewrite") -> dict:
+    client = create_client()
+    prompt_args = dict(text=text, target_role=target_role, job_description=job_description,
+                       experience_level=experience_level)
+
+    try:
+        completion = complete(client, analysis_prompt(**prompt_args, depth=depth), model)
+        return salvage_analysis(client, completion, prompt_args, model, depth)
     except Exception as e:
         print(f"AI Analysis Error: {e}")
-        return {
-            "overall_score": 0,
-            "strengths": [],
-            "weaknesses": ["AI Analysis Failed"],
-            "ats_issues": [],
-            "role_alignment_feedback": "Could not analyze resume due to an error.",
-            "optimized_bullets": [],
-            "missing_skills": [],
-            "final_suggestions": f"Error: {str(e)}",
-            "optimized_resume_content": "Could not generate resume."
-        }
+        return error_result(e)
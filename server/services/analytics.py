@@ -0,0 +1,253 @@
+import datetime
+import os
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import postgresql, sqlite
+import models
+from services.ai_analyzer import is_error_result
+
+# Dashboard rollups. Every stored analysis bumps a per-day counter, a score
+# histogram bucket and a bounded heavy-hitters sketch of its missing_skills,
+# for its role and for "*" (all roles). The admin endpoint reads only these
+# small tables, so its cost does not grow with resume_analyses. They are
+# updated right after the analysis commits, in a separate best-effort
+# transaction, so a failure can leave them behind the table; backfill()
+# rebuilds them from analysis_json when they are new or suspected to drift.
+# The same pass adds the analysis's LLM calls, tokens and latency to the
+# llm_usage_daily ledger, keyed by day, user, role, mode and model.
+
+ALL_ROLES = "*"
+NO_ROLE = "(none)"
+# Space-Saving keeps at most this many skills per role; any skill with a true
+# count above total/SKETCH_CAPACITY is guaranteed to be in the sketch
+SKETCH_CAPACITY = int(os.getenv("ANALYTICS_SKETCH_CAPACITY", 200))
+KEY_LENGTH = 100
+USAGE_GROUPS = ("user", "role", "mode", "model", "day")
+
+
+def role_key(target_role: str) -> str:
+    role = " ".join((target_role or "").lower().split())[:KEY_LENGTH]
+    return role if role and role != ALL_ROLES else NO_ROLE
+
+
+def skill_key(skill: str) -> str:
+    return " ".join(str(skill).lower().split())[:KEY_LENGTH]
+
+
+def score_bucket(score: int) -> int:
+    return max(0, min(int(score), 100)) // 10
+
+
+def _increment(db, model, keys: dict, **amounts) -> None:
+    """INSERT ... ON CONFLICT DO UPDATE adding `amounts` to the row at `keys`."""
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(model).values(**keys, **amounts)
+    columns = model.__table__.c
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={name: columns[name] + getattr(stmt.excluded, name) for name in amounts},
+    )
+    db.execute(stmt)
+
+
+def _evict(db, role: str, skill: str, smallest) -> None:
+    """The new skill takes over the `smallest` counter and inherits its count as error."""
+    counter = models.AnalyticsSkillCounter
+    try:
+        with db.begin_nested():
+            db.query(counter).filter(
+                counter.role == role, counter.skill == smallest.skill, counter.count == smallest.count,
+            ).update({counter.skill: skill, counter.count: smallest.count + 1, counter.error: smallest.count},
+                     synchronize_session=False)
+    except IntegrityError:
+        # Another worker added a counter for this skill since we looked
+        _increment(db, counter, {"role": role, "skill": skill}, count=1, error=0)
+
+
+def _count_skills(db, role: str, skills: list) -> None:
+    """Space-Saving update for one analysis's skills, in a fixed number of queries per role."""
+    if not skills:
+        return
+    counter = models.AnalyticsSkillCounter
+    in_role = db.query(counter).filter(counter.role == role)
+    present = {row.skill for row in in_role.filter(counter.skill.in_(skills)).with_entities(counter.skill)}
+    if present:
+        in_role.filter(counter.skill.in_(present)).update({counter.count: counter.count + 1},
+                                                          synchronize_session=False)
+    new = [skill for skill in skills if skill not in present]
+    if not new:
+        return
+    free = max(0, SKETCH_CAPACITY - in_role.with_entities(func.count()).scalar())
+    for skill in new[:free]:
+        _increment(db, counter, {"role": role, "skill": skill}, count=1, error=0)
+    # Sketch full: each remaining skill takes over one of the smallest counters
+    evicted = new[free:]
+    if evicted:
+        smallest = (in_role.filter(counter.skill.notin_(skills))
+                    .order_by(counter.count, counter.skill).limit(len(evicted)).all())
+        for skill, row in zip(evicted, smallest):
+            _evict(db, role, skill, row)
+
+
+def _record(db, target_role: str, analysis_json: dict, created_at: datetime.datetime) -> None:
+    analysis_json = analysis_json or {}
+    if is_error_result(analysis_json):
+        return  # a failed analysis has no score or gaps; its LLM usage is still recorded
+    score = analysis_json.get("overall_score")
+    if score is not None:
+        # Counted together, so the daily average only covers scored analyses
+        _increment(db, models.AnalyticsDaily, {"day": created_at.strftime("%Y-%m-%d")},
+                   analyses=1, score_sum=int(score))
+    skills = sorted({skill_key(skill) for skill in analysis_json.get("missing_skills") or [] if str(skill).strip()})
+    for role in (ALL_ROLES, role_key(target_role)):
+        if score is not None:
+            _increment(db, models.AnalyticsScoreBucket, {"role": role, "bucket": score_bucket(score)}, analyses=1)
+        _count_skills(db, role, skills)
+
+
+def _record_usage(db, row, created_at: datetime.datetime) -> None:
+    if not row.llm_calls:
+        return  # local scoring, reused neighbours and rows from before the ledger
+    keys = {"day": created_at.strftime("%Y-%m-%d"), "user_id": row.user_id, "role": role_key(row.target_role),
+            "mode": row.analysis_mode or "full", "model": (row.llm_model or "unknown")[:KEY_LENGTH]}
+    _increment(db, models.LlmUsageDaily, keys, analyses=1, calls=row.llm_calls,
+               prompt_tokens=row.prompt_tokens or 0, completion_tokens=row.completion_tokens or 0,
+               latency_ms=row.llm_latency_ms or 0)
+
+
+def record_analysis(db, analysis: models.ResumeAnalysis) -> None:
+    """Fold a freshly stored analysis into the rollups; failures never block the request."""
+    try:
+        created_at = analysis.created_at or datetime.datetime.utcnow()
+        _record(db, analysis.target_role, analysis.analysis_json, created_at)
+        _record_usage(db, analysis, created_at)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Analytics rollup update failed: {e}")
+
+
+def backfill(db, batch_size: int = 1000) -> int:
+    """Rebuild every rollup from stored analyses in one transaction; returns rows replayed."""
+    for model in (models.AnalyticsDaily, models.AnalyticsScoreBucket, models.AnalyticsSkillCounter,
+                  models.LlmUsageDaily):
+        db.query(model).delete(synchronize_session=False)
+    replayed, last_id = 0, 0
+    analysis = models.ResumeAnalysis
+    while True:
+        rows = (
+            db.query(analysis.id, analysis.user_id, analysis.target_role, analysis.analysis_json, analysis.created_at,
+                     analysis.analysis_mode, analysis.llm_model, analysis.llm_calls, analysis.prompt_tokens,
+                     analysis.completion_tokens, analysis.llm_latency_ms)
+            .filter(analysis.id > last_id)
+            .order_by(analysis.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+        for row in rows:
+            created_at = row.created_at or datetime.datetime.utcnow()
+            _record(db, row.target_role, row.analysis_json, created_at)
+            _record_usage(db, row, created_at)
+        replayed += len(rows)
+        last_id = rows[-1].id
+    db.commit()
+    return replayed
+
+
+def analytics_summary(db, role: str = None, days: int = 30, top: int = 20) -> dict:
+    """Dashboard data read from the rollup tables only."""
+    role = role_key(role) if role else ALL_ROLES
+    since = (datetime.datetime.utcnow() - datetime.timedelta(days=days - 1)).strftime("%Y-%m-%d")
+    daily = (
+        db.query(models.AnalyticsDaily)
+        .filter(models.AnalyticsDaily.day >= since)
+        .order_by(models.AnalyticsDaily.day)
+        .all()
+    )
+    histogram = [0] * 11
+    for bucket in db.query(models.AnalyticsScoreBucket).filter(models.AnalyticsScoreBucket.role == role):
+        histogram[bucket.bucket] = bucket.analyses
+    counter = models.AnalyticsSkillCounter
+    skills = (
+        db.query(counter)
+        .filter(counter.role == role)
+        .order_by(counter.count.desc(), counter.skill)
+        .limit(top)
+        .all()
+    )
+    bucket = models.AnalyticsScoreBucket
+    roles = (
+        db.query(bucket.role, func.sum(bucket.analyses).label("analyses"))
+        .filter(bucket.role != ALL_ROLES)
+        .group_by(bucket.role)
+        .order_by(func.sum(bucket.analyses).desc())
+        .limit(top)
+        .all()
+    )
+    return {
+        "role": role,
+        "analyses": sum(histogram),
+        "per_day": [
+            {"day": row.day, "analyses": row.analyses,
+             "average_score": round(row.score_sum / row.analyses, 1) if row.analyses else None}
+            for row in daily
+        ],
+        # Bucket i counts scores in [10 * i, 10 * i + 9]; the last bucket is exactly 100
+        "score_histogram": histogram,
+        # Counts can overestimate by at most `error` once the sketch has evicted skills
+        "top_missing_skills": [{"skill": row.skill, "count": row.count, "error": row.error} for row in skills],
+        "top_roles": [{"role": row.role, "analyses": int(row.analyses)} for row in roles],
+    }
+
+
+def llm_usage_summary(db, days: int = 30, group_by: str = "user", top: int = 20) -> dict:
+    """LLM calls, tokens and latency from the ledger, grouped by user, role, mode, model or day."""
+    ledger = models.LlmUsageDaily
+    since = (datetime.datetime.utcnow() - datetime.timedelta(days=days - 1)).strftime("%Y-%m-%d")
+    key = {"user": ledger.user_id, "role": ledger.role, "mode": ledger.mode, "model": ledger.model,
+           "day": ledger.day}[group_by]
+    sums = (
+        func.sum(ledger.analyses).label("analyses"),
+        func.sum(ledger.calls).label("calls"),
+        func.sum(ledger.prompt_tokens).label("prompt_tokens"),
+        func.sum(ledger.completion_tokens).label("completion_tokens"),
+        func.sum(ledger.latency_ms).label("latency_ms"),
+    )
+    query = db.query(key.label("key"), *sums).filter(ledger.day >= since).group_by(key)
+    # Days in order; everything else biggest spender first
+    query = query.order_by(key) if group_by == "day" else \
+        query.order_by(func.sum(ledger.prompt_tokens + ledger.completion_tokens).desc(), key).limit(top)
+
+    def usage(row) -> dict:
+        analyses = int(row.analyses or 0)
+        prompt, completion = int(row.prompt_tokens or 0), int(row.completion_tokens or 0)
+        return {
+            "analyses": analyses,
+            "calls": int(row.calls or 0),
+            "prompt_tokens": prompt,
+            "completion_tokens": completion,
+            "total_tokens": prompt + completion,
+            "average_latency_ms": round(row.latency_ms / analyses) if analyses else None,
+        }
+
+    return {
+        "days": days,
+        "group_by": group_by,
+        "totals": usage(db.query(*sums).filter(ledger.day >= since).one()),
+        "groups": [{group_by: row.key, **usage(row)} for row in query],
+    }
+
+
+if __name__ == "__main__":
+    # Rebuild the rollups from stored analyses: python -m services.analytics
+    from dotenv import load_dotenv
+    load_dotenv()
+    from database import SessionLocal, init_db
+    init_db()
+    session = SessionLocal()
+    try:
+        print(f"Rebuilt analytics rollups from {backfill(session)} analyses.")
+    finally:
+        session.close()
@@ -0,0 +1,256 @@
+import re
+from collections import Counter
+from services.lazy import lazy_import
+from services.skill_taxonomy import get_skill_index
+
+np = lazy_import("numpy")
+
+# Deterministic, no-LLM ATS keyword matching. Produces the same shape as the
+# LLM analysis (ResumeAnalysisResponse) in a few milliseconds.
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]")
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+PHONE_RE = re.compile(r"\+?\d[\d\s().-]{7,}\d")
+NUMBER_RE = re.compile(r"\d")
+BULLET_RE = re.compile(r"^\s*(?:[-*•▪●]|\d+[.)])\s+", re.MULTILINE)
+
+STOPWORDS = frozenset("""
+a about above across after all also an and any are as at be been being both but by can could
+do does each either etc for from has have having how if in into is it its may more most must
+no not of on or other our out over per plus such than that the their them then there these
+they this those through to under up us using via was we well were what when where which while
+who will with within without would you your
+ability able advantage apply applicants based best bonus candidate candidates closely company
+day degree demonstrated desired description duties environment equivalent excellent experience
+experienced familiarity familiar help highly ideal ideally including job join knowledge least
+looking minimum new nice opportunity plus position preferred proficiency proficient proven
+qualifications related required requirements responsibilities responsible role skills solid
+strong team teams understanding work working world year years
+""".split())
+
+# alias -> canonical term; multi-word canonical terms are matched as phrases.
+# Short forms that are also ordinary resume words ("CV" as in résumé, "the
+# rest of the team") are left out: they would turn prose into skill matches.
+SYNONYMS = {
+    "js": "javascript", "ecmascript": "javascript", "ts": "typescript",
+    "node": "node.js", "nodejs": "node.js", "reactjs": "react", "react.js": "react",
+    "vue.js": "vue", "vuejs": "vue", "golang": "go", "py": "python",
+    "postgres": "postgresql", "psql": "postgresql", "mongo": "mongodb",
+    "k8s": "kubernetes", "gcp": "google cloud", "amazon web services": "aws",
+    "ml": "machine learning", "dl": "deep learning", "ai": "artificial intelligence",
+    "nlp": "natural language processing",
+    "ci/cd": "continuous integration", "ci": "continuous integration", "cicd": "continuous integration",
+    "restful": "rest api", "apis": "api",
+    "oop": "object-oriented programming", "tdd": "test-driven development",
+    "sql server": "mssql", "ms sql": "mssql", "dotnet": ".net", "c-sharp": "c#",
+}
+CANONICAL = frozenset(SYNONYMS.values())
+PHRASES = sorted(
+    {term for term in list(SYNONYMS) + list(CANONICAL) if " " in term},
+    key=len, reverse=True,
+)
+PHRASE_RE = re.compile(r"\b(?:" + "|".join(re.escape(p) for p in PHRASES) + r")\b")
+
+SUFFIXES = ("ational", "ization", "ations", "ation", "ments", "ment", "ness", "ities", "ity",
+            "ings", "ing", "ies", "ied", "ers", "er", "ed", "es", "ly", "s")
+
+SECTION_HEADINGS = {
+    "experience": ("experience", "employment", "work history"),
+    "education": ("education", "academic"),
+    "skills": ("skills", "technologies", "technical skills", "tools"),
+}
+
+# BM25 term-frequency saturation parameters
+K1 = 1.2
+B = 0.75
+AVG_RESUME_TOKENS = 450
+MAX_REQUIREMENTS = 30
+# Nice-to-have requirements count this much of a must-have
+NICE_TO_HAVE_WEIGHT = 0.5
+
+
+def stem(token: str) -> str:
+    """Light suffix-stripping stemmer; leaves short and symbol-bearing tokens alone."""
+    if len(token) <= 4 or not token.isalpha():
+        return token
+    for suffix in SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            token = token[: -len(suffix)]
+            break
+    if token.endswith("e") and len(token) > 4:
+        token = token[:-1]
+    return token
+
+
+def canonical_terms(text: str) -> list:
+    """Lower-case, map aliases to canonical terms and return matchable terms in order.
+
+    Known multi-word skills are kept as a single term; everything else is
+    tokenized, stop-word filtered and stemmed.
+    """
+    text = text.lower()
+    terms = []
+    position = 0
+    for match in PHRASE_RE.finditer(text):
+        terms.extend(_unigrams(text[position:match.start()]))
+        terms.append(SYNONYMS.get(match.group(0), match.group(0)))
+        position = match.end()
+    terms.extend(_unigrams(text[position:]))
+    return terms
+
+
+def _tokens(text: str) -> list:
+    out = []
+    for token in TOKEN_RE.findall(text):
+        token = token.rstrip(".")
+        # "python/flask" is two skills, "ci/cd" is one
+        if "/" in token and token not in SYNONYMS:
+            out.extend(part for part in token.split("/") if part)
+        else:
+            out.append(token)
+    return out
+
+
+def _unigrams(text: str) -> list:
+    out = []
+    for token in _tokens(text):
+        if token in STOPWORDS or token.isdigit():
+            continue
+        token = SYNONYMS.get(token, token)
+        out.append(token if token in CANONICAL else stem(token))
+    return out
+
+
+def _display_forms(text: str) -> dict:
+    """Map each canonical term back to how it first appeared in the text."""
+    forms = {}
+    for match in PHRASE_RE.finditer(text.lower()):
+        forms.setdefault(SYNONYMS.get(match.group(0), match.group(0)), match.group(0))
+    for token in _tokens(text.lower()):
+        term = SYNONYMS.get(token, token)
+        forms.setdefault(term if term in CANONICAL else stem(term), term)
+    return forms
+
+
+def _is_technical(term: str) -> bool:
+    return " " in term or any(ch in term for ch in "+#./") or any(ch.isdigit() for ch in term) \
+        or term in CANONICAL
+
+
+def extract_requirements(job_description: str = None, target_role: str = None, nice_to_have: str = None) -> list:
+    """Weighted requirement terms from the JD (or just the role when there is no JD).
+
+    Returns [(term, weight)] sorted by weight. Weights use BM25-style
+    saturation of the JD term frequency, boosted for technical terms and for
+    words that also appear in the target role. Terms from `nice_to_have`
+    count at NICE_TO_HAVE_WEIGHT.
+    """
+    role_terms = set(canonical_terms(target_role or ""))
+    counts = Counter(canonical_terms(job_description or ""))
+    for term, tf in Counter(canonical_terms(nice_to_have or "")).items():
+        counts[term] += tf * NICE_TO_HAVE_WEIGHT
+    for term in role_terms:
+        counts[term] += 1
+    weighted = []
+    for term, tf in counts.items():
+        weight = tf * (K1 + 1) / (tf + K1)
+        if _is_technical(term):
+            weight *= 1.5
+        if term in role_terms:
+            weight *= 1.25
+        weighted.append((term, round(weight, 4)))
+    weighted.sort(key=lambda item: (-item[1], item[0]))
+    return weighted[:MAX_REQUIREMENTS]
+
+
+def match_scores(requirements: list, resume_terms: list) -> "np.ndarray":
+    """Per-requirement match strength in [0, 1], computed for all terms at once."""
+    if not requirements:
+        return np.zeros(0)
+    index = {term: i for i, (term, _) in enumerate(requirements)}
+    hits = [index[t] for t in resume_terms if t in index]
+    tf = np.bincount(np.asarray(hits, dtype=np.int64), minlength=len(requirements)).astype(float)
+    length_norm = 1 - B + B * max(len(resume_terms), 1) / AVG_RESUME_TOKENS
+    saturation = tf * (K1 + 1) / (tf + K1 * length_norm) / (K1 + 1)
+    # Presence carries most of the score; repeated evidence adds the rest
+    return np.where(tf > 0, 0.7 + 0.3 * np.minimum(saturation * 2, 1.0), 0.0)
+
+
+def detect_ats_issues(resume_text: str, missing: list, sections: dict = None) -> list:
+    issues = []
+    lower = resume_text.lower()
+    words = len(resume_text.split())
+    for section, headings in SECTION_HEADINGS.items():
+        found = section in sections if sections is not None else any(heading in lower for heading in headings)
+        if not found:
+            issues.append(f"No recognizable '{section.title()}' section heading.")
+    contact = (sections or {}).get("contact") or {}
+    if not contact.get("email") and not EMAIL_RE.search(resume_text):
+        issues.append("No email address detected in the contact details.")
+    if not contact.get("phone") and not PHONE_RE.search(resume_text):
+        issues.append("No phone number detected in the contact details.")
+    if words < 150:
+        issues.append(f"Resume is very short ({words} words); ATS ranking favours fuller evidence.")
+    elif words > 1200:
+        issues.append(f"Resume is long ({words} words); consider trimming to two pages.")
+    bullets = [line for line in resume_text.splitlines() if BULLET_RE.match(line)]
+    if bullets and sum(1 for line in bullets if NUMBER_RE.search(line)) < len(bullets) / 3:
+        issues.append("Fewer than a third of bullet points contain quantified results.")
+    if any(ch in resume_text for ch in "│┃┌┐�"):
+        issues.append("Table borders or unreadable characters found; ATS parsers may garble this text.")
+    if missing:
+        issues.append(f"{len(missing)} job description keywords not found: {', '.join(missing[:5])}.")
+    return issues
+
+
+def score_resume(resume_text: str, target_role: str, job_description: str = None, sections: dict = None,
+                 jd_profile: dict = None) -> dict:
+    """Local keyword-match analysis in the ResumeAnalysisResponse shape.
+
+    `sections` (from the segmentation stage) makes the section checks exact
+    instead of substring-based. `jd_profile` (from the JD preprocessor)
+    replaces the raw job description: boilerplate is ignored and
+    nice-to-haves weigh less than must-haves.
+    """
+    nice_to_have = None
+    if jd_profile:
+        job_description = "\n".join(jd_profile["must_have"] + jd_profile["responsibilities"])
+        nice_to_have = "\n".join(jd_profile["nice_to_have"])
+    requirements = extract_requirements(job_description, target_role, nice_to_have)
+    resume_terms = canonical_terms(resume_text)
+    scores = match_scores(requirements, resume_terms)
+    weights = np.array([weight for _, weight in requirements], dtype=float)
+    overall = int(round(100 * float(weights @ scores) / weights.sum())) if len(weights) else 0
+
+    forms = _display_forms("\n".join(filter(None, (job_description, nice_to_have))) or target_role or "")
+    matched = [forms.get(term, term) for (term, _), s in zip(requirements, scores) if s > 0]
+    missing = [forms.get(term, term) for (term, _), s in zip(requirements, scores) if s == 0]
+
+    # Known skills from the taxonomy are reported in preference to raw terms
+    index = get_skill_index()
+    if jd_profile:
+        wanted = jd_profile["skills"]["must"] + jd_profile["skills"]["nice"]
+    else:
+        wanted = index.extract(job_description or target_role or "")
+    if wanted:
+        have = set(index.extract(resume_text))
+        matched = [skill for skill in wanted if skill in have]
+        missing = [skill for skill in wanted if skill not in have]
+    issues = detect_ats_issues(resume_text, missing, sections)
+
+    return {
+        "overall_score": overall,
+        "strengths": [f"Matches '{term}'" for term in matched],
+        "weaknesses": [f"No evidence of '{term}'" for term in missing[:10]],
+        "ats_issues": issues,
+        "role_alignment_feedback": (
+            f"Keyword match for {target_role}: {len(matched)} of {len(matched) + len(missing)} "
+            f"requirements found. This is a fast local estimate, not a full review."
+        ),
+        "optimized_bullets": [],
+        "missing_skills": missing,
+        "final_suggestions": "Add evidence for the missing keywords where it is truthful, "
+                             "then run a full analysis for rewritten content.",
+        "optimized_resume_content": "",
+    }
+
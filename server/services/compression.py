@@ -0,0 +1,179 @@
+import os
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:  # gzip only
+        brotli = None
+
+# Negotiated response compression. Analysis responses carry tens of KB of
+# markdown and JSON that compress 5-10x. The encoding is picked from the
+# client's Accept-Encoding q-values: brotli when the module is installed,
+# otherwise gzip. Bodies under COMPRESS_MIN_BYTES are sent as-is, since the
+# header overhead outweighs the saving. Streamed (NDJSON) responses are
+# compressed chunk by chunk with a flush after each one, so the progressive
+# pre-score still reaches the client before the LLM result. Files that are
+# already compressed (PDF, DOCX) pass through untouched.
+
+COMPRESSION = os.getenv("COMPRESSION", "1") == "1"  # 0: leave it to the reverse proxy
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", 1024))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4  # dynamic content: q4 is close to gzip -9 in size at a fraction of the CPU
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/x-ndjson", "application/javascript",
+                      "image/svg+xml")
+
+compression_stats = {"responses": 0, "compressed": 0, "streamed": 0, "bytes_in": 0, "bytes_out": 0}
+
+
+def available_encodings() -> tuple:
+    """Encodings this process can produce, most preferred first."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding: str, encodings: tuple = None) -> str:
+    """Best encoding the client accepts (q > 0), or None for identity."""
+    encodings = encodings or available_encodings()
+    weights = {}
+    for item in (accept_encoding or "").split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name] = weight
+    best, best_weight = None, 0.0
+    for encoding in encodings:  # ties go to the earlier, better-compressing encoding
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._zlib = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # 31: gzip container
+
+    def chunk(self, data: bytes) -> bytes:
+        """Compressed bytes for data, flushed so the client can decode them now."""
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush()
+
+
+def _compressible(headers: list) -> bool:
+    content_type = b""
+    for name, value in headers:
+        if name == b"content-encoding":
+            return False
+        if name == b"content-type":
+            content_type = value
+    return content_type.decode("latin-1").lower().startswith(COMPRESSIBLE_TYPES)
+
+
+def _vary(headers: list) -> list:
+    for index, (name, value) in enumerate(headers):
+        if name == b"vary":
+            if b"accept-encoding" not in value.lower() and value != b"*":
+                headers[index] = (name, value + b", Accept-Encoding")
+            return headers
+    return headers + [(b"vary", b"Accept-Encoding")]
+
+
+def _encoded_headers(headers: list, encoding: str, length: int = None) -> list:
+    # The representation changes, so a strong validator has to become weak
+    headers = [(name, b"W/" + value if name == b"etag" and not value.startswith(b"W/") else value)
+               for name, value in headers if name != b"content-length"]
+    headers.append((b"content-encoding", encoding.encode()))
+    if length is not None:
+        headers.append((b"content-length", str(length).encode()))
+    return _vary(headers)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses with the best encoding the client accepts."""
+
+    def __init__(self, app, minimum_size: int = None, encodings: tuple = None):
+        self.app = app
+        self.minimum_size = COMPRESS_MIN_BYTES if minimum_size is None else minimum_size
+        self.encodings = encodings
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            return await self.app(scope, receive, send)
+        accept_encoding = dict(scope.get("headers") or []).get(b"accept-encoding", b"").decode("latin-1")
+        encoding = negotiate(accept_encoding, self.encodings)
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        state = {"start": None, "compressor": None, "passthrough": False}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["start"] = message  # held back until the first body chunk decides
+                return
+            if message["type"] != "http.response.body" or state["passthrough"]:
+                return await send(message)
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            compressor = state["compressor"]
+            if compressor is not None:  # streaming, already started
+                compression_stats["bytes_in"] += len(body)
+                data = compressor.chunk(body) if more_body else compressor.finish(body)
+                compression_stats["bytes_out"] += len(data)
+                return await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+            start = state["start"]
+            headers = list(start.get("headers") or [])
+            compression_stats["responses"] += 1
+            if start["status"] in (204, 304) or not _compressible(headers):
+                state["passthrough"] = True
+                await send(start)
+                return await send(message)
+            if not more_body and len(body) < self.minimum_size:
+                state["passthrough"] = True
+                await send({**start, "headers": _vary(headers)})
+                return await send(message)
+
+            compressor = state["compressor"] = _Compressor(encoding)
+            compression_stats["compressed"] += 1
+            compression_stats["bytes_in"] += len(body)
+            if more_body:
+                compression_stats["streamed"] += 1
+                data = compressor.chunk(body)
+                await send({**start, "headers": _encoded_headers(headers, encoding)})
+            else:
+                data = compressor.finish(body)
+                await send({**start, "headers": _encoded_headers(headers, encoding, len(data))})
+            compression_stats["bytes_out"] += len(data)
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def compression_summary() -> dict:
+    stats = dict(compression_stats)
+    stats["encodings"] = list(available_encodings())
+    stats["bytes_saved"] = stats["bytes_in"] - stats["bytes_out"]
+    stats["ratio"] = round(stats["bytes_out"] / stats["bytes_in"], 3) if stats["bytes_in"] else None
+    return stats
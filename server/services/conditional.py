@@ -0,0 +1,40 @@
+from collections import Counter
+from sqlalchemy import func
+import models
+
+# Conditional GET for polled and immutable reads. ETags come from cheap
+# version stamps instead of a hash of the response body, so a matching
+# If-None-Match is answered with 304 before the body is computed at all:
+# - /api/users/me: users.analyses_version, bumped in the same transaction
+#   that stores an analysis, plus the caller's rows still waiting in the
+#   write-behind buffer. The user row is already loaded by auth, so a
+#   revalidation costs no extra query.
+# - stored analyses and their exports: rows are never updated after the
+#   insert, so the id (and the export variant) is the version.
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against one ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def user_etag(user: models.User, pending: int = 0) -> str:
+    return f'W/"u{user.id}.{user.analyses_version or 0}.{pending}"'
+
+
+def analysis_etag(analysis_id: int, *variant) -> str:
+    return 'W/"a' + "-".join(str(part) for part in (analysis_id, *variant)) + '"'
+
+
+def bump_analyses_version(db, user_ids) -> None:
+    """Bump the version stamp of each user once per stored analysis; the caller commits."""
+    for user_id, count in Counter(user_ids).items():
+        db.query(models.User).filter(models.User.id == user_id).update(
+            {models.User.analyses_version: func.coalesce(models.User.analyses_version, 0) + count},
+            synchronize_session=False,
+        )
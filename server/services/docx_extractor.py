@@ -0,0 +1,132 @@
+import io
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+
+# Streaming DOCX text extraction. Reads word/document.xml plus the header
+# and footer parts straight from the zip with an incremental XML parser,
+# without building python-docx's object model. Unlike doc.paragraphs it
+# keeps text from tables, text boxes, headers and footers, where many
+# resume templates put contact details and skills.
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+PART_RE = re.compile(r"^word/(header|footer)(\d*)\.xml$")
+FALSE_VALUES = ("0", "false", "off")
+
+
+def _run_text(run) -> tuple:
+    """(text, bold) of a w:r from its direct children, in order."""
+    parts = []
+    bold = False
+    for child in run:
+        tag = child.tag
+        if tag == W + "t":
+            parts.append(child.text or "")
+        elif tag == W + "tab":
+            parts.append("\t")
+        elif tag in (W + "br", W + "cr"):
+            parts.append("\n")
+        elif tag == W + "rPr":
+            b = child.find(W + "b")
+            bold = b is not None and b.get(W + "val", "true").lower() not in FALSE_VALUES
+    return "".join(parts), bold
+
+
+def _table_lines(rows: list) -> list:
+    """Rows of single-line cells become one "a | b | c" line; other rows are read cell by cell."""
+    lines = []
+    for row in rows:
+        cells = [[line for line in cell if line[0].strip()] for cell in row]
+        if all(len(cell) <= 1 for cell in cells):
+            filled = [cell[0] for cell in cells if cell]
+            if filled:
+                lines.append((" | ".join(text for text, _ in filled), len(filled) == 1 and filled[0][1]))
+        else:
+            for cell in cells:
+                lines.extend(cell)
+    return lines
+
+
+def part_lines(stream):
+    """Yield (line text, looks like a heading) for a WordprocessingML part, in reading order."""
+    paragraphs = []  # open w:p, innermost last (text boxes nest paragraphs)
+    tables = []      # open w:tbl as lists of rows of cells of lines
+    skip_depth = 0   # inside mc:Fallback, which repeats the mc:Choice content
+
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        tag = elem.tag
+        if tag == MC_FALLBACK:
+            skip_depth += 1 if event == "start" else -1
+            if event == "end":
+                elem.clear()
+            continue
+        if skip_depth:
+            continue
+
+        if event == "start":
+            if tag == W + "p":
+                paragraphs.append({"parts": [], "style": "", "runs": 0, "bold": 0})
+            elif tag == W + "tbl":
+                tables.append([])
+            elif tag == W + "tr" and tables:
+                tables[-1].append([])
+            elif tag == W + "tc" and tables and tables[-1]:
+                tables[-1][-1].append([])
+            continue
+
+        if tag == W + "r" and paragraphs:
+            text, bold = _run_text(elem)
+            paragraph = paragraphs[-1]
+            paragraph["parts"].append(text)
+            if text.strip():
+                paragraph["runs"] += 1
+                paragraph["bold"] += bold
+            elem.clear()
+        elif tag == W + "pStyle" and paragraphs:
+            paragraphs[-1]["style"] = elem.get(W + "val", "")
+        elif tag == W + "p" and paragraphs:
+            paragraph = paragraphs.pop()
+            text = "".join(paragraph["parts"])
+            heading = paragraph["style"].startswith(("Heading", "Title")) or \
+                bool(paragraph["runs"]) and paragraph["bold"] == paragraph["runs"]
+            if tables and tables[-1] and tables[-1][-1]:
+                tables[-1][-1][-1].append((text, heading))
+            else:
+                yield text, heading
+            elem.clear()
+        elif tag == W + "tbl" and tables:
+            lines = _table_lines(tables.pop())
+            if tables and tables[-1] and tables[-1][-1]:
+                tables[-1][-1][-1].extend(lines)  # nested table
+            else:
+                yield from lines
+            elem.clear()
+
+
+def _part_order(name: str) -> tuple:
+    kind, number = PART_RE.match(name).groups()
+    return kind, int(number or 0)
+
+
+def extract_docx_streaming(file_bytes: bytes) -> tuple:
+    """(text, heading hints) from headers, body and footers, like extract_docx_with_layout."""
+    lines, heading_hints = [], set()
+    with zipfile.ZipFile(io.BytesIO(file_bytes)) as archive:
+        parts = sorted((name for name in archive.namelist() if PART_RE.match(name)), key=_part_order)
+        headers = [name for name in parts if "/header" in name]
+        footers = [name for name in parts if "/footer" in name]
+
+        seen = set()  # first-page/even/default headers usually repeat each other
+        for name in headers + ["word/document.xml"] + footers:
+            repeated_part = name != "word/document.xml"
+            with archive.open(name) as stream:
+                for text, heading in part_lines(stream):
+                    if repeated_part:
+                        if not text.strip() or text in seen:
+                            continue
+                        seen.add(text)
+                    lines.append(text)
+                    if heading and text.strip():
+                        heading_hints.add(" ".join(text.split()).strip(" :#").lower())
+    return "\n".join(lines), heading_hints
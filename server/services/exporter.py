@@ -0,0 +1,341 @@
+import hashlib
+import io
+import os
+import re
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from services.lazy import lazy_import
+
+docx = lazy_import("docx")
+
+# Server-side export of optimized_resume_content (the markdown the analysis
+# produces) to DOCX and PDF. The PDF writer is a small text-only layout over
+# the standard Helvetica fonts: no embedded fonts or images, a single text
+# layer in reading order, which is what ATS parsers handle best. Rendered
+# files are cached by (analysis id, template, format) plus a content digest.
+
+RENDER_VERSION = 1
+EXPORT_CACHE_BYTES = int(os.getenv("EXPORT_CACHE_BYTES", 64 * 1024 * 1024))
+MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+TEMPLATES = {
+    "classic": {"font_size": 11, "heading_size": 12.5, "title_size": 20, "leading": 1.3, "margin": 54,
+                "section_gap": 10, "heading_rule": True, "docx_font": "Calibri"},
+    "compact": {"font_size": 9.5, "heading_size": 10.5, "title_size": 16, "leading": 1.2, "margin": 40,
+                "section_gap": 6, "heading_rule": False, "docx_font": "Arial"},
+}
+
+BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+LIST_RE = re.compile(r"^\s*[*\-•]\s+")
+
+# Advance widths (1/1000 em) of printable ASCII, from the Helvetica AFM files
+_HELVETICA = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+_HELVETICA_BOLD = [
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+]
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792  # US Letter
+BULLET_INDENT = 14
+
+
+def parse_markdown(markdown: str) -> list:
+    """[(kind, runs)] with kind title/heading/bullet/paragraph/blank and runs [(text, bold)]."""
+    blocks = []
+    for line in (markdown or "").splitlines():
+        stripped = line.strip()
+        if not stripped:
+            if blocks and blocks[-1][0] != "blank":
+                blocks.append(("blank", []))
+            continue
+        if stripped.startswith("# "):
+            blocks.append(("title", [(stripped[2:].strip(), True)]))
+        elif stripped.startswith("#"):
+            blocks.append(("heading", [(stripped.lstrip("#").strip().upper(), True)]))
+        elif LIST_RE.match(stripped):
+            blocks.append(("bullet", _runs(LIST_RE.sub("", stripped, count=1))))
+        else:
+            blocks.append(("paragraph", _runs(stripped)))
+    return blocks
+
+
+def _runs(text: str) -> list:
+    runs, position = [], 0
+    for match in BOLD_RE.finditer(text):
+        if match.start() > position:
+            runs.append((text[position:match.start()], False))
+        runs.append((match.group(1), True))
+        position = match.end()
+    if position < len(text):
+        runs.append((text[position:], False))
+    return [(chunk, bold) for chunk, bold in runs if chunk]
+
+
+# --- PDF ---
+
+def text_width(text: str, bold: bool, size: float) -> float:
+    widths = _HELVETICA_BOLD if bold else _HELVETICA
+    return sum(widths[ord(ch) - 32] if 32 <= ord(ch) < 127 else 556 for ch in text) * size / 1000
+
+
+def _pdf_string(text: str) -> str:
+    encoded = text.encode("cp1252", errors="replace").decode("latin-1")
+    return "(" + encoded.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+def _wrap(runs: list, size: float, width: float) -> list:
+    """Greedy word wrap; each line is [(text, bold, x offset)] with same-weight words merged."""
+    words, glued = [], []
+    previous = " "
+    for text, bold in runs:
+        for i, word in enumerate(text.split()):
+            words.append((word, bold))
+            # "**Skills**: Go" has no space between the bold run and the colon
+            glued.append(i == 0 and not previous[-1].isspace() and not text[0].isspace())
+        previous = text
+    lines, line, x = [], [], 0.0
+    for (word, bold), glue in zip(words, glued):
+        space = text_width(" ", bold, size) if line and not glue else 0.0
+        word_width = text_width(word, bold, size)
+        if line and x + space + word_width > width:
+            lines.append(line)
+            line, x, space = [], 0.0, 0.0
+        separator = " " if space else ""
+        if line and line[-1][1] == bold:
+            line[-1] = (line[-1][0] + separator + word, bold, line[-1][2])
+        else:
+            line.append((separator + word, bold, x))
+        x += space + word_width
+    if line:
+        lines.append(line)
+    return lines
+
+
+def _layout_pdf(blocks: list, template: dict) -> list:
+    """Page content streams (bytes) for the parsed blocks."""
+    margin = template["margin"]
+    width = PAGE_WIDTH - 2 * margin
+    pages, ops = [], []
+    y = PAGE_HEIGHT - margin
+
+    def need(height):
+        nonlocal y, ops
+        if y - height < margin:
+            pages.append(ops)
+            ops, y = [], PAGE_HEIGHT - margin
+
+    def emit(lines, size, x0):
+        nonlocal y
+        for line in lines:
+            need(size * template["leading"])
+            y -= size * template["leading"]
+            for text, bold, x in line:
+                ops.append(f"BT /F{2 if bold else 1} {size:g} Tf {x0 + x:.2f} {y:.2f} Td {_pdf_string(text)} Tj ET")
+
+    for kind, runs in blocks:
+        if kind == "blank":
+            y -= template["font_size"] * 0.4
+        elif kind == "title":
+            emit(_wrap(runs, template["title_size"], width), template["title_size"], margin)
+        elif kind == "heading":
+            y -= template["section_gap"]
+            emit(_wrap(runs, template["heading_size"], width), template["heading_size"], margin)
+            if template["heading_rule"]:
+                y -= 3
+                ops.append(f"0.5 w {margin} {y:.2f} m {PAGE_WIDTH - margin} {y:.2f} l S")
+        elif kind == "bullet":
+            size = template["font_size"]
+            lines = _wrap(runs, size, width - BULLET_INDENT)
+            if lines:
+                need(size * template["leading"])
+                ops.append(f"BT /F1 {size:g} Tf {margin + 2} {y - size * template['leading']:.2f} Td "
+                           f"{_pdf_string('•')} Tj ET")
+            emit(lines, size, margin + BULLET_INDENT)
+        else:
+            emit(_wrap(runs, template["font_size"], width), template["font_size"], margin)
+    pages.append(ops)
+    return ["\n".join(page).encode("latin-1") for page in pages]
+
+
+def render_pdf(markdown: str, template: dict) -> bytes:
+    streams = _layout_pdf(parse_markdown(markdown), template)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+    ]
+    page_numbers = []
+    for stream in streams:
+        compressed = zlib.compress(stream)
+        objects.append(b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(compressed)
+                       + compressed + b"\nendstream")
+        content_number = len(objects)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+                       b"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>"
+                       % (PAGE_WIDTH, PAGE_HEIGHT, content_number))
+        page_numbers.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % number for number in page_numbers)
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(page_numbers)
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    out.write(b"".join(b"%010d 00000 n \n" % offset for offset in offsets))
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+# --- DOCX ---
+
+_docx_templates = {}
+_docx_lock = threading.Lock()
+
+
+def _docx_base(name: str) -> bytes:
+    """Styled empty document per template, built once and reopened for each render."""
+    if name not in _docx_templates:
+        with _docx_lock:
+            if name not in _docx_templates:
+                from docx.shared import Pt
+                template = TEMPLATES[name]
+                document = docx.Document()
+                normal = document.styles["Normal"]
+                normal.font.name = template["docx_font"]
+                normal.font.size = Pt(template["font_size"])
+                normal.paragraph_format.space_after = Pt(2)
+                for section in document.sections:
+                    section.left_margin = section.right_margin = Pt(template["margin"])
+                    section.top_margin = section.bottom_margin = Pt(template["margin"])
+                buffer = io.BytesIO()
+                document.save(buffer)
+                _docx_templates[name] = buffer.getvalue()
+    return _docx_templates[name]
+
+
+def render_docx(markdown: str, name: str) -> bytes:
+    from docx.shared import Pt
+    template = TEMPLATES[name]
+    document = docx.Document(io.BytesIO(_docx_base(name)))
+    for kind, runs in parse_markdown(markdown):
+        if kind == "blank":
+            continue
+        paragraph = document.add_paragraph(style="List Bullet" if kind == "bullet" else None)
+        if kind == "heading":
+            paragraph.paragraph_format.space_before = Pt(template["section_gap"])
+        for text, bold in runs:
+            run = paragraph.add_run(text)
+            run.bold = bold
+            if kind in ("title", "heading"):
+                run.font.size = Pt(template[f"{kind}_size"])
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def warm_templates():
+    for name in TEMPLATES:
+        _docx_base(name)
+
+
+# --- Output cache ---
+
+class ExportCache:
+    """Byte-bounded LRU, optionally backed by a directory shared between workers."""
+
+    def __init__(self, max_bytes: int = EXPORT_CACHE_BYTES, directory: str = None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self._items = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return data
+        if self.directory:
+            try:
+                with open(os.path.join(self.directory, key), "rb") as f:
+                    data = f.read()
+                self._remember(key, data)
+                with self._lock:
+                    self.hits += 1
+                return data
+            except OSError:
+                pass
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, data: bytes):
+        self._remember(key, data)
+        if self.directory:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, os.path.join(self.directory, key))
+            except OSError as e:
+                print(f"Export cache write failed: {e}")
+
+    def _remember(self, key: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                self._size -= len(self._items.pop(key))
+            self._items[key] = data
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= len(evicted)
+
+
+export_cache = ExportCache(directory=os.getenv("EXPORT_CACHE_DIR") or None)
+
+
+def export_key(analysis_id: int, template: str, fmt: str, markdown: str) -> str:
+    digest = hashlib.sha1((markdown or "").encode()).hexdigest()
+    return hashlib.sha256(f"{analysis_id}:{template}:{fmt}:{RENDER_VERSION}:{digest}".encode()).hexdigest()
+
+
+def render(markdown: str, template: str, fmt: str) -> bytes:
+    if fmt == "pdf":
+        return render_pdf(markdown, TEMPLATES[template])
+    return render_docx(markdown, template)
+
+
+def export_analysis(analysis_id: int, markdown: str, template: str, fmt: str) -> tuple:
+    """(cache key, file bytes), rendering only on a cache miss."""
+    key = export_key(analysis_id, template, fmt, markdown)
+    data = export_cache.get(key)
+    if data is None:
+        data = render(markdown, template, fmt)
+        export_cache.put(key, data)
+    return key, data
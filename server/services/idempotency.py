@@ -0,0 +1,156 @@
+import asyncio
+import datetime
+import hashlib
+import os
+import threading
+import time
+import orjson
+from sqlalchemy.exc import IntegrityError
+import models
+
+# Idempotency-Key support for POST /api/analyze-resume. The first request
+# with a key inserts a pending row (the primary key makes the claim atomic
+# across workers); retries with the same key and payload wait for it to
+# finish and replay the stored response, so a retried upload never re-runs
+# the parse and LLM call or spends another analysis from the quota.
+
+IDEMPOTENCY_TTL = datetime.timedelta(hours=float(os.getenv("IDEMPOTENCY_TTL_HOURS", 24)))
+# A retry waits this long for the original request before giving up with 409
+IDEMPOTENCY_WAIT = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", 90))
+# A pending entry older than this belongs to a request that died; retries take it over
+PENDING_TIMEOUT = datetime.timedelta(seconds=float(os.getenv("IDEMPOTENCY_PENDING_TIMEOUT", 300)))
+SWEEP_INTERVAL = 60
+MAX_KEY_LENGTH = 255
+
+_last_sweep = 0.0
+_sweep_lock = threading.Lock()
+
+
+class IdempotencyError(Exception):
+    """A key that cannot be used for this request; `status_code` is the HTTP status to return."""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def request_hash(file_bytes: bytes, **fields) -> str:
+    digest = hashlib.sha256(orjson.dumps(fields, option=orjson.OPT_SORT_KEYS))
+    digest.update(hashlib.sha256(file_bytes).digest())
+    return digest.hexdigest()
+
+
+def sweep_expired(db, force: bool = False) -> int:
+    """Delete expired keys (an index range scan on expires_at), at most once per SWEEP_INTERVAL."""
+    global _last_sweep
+    with _sweep_lock:
+        if not force and time.monotonic() - _last_sweep < SWEEP_INTERVAL:
+            return 0
+        _last_sweep = time.monotonic()
+    deleted = (
+        db.query(models.IdempotencyKey)
+        .filter(models.IdempotencyKey.expires_at < datetime.datetime.utcnow())
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    return deleted
+
+
+def _lookup(db, user_id: int, key: str):
+    """Current row for the key, detached so a later insert of the same key cannot clash with it."""
+    entry = (
+        db.query(models.IdempotencyKey)
+        .populate_existing()
+        .filter(models.IdempotencyKey.user_id == user_id, models.IdempotencyKey.key == key)
+        .first()
+    )
+    if entry is not None:
+        db.expunge(entry)
+    return entry
+
+
+def _entry_query(db, entry):
+    return db.query(models.IdempotencyKey).filter(
+        models.IdempotencyKey.user_id == entry.user_id, models.IdempotencyKey.key == entry.key,
+        models.IdempotencyKey.created_at == entry.created_at,
+    )
+
+
+def _try_claim(db, user_id: int, key: str, fingerprint: str):
+    """None when this request now owns the key, else the existing entry."""
+    now = datetime.datetime.utcnow()
+    entry = _lookup(db, user_id, key)
+    if entry is not None and entry.expires_at < now:
+        _entry_query(db, entry).delete(synchronize_session=False)  # expired but not swept yet
+        db.commit()
+        entry = None
+    if entry is None:
+        db.add(models.IdempotencyKey(user_id=user_id, key=key, request_hash=fingerprint, status="pending",
+                                     created_at=now, expires_at=now + IDEMPOTENCY_TTL))
+        try:
+            db.commit()
+            return None
+        except IntegrityError:
+            db.rollback()  # another request claimed it first
+            return _try_claim(db, user_id, key, fingerprint)
+    if entry.request_hash == fingerprint and entry.status == "pending" and entry.created_at < now - PENDING_TIMEOUT:
+        # Compare-and-set on created_at so only one retry takes over an abandoned entry
+        taken = _entry_query(db, entry).filter(models.IdempotencyKey.status == "pending").update(
+            {models.IdempotencyKey.created_at: now, models.IdempotencyKey.expires_at: now + IDEMPOTENCY_TTL},
+            synchronize_session=False,
+        )
+        db.commit()
+        if taken:
+            return None
+    return entry
+
+
+async def claim_key(db, user_id: int, key: str, fingerprint: str, wait: float = None):
+    """Claim `key` for this request (returns None) or return the finished entry to replay.
+
+    Raises IdempotencyError when the key was used for a different payload
+    (422) or the original request is still running after `wait` seconds (409).
+    """
+    if not 0 < len(key) <= MAX_KEY_LENGTH:
+        raise IdempotencyError(400, f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters.")
+    sweep_expired(db)
+    deadline = time.monotonic() + (IDEMPOTENCY_WAIT if wait is None else wait)
+    delay = 0.05
+    while True:
+        entry = _try_claim(db, user_id, key, fingerprint)
+        if entry is None:
+            return None
+        if entry.request_hash != fingerprint:
+            raise IdempotencyError(422, "Idempotency-Key was already used with a different request.")
+        if entry.status == "done":
+            return entry
+        if time.monotonic() >= deadline:
+            raise IdempotencyError(409, "A request with this Idempotency-Key is still in progress.")
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 0.5)
+
+
+def complete_key(db, user_id: int, key: str, status_code: int, body: bytes) -> None:
+    """Store the response that retries with this key will replay."""
+    (
+        db.query(models.IdempotencyKey)
+        .filter(models.IdempotencyKey.user_id == user_id, models.IdempotencyKey.key == key)
+        .update({models.IdempotencyKey.status: "done", models.IdempotencyKey.status_code: status_code,
+                 models.IdempotencyKey.response_body: body}, synchronize_session=False)
+    )
+    db.commit()
+
+
+def release_key(db, user_id: int, key: str) -> None:
+    """Forget a key whose request failed, so a retry runs it again."""
+    try:
+        db.rollback()
+        (
+            db.query(models.IdempotencyKey)
+            .filter(models.IdempotencyKey.user_id == user_id, models.IdempotencyKey.key == key,
+                    models.IdempotencyKey.status == "pending")
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+    except Exception as e:
+        print(f"Idempotency key release failed: {e}")
@@ -0,0 +1,90 @@
+import hashlib
+from sqlalchemy import or_
+import models
+from services.jd_preprocessor import jd_fingerprint
+from services.section_analysis import entry_list, run_section_analysis
+from services.ai_analyzer import analyze_resume_with_ai, is_error_result
+
+# Incremental re-analysis: when a user re-uploads an edited resume for the
+# same role and job description, entries whose text is unchanged reuse the
+# bullets rewritten last time and only the edited entries go to the LLM.
+# Failed analyses (the error_result placeholder) are never used as a base.
+
+
+def entry_key(section: str, entry: dict) -> str:
+    normalized = "\n".join(" ".join(line.lower().split()) for line in [section, entry["header"], *entry["bullets"]])
+    return hashlib.sha1(normalized.encode()).hexdigest()
+
+
+def build_history(sections: dict, rewritten: dict = None) -> dict:
+    """What is stored in ResumeAnalysis.sections_json for later diffs."""
+    rewritten = rewritten or {}
+    return {
+        "sections": sections,
+        "rewrites": {
+            entry_key(section, entry): rewritten[(section, i)]
+            for section, i, entry in entry_list(sections)
+            if (section, i) in rewritten
+        },
+    }
+
+
+def find_prior_analysis(db, user_id: int, target_role: str, job_description: str = None):
+    """The user's most recent successful analysis for the same role and JD that kept section history."""
+    recent = (
+        db.query(models.ResumeAnalysis)
+        .filter(
+            models.ResumeAnalysis.user_id == user_id,
+            models.ResumeAnalysis.target_role == target_role,
+            models.ResumeAnalysis.jd_hash == jd_fingerprint(job_description),
+            models.ResumeAnalysis.sections_json.isnot(None),
+            # Compact (score/gaps) analyses have no rewrites to reuse
+            or_(models.ResumeAnalysis.analysis_depth.is_(None), models.ResumeAnalysis.analysis_depth == "rewrite"),
+        )
+        .order_by(models.ResumeAnalysis.id.desc())
+        .limit(5)
+    )
+    return next((row for row in recent if not is_error_result(row.analysis_json)), None)
+
+
+def plan_reuse(prior_history: dict, sections: dict) -> dict:
+    """(section, index) -> previously rewritten bullets, for entries that did not change."""
+    prior_rewrites = (prior_history or {}).get("rewrites", {})
+    return {
+        (section, i): prior_rewrites[key]
+        for section, i, entry in entry_list(sections)
+        if (key := entry_key(section, entry)) in prior_rewrites
+    }
+
+
+def analyze_incremental(prior, text: str, sections: dict, target_role: str, job_description: str = None,
+                        experience_level: str = None, model: str = None) -> tuple:
+    """Returns (analysis result, history to store, recomputed report).
+
+    The report lists every entry with whether it was recomputed, plus
+    whether the whole-resume scoring call ran. When the text is identical
+    to the prior's, its stored result is returned and the report carries
+    "replayed_from" (the prior's id) so the caller does not store a copy.
+    """
+    if prior is not None and is_error_result(prior.analysis_json):
+        prior = None
+    if prior is not None and prior.original_text == text:
+        history = prior.sections_json
+        report = {"scoring": False, "replayed_from": getattr(prior, "id", None), "entries": [
+            {"section": section, "header": entry["header"], "recomputed": False}
+            for section, _, entry in entry_list(sections)
+        ]}
+        return prior.analysis_json, history, report
+
+    if not entry_list(sections):
+        result = analyze_resume_with_ai(text, target_role, job_description, experience_level, model)
+        return result, build_history(sections), {"scoring": True, "entries": []}
+
+    reuse = plan_reuse(prior.sections_json if prior is not None else None, sections)
+    result, rewritten = run_section_analysis(text, sections, target_role, job_description, experience_level, reuse,
+                                             model)
+    report = {"scoring": True, "entries": [
+        {"section": section, "header": entry["header"], "recomputed": (section, i) not in reuse}
+        for section, i, entry in entry_list(sections)
+    ]}
+    return result, build_history(sections, rewritten), report
@@ -0,0 +1,265 @@
+import datetime
+import hashlib
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+import models
+from services.skill_taxonomy import get_skill_index
+
+# Popular job postings are pasted by many users. Each distinct job
+# description is normalized, stripped of boilerplate (EEO statements,
+# benefits, company blurbs) and reduced to a compact requirements profile
+# once; the profile is stored by content hash and shared across users, and
+# its compact text is what prompts and local scoring consume.
+
+PROFILE_VERSION = 3
+JD_CACHE_SIZE = int(os.getenv("JD_CACHE_SIZE", 512))
+MAX_ITEMS = 20
+MAX_SUMMARY_WORDS = 40
+
+# Checked in this order, so "preferred qualifications" is nice-to-have and
+# "about the role" is not company boilerplate
+HEADING_KINDS = (
+    ("nice_to_have", ("nice to have", "nice-to-have", "preferred", "bonus", "pluses", "good to have",
+                      "desirable", "extra credit")),
+    ("boilerplate", ("benefits", "perks", "what we offer", "compensation", "salary", "pay range",
+                     "equal opportunity", "equal employment", "eeo", "about us", "about the company",
+                     "who we are", "why join", "why you'll love", "our culture", "our values", "how to apply",
+                     "diversity", "accommodation", "location")),
+    ("responsibilities", ("responsibilities", "key responsibilities", "what you'll do", "what you will do",
+                          "duties", "about the role", "the role", "your role", "day to day", "day-to-day",
+                          "in this role", "your impact")),
+    ("must_have", ("requirements", "qualifications", "basic qualifications", "minimum qualifications",
+                   "required", "must have", "must-have", "what you'll need", "what you need", "what you bring",
+                   "who you are", "you have", "skills", "experience")),
+)
+KNOWN_HEADINGS = frozenset(phrase for _, phrases in HEADING_KINDS for phrase in phrases)
+# Benefit and EEO wording outside any heading; such lines are dropped only
+# when they carry no requirement cue ("Must pass a background check" stays)
+BOILERPLATE_LINE_RE = re.compile(
+    r"equal opportunity|equal employment|without regard to|regardless of (?:race|age|gender|sex)|"
+    r"race, colou?r|sexual orientation|gender identity|protected veteran|reasonable accommodation|"
+    r"e-verify|background check|401\(?k\)?|health insurance|dental|paid time off|\bpto\b|parental leave|"
+    r"stock options|wellness|gym membership|salary range|pay range|compensation package",
+    re.IGNORECASE,
+)
+NICE_CUE_RE = re.compile(r"\b(?:preferred|nice to have|nice-to-have|a plus|bonus|desirable|good to have)\b",
+                         re.IGNORECASE)
+MUST_CUE_RE = re.compile(
+    r"\b(?:must|required|requires|require|minimum|years|experience (?:with|in)|proficien\w*|knowledge of|"
+    r"familiar\w*|expertise|degree|ability to)\b",
+    re.IGNORECASE,
+)
+# As in section_segmenter: "3.5+ years" must keep its digits
+BULLET_RE = re.compile(r"^\s*(?:[-*•▪●◦‣∙–]\s*|\d{1,2}[.)]\s+)")
+INLINE_HEADING_RE = re.compile(r"^([A-Za-z][A-Za-z '&/-]{2,40}):\s*(.+)$")
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z])")
+
+
+def normalize_jd(job_description: str) -> str:
+    """NFKC-normalized text with per-line whitespace collapsed and blank lines dropped."""
+    text = unicodedata.normalize("NFKC", job_description or "").replace("​", "")
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def jd_fingerprint(job_description: str = None) -> str:
+    """Hash of the whitespace/case-normalized job description ("" hashes too)."""
+    normalized = " ".join((job_description or "").lower().split())
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+def approx_tokens(text: str) -> int:
+    # ~1.3 tokens per English word
+    return int(len((text or "").split()) * 1.3) + 1
+
+
+def heading_kind(text: str):
+    normalized = text.lower().strip(" :#*")
+    for kind, phrases in HEADING_KINDS:
+        if any(normalized.startswith(phrase) or normalized.endswith(phrase) for phrase in phrases):
+            return kind
+    return None
+
+
+def _is_heading(line: str) -> bool:
+    stripped = line.strip(" :#*")
+    words = stripped.split()
+    if not words or len(words) > 6 or BULLET_RE.match(line) or line.endswith("."):
+        return False
+    if line.endswith(":") or line.startswith("#") or stripped.lower() in KNOWN_HEADINGS:
+        return True
+    # Without a colon only title-cased known headings count ("Nice To Have", "REQUIREMENTS")
+    titled = stripped.isupper() or all(word[0].isupper() for word in words if len(word) > 3)
+    return titled and heading_kind(stripped) is not None
+
+
+def _is_boilerplate_line(item: str) -> bool:
+    return bool(BOILERPLATE_LINE_RE.search(item)) and not (MUST_CUE_RE.search(item) or NICE_CUE_RE.search(item))
+
+
+def _classify(kind: str, item: str) -> str:
+    if NICE_CUE_RE.search(item):
+        return "nice_to_have"
+    if kind == "other" and MUST_CUE_RE.search(item):
+        return "must_have"
+    return kind
+
+
+def build_profile(job_description: str) -> dict:
+    """Compact requirements profile of a job description.
+
+    {"summary", "must_have", "nice_to_have", "responsibilities", "skills": {"must", "nice"}, "compact"}
+    where "compact" is the prompt-ready text.
+    """
+    buckets = {"other": [], "must_have": [], "nice_to_have": [], "responsibilities": []}
+    current = "other"
+    for line in normalize_jd(job_description).splitlines():
+        if _is_heading(line):
+            current = heading_kind(line) or "other"
+            continue
+        items = [BULLET_RE.sub("", line, count=1)] if BULLET_RE.match(line) else SENTENCE_SPLIT_RE.split(line)
+        for item in items:
+            kind = current
+            inline = INLINE_HEADING_RE.match(item)
+            if inline and (inline_kind := heading_kind(inline.group(1))):
+                kind, item = inline_kind, inline.group(2)
+            if kind == "boilerplate" or (kind == "other" and _is_boilerplate_line(item)):
+                continue
+            buckets[_classify(kind, item)].append(item.strip())
+
+    profile = {key: list(dict.fromkeys(items))[:MAX_ITEMS] for key, items in buckets.items() if key != "other"}
+    summary_words = " ".join(buckets["other"]).split()
+    if not any(profile.values()):
+        # Unstructured posting: keep its sentences as the requirements
+        profile["must_have"] = list(dict.fromkeys(buckets["other"]))[:MAX_ITEMS]
+        summary_words = []
+    profile["summary"] = " ".join(summary_words[:MAX_SUMMARY_WORDS])
+
+    index = get_skill_index()
+    must_skills = index.extract(" ".join(profile["must_have"] + profile["responsibilities"]))
+    nice_skills = [skill for skill in index.extract(" ".join(profile["nice_to_have"])) if skill not in must_skills]
+    profile["skills"] = {"must": must_skills, "nice": nice_skills}
+    profile["compact"] = compact_text(profile)
+    return profile
+
+
+def compact_text(profile: dict) -> str:
+    lines = []
+    if profile.get("summary"):
+        lines.append(f"Summary: {profile['summary']}")
+    for key, title in (("must_have", "Must have"), ("nice_to_have", "Nice to have"),
+                       ("responsibilities", "Responsibilities")):
+        if profile.get(key):
+            lines.append(f"{title}:")
+            lines += [f"- {item}" for item in profile[key]]
+    return "\n".join(lines)
+
+
+# --- Shared cache: in-process LRU in front of the job_descriptions table ---
+
+_memory = OrderedDict()
+_lock = threading.Lock()
+_stats = {"memory_hits": 0, "db_hits": 0, "misses": 0, "raw_tokens": 0, "compact_tokens": 0}
+
+
+def _record(outcome: str, row: dict):
+    with _lock:
+        _stats[outcome] += 1
+        _stats["raw_tokens"] += row["raw_tokens"]
+        _stats["compact_tokens"] += row["compact_tokens"]
+
+
+def _remember(key: str, entry: dict):
+    with _lock:
+        _memory[key] = entry
+        _memory.move_to_end(key)
+        while len(_memory) > JD_CACHE_SIZE:
+            _memory.popitem(last=False)
+
+
+def _persist(db, key: str, entry: dict):
+    try:
+        db.merge(models.JobDescription(
+            content_hash=key,
+            profile_version=PROFILE_VERSION,
+            profile_json=entry["profile"],
+            raw_tokens=entry["raw_tokens"],
+            compact_tokens=entry["compact_tokens"],
+            created_at=datetime.datetime.utcnow(),
+        ))
+        db.commit()
+    except Exception as e:
+        # Another worker stored the same posting first, or the table is unavailable
+        db.rollback()
+        print(f"JD cache write failed: {e}")
+
+
+def get_jd_profile(db, job_description: str = None):
+    """Preprocessed profile for a job description, or None when there is none.
+
+    Looks in the process LRU, then the shared table, and only preprocesses
+    on a miss. Every lookup is counted in jd_cache_stats().
+    """
+    if not job_description or not job_description.strip():
+        return None
+    key = jd_fingerprint(job_description)
+
+    with _lock:
+        entry = _memory.get(key)
+        if entry is not None:
+            _memory.move_to_end(key)
+    if entry is not None:
+        _record("memory_hits", entry)
+        return entry["profile"]
+
+    outcome = "db_hits"
+    try:
+        row = db.get(models.JobDescription, key)
+    except Exception as e:
+        print(f"JD cache read failed: {e}")
+        row = None
+    if row is not None and row.profile_version == PROFILE_VERSION:
+        entry = {"profile": row.profile_json, "raw_tokens": row.raw_tokens, "compact_tokens": row.compact_tokens}
+    else:
+        outcome = "misses"
+        profile = build_profile(job_description)
+        entry = {"profile": profile, "raw_tokens": approx_tokens(job_description),
+                 "compact_tokens": approx_tokens(profile["compact"])}
+        _persist(db, key, entry)
+
+    _remember(key, entry)
+    _record(outcome, entry)
+    return entry["profile"]
+
+
+def prompt_job_description(jd_profile: dict, job_description: str = None):
+    """What goes into prompts: the compact profile when there is one."""
+    if jd_profile and jd_profile.get("compact"):
+        return jd_profile["compact"]
+    return job_description
+
+
+def jd_cache_stats() -> dict:
+    with _lock:
+        stats = dict(_stats)
+    lookups = stats["memory_hits"] + stats["db_hits"] + stats["misses"]
+    return {
+        "lookups": lookups,
+        "memory_hits": stats["memory_hits"],
+        "db_hits": stats["db_hits"],
+        "misses": stats["misses"],
+        "hit_rate": round((lookups - stats["misses"]) / lookups, 4) if lookups else 0.0,
+        "prompt_tokens_raw": stats["raw_tokens"],
+        "prompt_tokens_compact": stats["compact_tokens"],
+        "prompt_tokens_saved": stats["raw_tokens"] - stats["compact_tokens"],
+    }
+
+
+def reset_jd_cache():
+    with _lock:
+        _memory.clear()
+        for key in _stats:
+            _stats[key] = 0
@@ -0,0 +1,254 @@
+import json
+import threading
+import typing
+
+# Tolerant parsing of LLM JSON output. A generation that is cut off at the
+# token limit, wrapped in a markdown fence or has a trailing comma used to
+# fail json.loads and be thrown away whole, and paying for the complete
+# generation again is the expensive way to fix a few missing bytes.
+#
+# repair_json scans the text once, keeping track of open strings, objects
+# and arrays and of the last point where everything before it was a
+# complete top-level value. On truncation it cuts back to that point and
+# closes the object: a half-written field is dropped whole, never guessed
+# or kept half done (a list cut off after two of its five items would
+# otherwise pass as complete). A value where a comma or colon belongs, or a
+# key with no value, is cut back the same way: the fields before it are
+# kept and the rest are re-requested. coerce_fields then maps the salvaged values onto a response
+# model's field types, and reports the fields that are missing, so the
+# caller can ask for just those with a small follow-up prompt.
+
+repair_stats = {
+    "responses": 0,       # LLM analysis responses seen
+    "clean": 0,           # valid JSON with every field
+    "repaired": 0,        # needed syntax repair or coercion, no follow-up
+    "followups": 0,       # re-requested only the missing fields
+    "salvaged": 0,        # repaired or completed by a follow-up
+    "failed": 0,          # fell back to the error result
+    "followup_tokens": 0,  # completion tokens spent on follow-ups
+    "tokens_saved": 0,    # completion tokens a full retry would have cost, minus follow-ups
+}
+_stats_lock = threading.Lock()
+
+CLOSERS = {"{": "}", "[": "]"}
+SCALAR_START = "-0123456789tfn"  # first characters of numbers, true, false and null
+
+
+def record_repair(outcome: str, tokens_saved: int = 0, followup_tokens: int = 0) -> None:
+    with _stats_lock:
+        repair_stats["responses"] += 1
+        repair_stats[outcome] += 1
+        if outcome in ("repaired", "followups"):
+            repair_stats["salvaged"] += 1
+        repair_stats["tokens_saved"] += max(0, tokens_saved)
+        repair_stats["followup_tokens"] += followup_tokens
+
+
+def repair_summary() -> dict:
+    with _stats_lock:
+        stats = dict(repair_stats)
+    broken = stats["responses"] - stats["clean"]
+    stats["salvage_rate"] = round(stats["salvaged"] / broken, 4) if broken else None
+    return stats
+
+
+def _strip_fences(text: str) -> str:
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        if text.rstrip().endswith("```"):
+            text = text.rstrip()[:-3]
+    return text
+
+
+def repair_json(text: str):
+    """Best-effort JSON text for a possibly fenced, truncated or sloppy object; None if there is none.
+
+    Returns the repaired text, which json.loads accepts, or None when no
+    object starts in the input.
+    """
+    text = _strip_fences(text or "")
+    start = text.find("{")
+    if start < 0:
+        return None
+
+    out = []
+    stack = []        # open containers: [bracket, state]; object states: key, colon, value, comma
+    safe = 0          # len(out) at the last complete top-level value
+    in_string = escape = False
+    scalar = None     # bare token (number, true, false, null) being read
+
+    def mark_safe():
+        nonlocal safe
+        if len(stack) == 1:
+            safe = len(out)
+
+    def value_done():
+        if stack:
+            stack[-1][1] = "comma"
+        mark_safe()
+
+    def misplaced(is_string: bool) -> bool:
+        # A value where a comma or colon belongs, or a non-string key
+        return bool(stack) and (stack[-1][1] in ("comma", "colon") or (stack[-1][1] == "key" and not is_string))
+
+    def end_scalar() -> bool:
+        """Emit the pending scalar; False when it sits where no value may go."""
+        nonlocal scalar
+        if scalar is not None:
+            try:
+                json.loads(scalar)
+            except ValueError:
+                # A bare word, not a literal: dropped, or null where an object
+                # value is due so its key is not left dangling
+                scalar = None
+                if stack and stack[-1] == ["{", "value"]:
+                    out.append("null")
+                    value_done()
+                return True
+            if misplaced(False):
+                return False
+            out.append(scalar)
+            scalar = None
+            value_done()
+        return True
+
+    i, end = start, len(text)
+    while i < end:
+        char = text[i]
+        i += 1
+        if in_string:
+            if escape:
+                escape = False
+                out.append(char)
+            elif char == "\\":
+                escape = True
+                out.append(char)
+            elif char == '"':
+                in_string = False
+                out.append(char)
+                if stack[-1][0] == "{" and stack[-1][1] == "key":
+                    stack[-1][1] = "colon"
+                else:
+                    value_done()
+            elif char in "\n\r\t":
+                out.append({"\n": "\\n", "\r": "\\r", "\t": "\\t"}[char])  # raw control characters
+            else:
+                out.append(char)
+            continue
+
+        if scalar is not None:
+            if char.isalnum() or char in "+-.":
+                scalar += char
+                continue
+            if not end_scalar():
+                break
+
+        if char.isspace():
+            continue
+        if char == "/" and text[i:i + 1] in ("/", "*"):
+            # // line and /* block */ comments
+            close = text.find("\n" if text[i] == "/" else "*/", i + 1)
+            i = end if close < 0 else close + (1 if text[i] == "/" else 2)
+            continue
+        if char in '"{[' and misplaced(char == '"'):
+            break  # missing comma or colon: cut back below
+        if char in "}]," and stack and stack[-1][0] == "{" and stack[-1][1] in ("colon", "value"):
+            break  # a key without a value
+        if char == '"':
+            in_string = True
+            out.append(char)
+        elif char in "{[":
+            out.append(char)
+            stack.append([char, "key" if char == "{" else "value"])
+            mark_safe()
+        elif char in "}]":
+            if not stack:
+                break
+            while out and out[-1] == ",":
+                out.pop()  # trailing comma
+            out.append(CLOSERS[stack.pop()[0]])
+            if not stack:
+                return "".join(out)  # ignore anything after the top-level object
+            value_done()
+        elif char == ":" and stack and stack[-1][1] == "colon":
+            out.append(char)
+            stack[-1][1] = "value"
+        elif char == ",":
+            if stack and stack[-1][1] == "comma":
+                out.append(char)
+                stack[-1][1] = "key" if stack[-1][0] == "{" else "value"
+        elif char in SCALAR_START:
+            scalar = char
+        # anything else between tokens (stray prose, punctuation) is skipped
+
+    # Truncated: safe points never fall between a key and its value, so the
+    # cut-off field disappears with its key
+    repaired = out[:safe]
+    while repaired and repaired[-1] == ",":
+        repaired.pop()
+    return "".join(repaired) + "}"
+
+
+def parse_llm_json(text: str):
+    """json.loads, falling back to repair_json; raises ValueError when nothing can be salvaged."""
+    try:
+        return json.loads(text)
+    except (TypeError, ValueError):
+        repaired = repair_json(text)
+        if repaired is None:
+            raise ValueError("No JSON object in the model output")
+        return json.loads(repaired)
+
+
+def _as_text(value) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, list):
+        return "\n".join(_as_text(item) for item in value if item is not None)
+    if isinstance(value, dict):
+        return "\n".join(f"{key}: {_as_text(item)}" for key, item in value.items())
+    return str(value)
+
+
+def _coerce(value, annotation):
+    """value as the annotation's type, or None when that is not possible."""
+    if value is None:
+        return None
+    if annotation is int:
+        if isinstance(value, bool):
+            return None
+        if isinstance(value, (int, float)):
+            return round(value)
+        if isinstance(value, str):
+            digits = value.strip().rstrip("%").split("/")[0].strip()
+            try:
+                return round(float(digits))
+            except ValueError:
+                return None
+        return None
+    if annotation is str:
+        return _as_text(value)
+    if typing.get_origin(annotation) is list:
+        if isinstance(value, str):
+            lines = [line.strip().lstrip("-*• ").strip() for line in value.splitlines()]
+            return [line for line in lines if line]
+        if isinstance(value, list):
+            return [_as_text(item) for item in value if item is not None]
+        if isinstance(value, dict):
+            return [f"{key}: {_as_text(item)}" for key, item in value.items()]
+        return [_as_text(value)]
+    return value
+
+
+def coerce_fields(data, response_model) -> tuple:
+    """(values that fit the model's fields, names of the fields still missing)."""
+    values, missing = {}, []
+    data = data if isinstance(data, dict) else {}
+    for name, field in response_model.model_fields.items():
+        value = _coerce(data.get(name), field.annotation)
+        if value is None:
+            missing.append(name)
+        else:
+            values[name] = value
+    return values, missing
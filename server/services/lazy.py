@@ -0,0 +1,26 @@
+import importlib.util
+import sys
+
+
+def lazy_import(name: str):
+    """Return module `name` without executing it until an attribute is first accessed.
+
+    Keeps heavy dependencies (pdfminer, lxml, the Groq SDK) off the import path
+    of main.py; they load on first use or in the warm-up hook.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def ensure_loaded(module) -> None:
+    """Force a lazily imported module to finish loading."""
+    getattr(module, "__name__")
@@ -0,0 +1,74 @@
+import json
+import os
+import re
+import time
+from types import SimpleNamespace
+
+# Local stand-in for the Groq client (LLM_BACKEND=stub). It reads the
+# <Output_Format> skeleton of the prompt and returns deterministic JSON of
+# that shape, sleeping per generated token to mimic serial decoding, so
+# latency comparisons between prompting strategies can run offline.
+
+FIELD_RE = re.compile(r'^\s*"(\w+)":\s*(\[?)"?<(int|list|string)([^>]*)>', re.MULTILINE)
+BLOCK_RE = re.compile(r"<(Output_Format|User_Input)>(.*?)</\1>", re.DOTALL)
+BULLET_LINE_RE = re.compile(r"^\s*(?:[-*•▪●]|\d+[.)])\s+", re.MULTILINE)
+FILLER = ("delivered measurable improvements across the platform by applying targeted engineering "
+          "practices and quantifying the resulting impact for stakeholders").split()
+
+
+def _words(count: int) -> str:
+    return " ".join(FILLER[i % len(FILLER)] for i in range(count))
+
+
+def _token_count(text: str) -> int:
+    # ~1.3 tokens per English word
+    return int(len(text.split()) * 1.3) + 1
+
+
+class _Completions:
+    def __init__(self, client):
+        self._client = client
+
+    def create(self, messages, model, **kwargs):
+        prompt = "\n".join(message["content"] for message in messages)
+        blocks = dict(BLOCK_RE.findall(prompt))
+        user_input = blocks.get("User_Input", "")
+        input_bullets = max(len(BULLET_LINE_RE.findall(user_input)), 1)
+
+        result = {}
+        for name, is_list, kind, description in FIELD_RE.findall(blocks.get("Output_Format", prompt)):
+            if kind == "int":
+                result[name] = 70
+            elif is_list or kind == "list":
+                count = input_bullets if "bullets" in name else 3
+                result[name] = [f"{name} {i + 1}: {_words(20)}" for i in range(count)]
+            elif "MARKDOWN" in description:
+                result[name] = _words(len(user_input.split()))
+            else:
+                result[name] = _words(40)
+        content = json.dumps(result)
+
+        completion_tokens = _token_count(content)
+        time.sleep((self._client.base_latency_ms + completion_tokens * self._client.token_latency_ms) / 1000)
+        usage = SimpleNamespace(
+            prompt_tokens=_token_count(prompt),
+            completion_tokens=completion_tokens,
+            total_tokens=_token_count(prompt) + completion_tokens,
+        )
+        message = SimpleNamespace(role="assistant", content=content)
+        return SimpleNamespace(
+            model=model,
+            choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")],
+            usage=usage,
+        )
+
+
+class StubClient:
+    """Mimics groq.Groq: client.chat.completions.create(...)."""
+
+    def __init__(self, base_latency_ms: float = None, token_latency_ms: float = None, **kwargs):
+        self.base_latency_ms = float(base_latency_ms if base_latency_ms is not None
+                                     else os.getenv("STUB_BASE_LATENCY_MS", 0))
+        self.token_latency_ms = float(token_latency_ms if token_latency_ms is not None
+                                      else os.getenv("STUB_TOKEN_LATENCY_MS", 0))
+        self.chat = SimpleNamespace(completions=_Completions(self))
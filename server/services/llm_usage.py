@@ -0,0 +1,71 @@
+import contextlib
+import contextvars
+import threading
+
+# Token accounting for LLM calls. complete() reports every completion's
+# provider-side usage to the meter of the analysis it runs for; the request
+# handler opens the meter around the analysis and stores its totals on the
+# ResumeAnalysis row, and analytics folds those into the llm_usage_daily
+# ledger. The meter lives in a context variable, so nothing is threaded
+# through the analyzers: run_in_threadpool copies the context into its
+# worker, and section_analysis submits its concurrent calls the same way.
+
+_current_meter = contextvars.ContextVar("llm_usage_meter", default=None)
+
+
+def _tokens(usage, name: str, fallback_text: str) -> int:
+    tokens = getattr(usage, name, None)
+    if isinstance(tokens, int):
+        return tokens
+    return len(fallback_text or "") // 4  # ~4 characters per token
+
+
+def completion_tokens(completion) -> int:
+    return _tokens(getattr(completion, "usage", None), "completion_tokens", completion.choices[0].message.content)
+
+
+def prompt_tokens(completion, prompt: str) -> int:
+    return _tokens(getattr(completion, "usage", None), "prompt_tokens", prompt)
+
+
+class UsageMeter:
+    """Calls and tokens of one analysis; safe to add to from concurrent calls."""
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+
+    def add(self, prompt: int, completion: int) -> None:
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt
+            self.completion_tokens += completion
+
+    def columns(self) -> dict:
+        """ResumeAnalysis columns (see store_analysis)."""
+        return {"llm_calls": self.calls, "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens}
+
+
+@contextlib.contextmanager
+def usage_meter():
+    """Meter every LLM call made inside the block, including from run_in_threadpool."""
+    meter = UsageMeter()
+    token = _current_meter.set(meter)
+    try:
+        yield meter
+    finally:
+        _current_meter.reset(token)
+
+
+def record_call(completion, prompt: str) -> None:
+    meter = _current_meter.get()
+    if meter is not None:
+        meter.add(prompt_tokens(completion, prompt), completion_tokens(completion))
+
+
+def submit_in_context(pool, fn, *args):
+    """pool.submit that keeps the caller's meter; each call gets its own context copy."""
+    return pool.submit(contextvars.copy_context().run, fn, *args)
@@ -0,0 +1,135 @@
+import os
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
+
+# Latency-budgeted model routing for the LLM analysis. Each request gets a
+# preferred tier from its size (estimated tokens of resume plus JD), whether
+# a JD was given, and the mode: a half-page resume without a JD does not
+# need the largest model, a five-page resume against a detailed JD does.
+# Parallel and incremental modes split the work into small concurrent
+# calls, so they go one tier down.
+#
+# The router then checks the preferred model's recent p95 latency (observed
+# by ai_analyzer.complete in this process) against the request's latency budget
+# and walks down to faster tiers until one fits. Samples expire after
+# LATENCY_MAX_AGE, and a model with too few samples is assumed to fit, so a
+# tier that fell out of favour gets probed again once its slow calls age
+# out. The chosen model, the routing reason and the observed latency are
+# stored on each analysis for offline evaluation.
+#
+# Routing is opt-in (LLM_ROUTING=1): until the smaller tiers have been
+# evaluated against the strong one, every request uses the strong tier.
+
+MODEL_TIERS = (  # fastest first
+    ("fast", os.getenv("LLM_MODEL_FAST", "llama-3.1-8b-instant")),
+    ("balanced", os.getenv("LLM_MODEL_BALANCED", "openai/gpt-oss-20b")),
+    ("strong", os.getenv("LLM_MODEL_STRONG", "openai/gpt-oss-120b")),
+)
+LLM_ROUTING = os.getenv("LLM_ROUTING", "0") == "1"  # 0: every request uses the strong tier
+LLM_LATENCY_BUDGET_MS = int(os.getenv("LLM_LATENCY_BUDGET_MS", 60000))
+# Estimated input tokens (resume + JD) above which a request needs a stronger tier
+MEDIUM_INPUT_TOKENS = 800
+LARGE_INPUT_TOKENS = 2500
+LATENCY_WINDOW = 200  # recent calls per model
+LATENCY_MAX_AGE = 300  # seconds
+MIN_SAMPLES = 20  # before a p95 is trusted
+SPLIT_MODES = ("parallel", "incremental")
+
+
+@dataclass
+class Route:
+    model: str
+    tier: str
+    reason: str  # "preferred", "p95 over budget (<tier>)" or "routing off"
+    budget_ms: int
+
+    def columns(self, seconds: float) -> dict:
+        """ResumeAnalysis columns recording this route and the observed latency."""
+        return {"llm_model": self.model, "llm_route": f"{self.tier}: {self.reason}",
+                "llm_latency_ms": round(seconds * 1000)}
+
+
+class LatencyTracker:
+    """Sliding window of call latencies per model."""
+
+    def __init__(self, window: int = LATENCY_WINDOW, min_samples: int = MIN_SAMPLES,
+                 max_age: float = LATENCY_MAX_AGE):
+        self.window = window
+        self.min_samples = min_samples
+        self.max_age = max_age
+        self._samples = {}  # model -> deque of (monotonic time, ms)
+        self._lock = threading.Lock()
+
+    def observe(self, model: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(model, deque(maxlen=self.window)).append((time.monotonic(), seconds * 1000))
+
+    def p95(self, model: str):
+        """Recent p95 in ms, or None with fewer than min_samples calls within max_age."""
+        cutoff = time.monotonic() - self.max_age
+        with self._lock:
+            samples = sorted(ms for observed, ms in self._samples.get(model, ()) if observed >= cutoff)
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            models = {model: len(samples) for model, samples in self._samples.items()}
+        return {model: {"calls": calls, "p95_ms": self.p95(model)} for model, calls in models.items()}
+
+
+latency_tracker = LatencyTracker()
+routing_stats = Counter()  # "<tier>: <reason>" -> requests
+
+
+def estimate_tokens(*texts) -> int:
+    # ~4 characters per token for English prose
+    return sum(len(text or "") for text in texts) // 4
+
+
+def preferred_tier(resume_text: str, job_description: str = None, mode: str = "full") -> int:
+    """Index into MODEL_TIERS for the input alone, ignoring latency."""
+    tokens = estimate_tokens(resume_text, job_description)
+    tier = bool(job_description and job_description.strip()) + (tokens > MEDIUM_INPUT_TOKENS) + \
+        (tokens > LARGE_INPUT_TOKENS)
+    tier = min(tier, len(MODEL_TIERS) - 1)
+    if mode in SPLIT_MODES:
+        tier -= 1
+    return max(0, tier)
+
+
+def route_model(resume_text: str, job_description: str = None, mode: str = "full", budget_ms: int = None,
+                tracker: LatencyTracker = None) -> Route:
+    """Preferred tier for the input, or the strongest faster tier whose recent p95 fits the budget."""
+    budget_ms = budget_ms or LLM_LATENCY_BUDGET_MS
+    tracker = tracker or latency_tracker
+    if not LLM_ROUTING:
+        tier, model = MODEL_TIERS[-1]
+        route = Route(model, tier, "routing off", budget_ms)
+    else:
+        preferred = preferred_tier(resume_text, job_description, mode)
+        route = None
+        for index in range(preferred, -1, -1):
+            tier, model = MODEL_TIERS[index]
+            p95 = tracker.p95(model)
+            if p95 is None or p95 <= budget_ms:
+                reason = "preferred" if index == preferred else f"p95 over budget ({MODEL_TIERS[preferred][0]})"
+                route = Route(model, tier, reason, budget_ms)
+                break
+        if route is None:  # nothing fits: the fastest tier gets closest
+            tier, model = MODEL_TIERS[0]
+            route = Route(model, tier, f"p95 over budget ({MODEL_TIERS[preferred][0]})", budget_ms)
+    routing_stats[f"{route.tier}: {route.reason}"] += 1
+    return route
+
+
+def router_stats() -> dict:
+    return {
+        "tiers": dict(MODEL_TIERS),
+        "budget_ms": LLM_LATENCY_BUDGET_MS,
+        "routes": dict(routing_stats),
+        "latency": latency_tracker.snapshot(),
+    }
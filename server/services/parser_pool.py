@@ -0,0 +1,252 @@
+import math
+import multiprocessing
+import os
+import pickle
+import queue
+import threading
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits, timeouts and page caps still apply
+    resource = None
+
+# Sandboxed resume parsing. Uploads are parsed in a pool of pre-forked
+# worker processes so a hostile or pathological file (deep object trees,
+# huge images, decompression bombs) can only take down a disposable worker,
+# never the API process. Each worker runs under an address-space limit and
+# a per-job CPU-seconds limit; the parent enforces a wall-clock timeout and
+# replaces workers that die, time out or have served PARSER_MAX_JOBS jobs.
+# File bytes go to the worker over a pipe as a raw buffer (no pickling);
+# the parsed result comes back pickled on the same pipe.
+
+PARSER_POOL_SIZE = int(os.getenv("PARSER_POOL_SIZE", 2))  # 0 parses in-process
+PARSER_TIMEOUT = float(os.getenv("PARSER_TIMEOUT", 20))
+PARSER_CPU_SECONDS = int(os.getenv("PARSER_CPU_SECONDS", 10))
+# Address space a job may use on top of the worker's idle footprint
+PARSER_MEMORY_MB = int(os.getenv("PARSER_MEMORY_MB", 512))
+PARSER_MAX_PAGES = int(os.getenv("PARSER_MAX_PAGES", 50))
+PARSER_MAX_JOBS = int(os.getenv("PARSER_MAX_JOBS", 200))
+
+# Imported once in the fork server, so every worker starts with the parsers
+# loaded; real modules first so resume_parser's lazy imports pick them up
+PRELOAD = ["pdfplumber", "pypdfium2", "docx", "services.resume_parser"]
+
+
+class ParserError(Exception):
+    """A file the sandbox refused or could not parse; `reason` is the metrics key."""
+
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+def _address_space() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def _limit_memory(memory_mb: int) -> None:
+    try:
+        limit = _address_space() + memory_mb * 1024 * 1024
+    except OSError:  # no /proc (macOS): fall back to an absolute limit
+        limit = memory_mb * 4 * 1024 * 1024
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _limit_cpu(cpu_seconds: int) -> None:
+    # RLIMIT_CPU counts the whole process lifetime, so move it up per job;
+    # going over sends SIGXCPU, which kills the worker
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = math.ceil(usage.ru_utime + usage.ru_stime) + cpu_seconds
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _parse_job(file_bytes: bytes, filename: str, max_pages: int) -> tuple:
+    from services import resume_parser
+
+    if filename.endswith(".pdf"):
+        pages = resume_parser.pdf_page_count(file_bytes)
+        if pages is not None and pages > max_pages:
+            return "error", "too_many_pages", f"Resume has {pages} pages; the limit is {max_pages}."
+    fallbacks = resume_parser.pdf_engine_stats["fallbacks"]
+    parsed = resume_parser.extract_document(file_bytes, filename)
+    return "ok", parsed, resume_parser.pdf_engine_stats["fallbacks"] > fallbacks
+
+
+def worker_main(conn, limits: dict, job=_parse_job) -> None:
+    """Serve jobs from the parent until it sends None or closes the pipe."""
+    if resource is not None:
+        _limit_memory(limits["memory_mb"])
+    while True:
+        try:
+            filename = conn.recv()
+        except EOFError:
+            return
+        if filename is None:
+            return
+        file_bytes = conn.recv_bytes()
+        if resource is not None:
+            _limit_cpu(limits["cpu_seconds"])
+        try:
+            reply = job(file_bytes, filename, limits["max_pages"])
+        except MemoryError:
+            reply = ("error", "memory", "Resume needs too much memory to parse.")
+        except Exception as e:
+            reply = ("error", "error", f"Could not parse resume: {e}")
+        conn.send_bytes(pickle.dumps(reply, protocol=pickle.HIGHEST_PROTOCOL))
+        if reply[1] == "memory":
+            return  # allocator state is suspect; let the parent replace us
+
+
+class _Worker:
+    def __init__(self, context, limits: dict, job):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=worker_main, args=(child_conn, limits, job), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+
+    def stop(self, timeout: float = 1.0) -> None:
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        self.kill()
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class ParserPool:
+    def __init__(self, size: int = PARSER_POOL_SIZE, timeout: float = PARSER_TIMEOUT,
+                 cpu_seconds: int = PARSER_CPU_SECONDS, memory_mb: int = PARSER_MEMORY_MB,
+                 max_pages: int = PARSER_MAX_PAGES, max_jobs: int = PARSER_MAX_JOBS, job=_parse_job):
+        methods = multiprocessing.get_all_start_methods()
+        # Fork server: workers fork from a clean single-threaded process, not the threaded API worker
+        self._context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        if "forkserver" in methods:
+            self._context.set_forkserver_preload(PRELOAD)
+        self.size = size
+        self.timeout = timeout
+        self.max_jobs = max_jobs
+        self._job = job  # module-level function, run in the worker
+        self._limits = {"cpu_seconds": cpu_seconds, "memory_mb": memory_mb, "max_pages": max_pages}
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self.metrics = {"jobs": 0, "ok": 0, "errors": 0, "timeouts": 0, "killed": 0, "memory": 0,
+                        "too_many_pages": 0, "recycled": 0, "started": 0}
+        for _ in range(size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self) -> _Worker:
+        with self._lock:
+            self.metrics["started"] += 1
+        return _Worker(self._context, self._limits, self._job)
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.metrics[key] += 1
+
+    def _release(self, worker: _Worker, healthy: bool) -> None:
+        if healthy and worker.jobs < self.max_jobs and not self._closed:
+            self._idle.put(worker)
+            return
+        if healthy:
+            self._count("recycled")
+            worker.stop()
+        else:
+            worker.kill()
+        if not self._closed:
+            self._idle.put(self._spawn())
+
+    def _run(self, worker: _Worker, file_bytes: bytes, filename: str) -> tuple:
+        try:
+            worker.conn.send(filename)
+            worker.conn.send_bytes(file_bytes)
+            if not worker.conn.poll(self.timeout):
+                self._count("timeouts")
+                raise ParserError("timeout", f"Resume took longer than {self.timeout:g}s to parse.")
+            return pickle.loads(worker.conn.recv_bytes())
+        except (EOFError, OSError):
+            # Killed by the OS: CPU limit (SIGXCPU) or an allocator abort under the memory limit
+            self._count("killed")
+            raise ParserError("killed", "Resume parser crashed on this file.")
+
+    def parse(self, file_bytes: bytes, filename: str):
+        """ParsedResume for the file, or ParserError if the sandbox rejected or lost the job."""
+        from services.resume_parser import PDF_ENGINES, record_pdf_engine
+
+        try:
+            worker = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            self._count("timeouts")
+            raise ParserError("timeout", "Resume parser is busy, please retry.")
+        self._count("jobs")
+        worker.jobs += 1
+        try:
+            status, value, extra = self._run(worker, file_bytes, filename)
+        except ParserError:
+            self._release(worker, healthy=False)
+            raise
+        self._release(worker, healthy=value != "memory")
+
+        if status == "error":
+            self._count(value if value in self.metrics else "errors")
+            raise ParserError(value, extra)
+        self._count("ok")
+        if value.engine in PDF_ENGINES:
+            record_pdf_engine(value.engine, extra)
+        return value
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self.metrics, "size": self.size, "idle": self._idle.qsize()}
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().stop()
+            except queue.Empty:
+                return
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def start_parser_pool(size: int = PARSER_POOL_SIZE):
+    """Pre-fork the parser workers; a size of 0 keeps parsing in-process."""
+    global _pool
+    with _pool_lock:
+        if _pool is None and size > 0:
+            _pool = ParserPool(size)
+    return _pool
+
+
+def get_parser_pool():
+    return _pool
+
+
+def stop_parser_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+def parser_pool_stats() -> dict:
+    pool = _pool
+    return pool.stats() if pool is not None else {"size": 0}
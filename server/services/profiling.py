@@ -0,0 +1,223 @@
+import glob
+import os
+import random
+import re
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+import orjson
+
+# Opt-in request profiling. With PROFILE_DIR set, main.py installs
+# ProfilingMiddleware; without it nothing is installed and requests pay
+# nothing. A request is profiled when an admin sends "X-Profile: 1" with
+# their bearer token, or at random with PROFILE_SAMPLE_RATE.
+#
+# A profiled request runs under a sampling profiler (a thread reading
+# sys._current_frames every PROFILE_INTERVAL_MS) and tracemalloc. Sampling
+# covers every thread because parsing and LLM calls run in the threadpool,
+# so concurrent requests can show up in the stacks too; work done inside
+# the parser pool's worker processes is not visible. One request is
+# profiled at a time. Reports go to PROFILE_DIR, keeping the newest
+# PROFILE_MAX_REPORTS:
+#   <id>.json    summary (path, status, duration, samples, peak memory)
+#   <id>.folded  collapsed stacks, input for flamegraph.pl / speedscope
+#   <id>.alloc   top allocation sites near peak memory and at the end
+
+PROFILE_DIR = os.getenv("PROFILE_DIR")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", 5)) / 1000
+PROFILE_MAX_REPORTS = int(os.getenv("PROFILE_MAX_REPORTS", 50))
+TRACEMALLOC_FRAMES = 10
+TOP_ALLOCATIONS = 25
+# Re-snapshot when traced memory grows this much past the last snapshot
+PEAK_SNAPSHOT_GROWTH = 1.25
+PEAK_SNAPSHOT_MIN_BYTES = 1024 * 1024
+REPORT_KINDS = ("folded", "alloc")
+REPORT_ID_RE = re.compile(r"^\d{8}T\d{6}-[0-9a-f]{8}$")
+
+_active = threading.Lock()  # sampler and tracemalloc are process-wide
+
+
+class StackSampler:
+    """Counts collapsed stacks of all other threads at a fixed interval.
+
+    While tracemalloc is on it also keeps a snapshot taken near the peak of
+    traced memory, since most of a request's allocations are freed by the end.
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.peak_snapshot = None
+        self._snapshot_at = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if ident not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                frames.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(frames))] += 1
+            self.samples += 1
+            if tracemalloc.is_tracing():
+                current, _ = tracemalloc.get_traced_memory()
+                if current > max(self._snapshot_at * PEAK_SNAPSHOT_GROWTH, PEAK_SNAPSHOT_MIN_BYTES):
+                    self.peak_snapshot = tracemalloc.take_snapshot()
+                    self._snapshot_at = current
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _top_allocations(snapshot) -> list:
+    lines = []
+    for stat in snapshot.statistics("traceback")[:TOP_ALLOCATIONS]:
+        lines.append(f"{stat.size / 1024:10.1f} KiB {stat.count:8d} blocks")
+        lines.extend(f"    {line}" for line in stat.traceback.format(most_recent_first=True)[:6])
+    return lines
+
+
+def allocation_report(peak_snapshot, end_snapshot) -> str:
+    sections = []
+    if peak_snapshot is not None:
+        sections += ["# Live near peak traced memory"] + _top_allocations(peak_snapshot) + [""]
+    sections += ["# Still live when the response finished"] + _top_allocations(end_snapshot)
+    return "\n".join(sections) + "\n"
+
+
+def _prune(directory: str, keep: int) -> None:
+    reports = sorted(glob.glob(os.path.join(directory, "*.json")))
+    for summary in reports[:max(len(reports) - keep, 0)]:
+        report_id = os.path.basename(summary)[:-len(".json")]
+        for path in [summary] + [os.path.join(directory, f"{report_id}.{kind}") for kind in REPORT_KINDS]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def write_report(directory: str, summary: dict, sampler: StackSampler, snapshot, keep: int) -> str:
+    os.makedirs(directory, exist_ok=True)
+    report_id = time.strftime("%Y%m%dT%H%M%S", time.gmtime()) + "-" + uuid.uuid4().hex[:8]
+    with open(os.path.join(directory, f"{report_id}.folded"), "w") as folded:
+        folded.write(sampler.collapsed())
+    with open(os.path.join(directory, f"{report_id}.alloc"), "w") as alloc:
+        alloc.write(allocation_report(sampler.peak_snapshot, snapshot))
+    # Summary last: a report is listed only once all its files exist
+    with open(os.path.join(directory, f"{report_id}.json"), "wb") as meta:
+        meta.write(orjson.dumps({"id": report_id, **summary}))
+    _prune(directory, keep)
+    return report_id
+
+
+def list_reports(directory: str = None) -> list:
+    directory = directory or PROFILE_DIR
+    if not directory:
+        return []
+    reports = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.json")), reverse=True):
+        try:
+            with open(path, "rb") as meta:
+                reports.append(orjson.loads(meta.read()))
+        except (OSError, ValueError):
+            continue  # pruned or half-written meanwhile
+    return reports
+
+
+def report_path(report_id: str, kind: str, directory: str = None):
+    """Path of a report file, or None for unknown ids/kinds (never anything outside the directory)."""
+    directory = directory or PROFILE_DIR
+    if not directory or kind not in REPORT_KINDS or not REPORT_ID_RE.match(report_id):
+        return None
+    path = os.path.join(directory, f"{report_id}.{kind}")
+    return path if os.path.exists(path) else None
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling admin-requested (X-Profile: 1) or sampled requests."""
+
+    def __init__(self, app, directory: str = None, sample_rate: float = None, keep: int = None,
+                 interval: float = None):
+        self.app = app
+        self.directory = directory or PROFILE_DIR
+        self.sample_rate = PROFILE_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.keep = keep or PROFILE_MAX_REPORTS
+        self.interval = interval or PROFILE_INTERVAL
+
+    def _trigger(self, scope):
+        headers = dict(scope.get("headers") or [])
+        if headers.get(b"x-profile", b"").lower() in (b"1", b"true"):
+            from auth import admin_email_from_token
+
+            authorization = headers.get(b"authorization", b"").decode("latin-1")
+            scheme, _, token = authorization.partition(" ")
+            if scheme.lower() == "bearer" and admin_email_from_token(token):
+                return "header"
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        trigger = self._trigger(scope)
+        if trigger is None or not _active.acquire(blocking=False):
+            return await self.app(scope, receive, send)
+
+        status = {}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        started_tracing = not tracemalloc.is_tracing()
+        try:
+            if started_tracing:
+                tracemalloc.start(TRACEMALLOC_FRAMES)
+            tracemalloc.reset_peak()
+            sampler = StackSampler(self.interval).start()
+            started = time.perf_counter()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                duration = time.perf_counter() - started
+                sampler.stop()
+                snapshot = tracemalloc.take_snapshot()
+                _, peak = tracemalloc.get_traced_memory()
+                if started_tracing:
+                    tracemalloc.stop()
+                try:
+                    write_report(self.directory, {
+                        "method": scope["method"], "path": scope["path"], "status": status.get("code"),
+                        "trigger": trigger, "duration_ms": round(duration * 1000, 1),
+                        "samples": sampler.samples, "peak_traced_bytes": peak,
+                        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                    }, sampler, snapshot, self.keep)
+                except OSError as e:
+                    print(f"Profile report failed: {e}")
+        finally:
+            _active.release()
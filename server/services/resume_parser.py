@@ -1,6 +1,26 @@
-import pdfplumber
-import docx
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from services.docx_extractor import extract_docx_streaming
+from services.parser_pool import get_parser_pool
+from services.lazy import lazy_import
+from services.section_segmenter import segment_resume, styled_lines_from_chars
+import hashlib
 import io
+import os
+import re
+import threading
+
+pdfplumber = lazy_import("pdfplumber")
+docx = lazy_import("docx")
+pdfium = lazy_import("pypdfium2")
+pdfminer_high_level = lazy_import("pdfminer.high_level")
+pdfminer_layout = lazy_import("pdfminer.layout")
+
+@dataclass
+class ParsedResume:
+    text: str
+    sections: dict = field(default_factory=dict)
+    engine: str = None
 
 def extract_text_from_pdf(file_bytes: bytes) -> str:
     with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
@@ -13,10 +33,177 @@ def extract_text_from_docx(file_bytes: bytes) -> str:
     doc = docx.Document(io.BytesIO(file_bytes))
     return "\n".join([para.text for para in doc.paragraphs])
 
-def parse_resume(file_bytes: bytes, filename: str) -> str:
+def extract_pdf_with_layout(file_bytes: bytes) -> tuple:
+    """Text plus heading hints from font size/weight, in a single pass over the pages."""
+    heading_hints = set()
+    with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
+        text = ""
+        for page in pdf.pages:
+            text += page.extract_text() or ""
+            # page.chars is cached by extract_text, so this adds no re-parse
+            heading_hints |= styled_lines_from_chars(page.chars)
+    return text, heading_hints
+
+# --- PDF extraction engines ---
+# Every engine returns (text, heading hints). pdfplumber is the accurate
+# path (character-level layout, font-based heading hints); pdfium and
+# pdfminer are fast text-only paths for long or large documents.
+
+def extract_pdf_pdfium(file_bytes: bytes) -> tuple:
+    pdf = pdfium.PdfDocument(file_bytes)
+    try:
+        pages = []
+        for page in pdf:
+            textpage = page.get_textpage()
+            pages.append(textpage.get_text_range().replace("\r\n", "\n"))
+            textpage.close()
+            page.close()
+    finally:
+        pdf.close()
+    return "\n".join(pages), set()
+
+def extract_pdf_pdfminer(file_bytes: bytes) -> tuple:
+    # boxes_flow=None skips the costly text-box ordering pass; resumes are single-flow
+    laparams = pdfminer_layout.LAParams(boxes_flow=None, detect_vertical=False)
+    return pdfminer_high_level.extract_text(io.BytesIO(file_bytes), laparams=laparams), set()
+
+PDF_ENGINES = {
+    "pdfplumber": extract_pdf_with_layout,
+    "pdfium": extract_pdf_pdfium,
+    "pdfminer": extract_pdf_pdfminer,
+}
+FAST_PDF_ENGINE = "pdfium"
+ACCURATE_PDF_ENGINE = "pdfplumber"
+
+# "auto" routes by policy; any engine name forces that engine
+PDF_ENGINE = os.getenv("PDF_ENGINE", "auto")
+# Short resumes get layout analysis (heading hints help segmentation)
+PDF_LAYOUT_MAX_PAGES = int(os.getenv("PDF_LAYOUT_MAX_PAGES", 2))
+PDF_LAYOUT_MAX_BYTES = int(os.getenv("PDF_LAYOUT_MAX_BYTES", 2 * 1024 * 1024))
+# Beyond these, broken fast output is kept rather than paying for pdfplumber
+PDF_ACCURATE_MAX_PAGES = int(os.getenv("PDF_ACCURATE_MAX_PAGES", 30))
+PDF_ACCURATE_MAX_BYTES = int(os.getenv("PDF_ACCURATE_MAX_BYTES", 20 * 1024 * 1024))
+PDF_MIN_CHARS_PER_PAGE = 200
+PDF_MAX_GARBAGE_RATIO = 0.05
+
+GARBAGE_RE = re.compile(r"\(cid:\d+\)|[\ufffd\ue000-\uf8ff\x00-\x08\x0b\x0c\x0e-\x1f]")
+pdf_engine_stats = {"engines": {}, "fallbacks": 0}
+_stats_lock = threading.Lock()
+
+def pdf_page_count(file_bytes: bytes):
+    """Page count from pdfium's cross-reference table, or None if pdfium cannot open the file."""
+    try:
+        pdf = pdfium.PdfDocument(file_bytes)
+    except Exception:
+        return None
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+def text_quality(text: str, pages: int) -> dict:
+    visible = sum(1 for ch in text if not ch.isspace())
+    garbage = sum(len(match) for match in GARBAGE_RE.findall(text))
+    return {
+        "chars_per_page": visible / max(pages or 1, 1),
+        "garbage_ratio": garbage / visible if visible else 1.0,
+    }
+
+def looks_broken(text: str, pages: int) -> bool:
+    """Too little text per page (scanned, image-only or unmapped fonts) or too many junk glyphs."""
+    quality = text_quality(text, pages)
+    return quality["chars_per_page"] < PDF_MIN_CHARS_PER_PAGE or quality["garbage_ratio"] > PDF_MAX_GARBAGE_RATIO
+
+def choose_pdf_engine(size: int, pages) -> str:
+    if PDF_ENGINE != "auto":
+        return PDF_ENGINE
+    if pages is None:
+        # pdfium could not read it; let pdfplumber try (and report the error)
+        return ACCURATE_PDF_ENGINE
+    if pages <= PDF_LAYOUT_MAX_PAGES and size <= PDF_LAYOUT_MAX_BYTES:
+        return ACCURATE_PDF_ENGINE
+    return FAST_PDF_ENGINE
+
+def extract_pdf(file_bytes: bytes) -> tuple:
+    """(text, heading hints, engine used) with policy-based engine selection."""
+    pages = pdf_page_count(file_bytes) if PDF_ENGINE == "auto" else None
+    engine = choose_pdf_engine(len(file_bytes), pages)
+    text, heading_hints = PDF_ENGINES[engine](file_bytes)
+    fallback = (
+        engine != ACCURATE_PDF_ENGINE and PDF_ENGINE == "auto"
+        and looks_broken(text, pages)
+        and pages <= PDF_ACCURATE_MAX_PAGES and len(file_bytes) <= PDF_ACCURATE_MAX_BYTES
+    )
+    if fallback:
+        engine = ACCURATE_PDF_ENGINE
+        text, heading_hints = PDF_ENGINES[engine](file_bytes)
+    record_pdf_engine(engine, fallback)
+    return text, heading_hints, engine
+
+def record_pdf_engine(engine: str, fallback: bool) -> None:
+    with _stats_lock:
+        pdf_engine_stats["engines"][engine] = pdf_engine_stats["engines"].get(engine, 0) + 1
+        pdf_engine_stats["fallbacks"] += fallback
+
+def extract_docx_with_layout(file_bytes: bytes) -> tuple:
+    """Text plus heading hints from heading styles and all-bold paragraphs."""
+    doc = docx.Document(io.BytesIO(file_bytes))
+    heading_hints = set()
+    for para in doc.paragraphs:
+        runs = [run for run in para.runs if run.text.strip()]
+        style = (para.style.name if para.style is not None else "") or ""
+        if style.startswith(("Heading", "Title")) or (runs and all(run.bold for run in runs)):
+            heading_hints.add(" ".join(para.text.split()).strip(" :#").lower())
+    return "\n".join([para.text for para in doc.paragraphs]), heading_hints
+
+# Parsed documents keyed by content hash, so re-uploads skip extraction and segmentation
+PARSE_CACHE_SIZE = int(os.getenv("PARSE_CACHE_SIZE", 128))
+_parse_cache = OrderedDict()
+_parse_cache_lock = threading.Lock()
+
+def _cache_key(file_bytes: bytes) -> str:
+    return hashlib.sha256(file_bytes).hexdigest()
+
+def parse_document(file_bytes: bytes, filename: str) -> ParsedResume:
+    key = _cache_key(file_bytes)
+    with _parse_cache_lock:
+        if key in _parse_cache:
+            _parse_cache.move_to_end(key)
+            return _parse_cache[key]
+
+    pool = get_parser_pool()
+    # Sandboxed worker when the pool is running (the API server), in-process otherwise
+    parsed = pool.parse(file_bytes, filename) if pool is not None else extract_document(file_bytes, filename)
+
+    with _parse_cache_lock:
+        _parse_cache[key] = parsed
+        while len(_parse_cache) > PARSE_CACHE_SIZE:
+            _parse_cache.popitem(last=False)
+    return parsed
+
+def extract_document(file_bytes: bytes, filename: str) -> ParsedResume:
+    """Text, heading-aware sections and engine for a file, without the cache."""
     if filename.endswith(".pdf"):
-        return extract_text_from_pdf(file_bytes)
+        text, heading_hints, engine = extract_pdf(file_bytes)
     elif filename.endswith(".docx") or filename.endswith(".doc"):
-        return extract_text_from_docx(file_bytes)
+        engine = "docx-stream"
+        try:
+            text, heading_hints = extract_docx_streaming(file_bytes)
+        except Exception as e:
+            print(f"Streaming DOCX extraction failed, using python-docx: {e}")
+            text, heading_hints = extract_docx_with_layout(file_bytes)
+            engine = "python-docx"
     else:
         raise ValueError("Unsupported file format")
+    return ParsedResume(text=text, sections=segment_resume(text, heading_hints), engine=engine)
+
+def get_sections(file_bytes: bytes, text: str) -> dict:
+    """Sections cached by parse_document, or segmented from plain text on a miss."""
+    with _parse_cache_lock:
+        parsed = _parse_cache.get(_cache_key(file_bytes))
+    if parsed is not None and parsed.text == text:
+        return parsed.sections
+    return segment_resume(text)
+
+def parse_resume(file_bytes: bytes, filename: str) -> str:
+    return parse_document(file_bytes, filename).text
@@ -0,0 +1,191 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from services.ai_analyzer import analyze_resume_with_ai, complete_json, create_client, error_result
+from services.llm_usage import submit_in_context
+
+# Parallel alternative to the monolithic prompt: one small scoring/gap call
+# plus one bullet-rewrite call per experience/project entry, run
+# concurrently and merged in resume order. Output tokens are decoded
+# serially per call, so splitting the generation shortens wall-clock time
+# for long resumes.
+
+MAX_PARALLEL_CALLS = int(os.getenv("MAX_PARALLEL_LLM_CALLS", 8))
+ENTRY_SECTIONS = ("experience", "projects")
+
+
+def scoring_prompt(text: str, target_role: str, job_description: str = None, experience_level: str = None) -> str:
+    return f"""
+    <Role>
+    You are a Brutally Honest Job Fit Analyzer specializing in recruitment, HR practices, and ATS optimization.
+    </Role>
+
+    <Instructions>
+    - Parse the JD to identify essential requirements vs. nice-to-haves, then find exact matches and critical gaps.
+    - Score job fit 0-100 strictly on evidence: < 60 POOR FIT, 60-79 MODERATE FIT, 80-100 STRONG FIT.
+    - Do NOT rewrite the resume; bullet points are rewritten separately.
+    - Output must be STRICTLY valid JSON as per the schema below.
+    </Instructions>
+
+    <User_Input>
+    Job Role: {target_role}
+    Job Description: {job_description if job_description else "Not provided"}
+    Experience Level: {experience_level if experience_level else "Not specified"}
+    Resume Content:
+    {text}
+    </User_Input>
+
+    <Output_Format>
+    {{
+      "overall_score": <int, 0-100, your evidence-based Job Fit Score (as per criteria)>,
+      "strengths": [<list of strings, specific matches found>],
+      "weaknesses": [<list of strings, critical gaps or mismatches found>],
+      "ats_issues": [<list of strings, formatting/keyword issues>],
+      "role_alignment_feedback": "<string, Detailed analysis of fit and alignment with role requirements>",
+      "missing_skills": [<list of strings, critical keywords from the JD or Industry Standards that are missing>],
+      "final_suggestions": "<string, summary of the Strategic Assessment and Implementation Guidance>",
+      "optimized_summary": "<string, 2-3 sentence professional summary tailored to the role>"
+    }}
+    </Output_Format>
+    """
+
+
+def bullets_prompt(section: str, entry: dict, target_role: str, job_description: str = None) -> str:
+    kind = "role" if section == "experience" else "project"
+    bullets = "\n".join(f"- {bullet}" for bullet in entry["bullets"])
+    return f"""
+    <Role>
+    You are an Elite Career Strategist rewriting resume bullet points for ATS optimization.
+    </Role>
+
+    <Instructions>
+    - Rewrite this {kind} as exactly 3 bullet points aligned with the target role and job description.
+    - Each bullet must follow the XYZ formula (Accomplished X by doing Y resulting in Z).
+    - Use unique, strong action verbs and quantify outcomes wherever the original supports it.
+    - Maintain truthfulness; do not invent employers, tools or numbers.
+    - Output must be STRICTLY valid JSON as per the schema below.
+    </Instructions>
+
+    <Context>
+    Job Role: {target_role}
+    Job Description: {job_description if job_description else "Not provided"}
+    </Context>
+
+    <User_Input>
+    {entry["header"]}
+    {bullets}
+    </User_Input>
+
+    <Output_Format>
+    {{
+      "rewritten_bullets": [<list of strings, the rewritten bullet points in order>]
+    }}
+    </Output_Format>
+    """
+
+
+def render_resume_markdown(sections: dict, summary: str, rewritten: dict) -> str:
+    """Assemble optimized_resume_content in the structure the monolithic prompt asks for."""
+    contact = sections.get("contact", {})
+    lines = [f"# {contact.get('name', 'NAME')}"]
+    details = [contact.get(key) for key in ("email", "phone") if contact.get(key)] + contact.get("links", [])
+    if details:
+        lines.append(" | ".join(f"**{detail}**" for detail in details))
+    summary = summary or sections.get("summary")
+    if summary:
+        lines += ["", "## SUMMARY", summary]
+    for section in ENTRY_SECTIONS:
+        if not sections.get(section):
+            continue
+        lines += ["", f"## {section.upper()}"]
+        for i, entry in enumerate(sections[section]):
+            if i:
+                lines.append("")
+            lines.append(f"**{entry['header']}**")
+            lines += [f"* {bullet}" for bullet in rewritten.get((section, i), entry["bullets"])]
+    if sections.get("skills"):
+        lines += ["", "## SKILLS", "* **Skills**: " + ", ".join(sections["skills"])]
+    for section in ("education", "certifications"):
+        if sections.get(section):
+            lines += ["", f"## {section.upper()}"] + [f"* {item}" for item in sections[section]]
+    return "\n".join(lines)
+
+
+def merge_section_results(scoring: dict, sections: dict, entries: list, rewritten: dict) -> dict:
+    """Deterministic merge: entries keep resume order regardless of completion order."""
+    optimized_bullets = [bullet for section, i, _ in entries for bullet in rewritten[(section, i)]]
+    return {
+        "overall_score": scoring.get("overall_score", 0),
+        "strengths": scoring.get("strengths", []),
+        "weaknesses": scoring.get("weaknesses", []),
+        "ats_issues": scoring.get("ats_issues", []),
+        "role_alignment_feedback": scoring.get("role_alignment_feedback", ""),
+        "optimized_bullets": optimized_bullets,
+        "missing_skills": scoring.get("missing_skills", []),
+        "final_suggestions": scoring.get("final_suggestions", ""),
+        "optimized_resume_content": render_resume_markdown(sections, scoring.get("optimized_summary"), rewritten),
+    }
+
+
+def entry_list(sections: dict) -> list:
+    """(section, index, entry) for every experience/project entry that has bullets, in resume order."""
+    return [
+        (section, i, entry)
+        for section in ENTRY_SECTIONS
+        for i, entry in enumerate(sections.get(section, []))
+        if entry["bullets"]
+    ]
+
+
+def run_section_analysis(text: str, sections: dict, target_role: str, job_description: str = None,
+                         experience_level: str = None, reuse: dict = None, model: str = None) -> tuple:
+    """Scoring plus concurrent bullet rewrites; returns (result, rewritten).
+
+    `reuse` maps (section, index) to previously rewritten bullets; those
+    entries are not sent to the LLM. `rewritten` maps every entry to its
+    final bullets. A failed rewrite keeps that entry's original bullets; a
+    failed scoring call returns the usual error result.
+    """
+    reuse = reuse or {}
+    entries = entry_list(sections)
+    pending = [(section, i, entry) for section, i, entry in entries if (section, i) not in reuse]
+
+    client = create_client()
+    with ThreadPoolExecutor(max_workers=max(1, min(len(pending) + 1, MAX_PARALLEL_CALLS))) as pool:
+        scoring_future = submit_in_context(
+            pool, complete_json, client, scoring_prompt(text, target_role, job_description, experience_level), model
+        )
+        rewrite_futures = [
+            submit_in_context(pool, complete_json, client,
+                              bullets_prompt(section, entry, target_role, job_description), model)
+            for section, _, entry in pending
+        ]
+
+        rewritten = {(section, i): reuse[(section, i)] for section, i, _ in entries if (section, i) in reuse}
+        for (section, i, entry), future in zip(pending, rewrite_futures):
+            try:
+                bullets = [b for b in future.result().get("rewritten_bullets", []) if isinstance(b, str)]
+            except Exception as e:
+                print(f"AI Bullet Rewrite Error ({section} {i}): {e}")
+                bullets = []
+            rewritten[(section, i)] = bullets or entry["bullets"]
+
+        try:
+            scoring = scoring_future.result()
+        except Exception as e:
+            print(f"AI Analysis Error: {e}")
+            return error_result(e), rewritten
+
+    return merge_section_results(scoring, sections, entries, rewritten), rewritten
+
+
+def analyze_resume_sectioned(text: str, sections: dict, target_role: str, job_description: str = None,
+                             experience_level: str = None, model: str = None) -> dict:
+    """Scoring and per-entry bullet rewriting as concurrent LLM calls.
+
+    Falls back to the monolithic prompt when segmentation found no
+    experience or project entries to split on.
+    """
+    if not entry_list(sections):
+        return analyze_resume_with_ai(text, target_role, job_description, experience_level, model)
+    result, _ = run_section_analysis(text, sections, target_role, job_description, experience_level, model=model)
+    return result
@@ -0,0 +1,187 @@
+import re
+from collections import Counter
+
+# Splits extracted resume text into typed sections. Headings are recognised
+# from a precompiled keyword pattern, optionally reinforced by layout cues
+# (larger or bold lines) collected while the document was parsed.
+
+SECTION_KEYWORDS = {
+    "contact": ("contact", "contact information", "contact details", "personal details"),
+    "summary": ("summary", "professional summary", "profile", "professional profile", "objective",
+                "career objective", "about me", "about"),
+    "experience": ("experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "career history", "relevant experience"),
+    "projects": ("projects", "personal projects", "academic projects", "key projects", "selected projects"),
+    "skills": ("skills", "technical skills", "core skills", "key skills", "core competencies",
+               "competencies", "technologies", "tools", "tech stack", "skills & tools"),
+    "education": ("education", "academic background", "education & training", "qualifications"),
+    "certifications": ("certifications", "certificates", "licenses", "licenses & certifications",
+                       "certifications & licenses", "courses"),
+}
+KEYWORD_TO_SECTION = {keyword: section for section, keywords in SECTION_KEYWORDS.items() for keyword in keywords}
+HEADING_RE = re.compile(
+    r"^\s*(?:#{1,3}\s*)?(" + "|".join(sorted((re.escape(k) for k in KEYWORD_TO_SECTION), key=len, reverse=True))
+    + r")\s*:?\s*$",
+    re.IGNORECASE,
+)
+# A numbered marker is a short number followed by a space, or "3.9 GPA" and
+# "2019) ..." date lines would lose their digits
+BULLET_RE = re.compile(r"^\s*(?:[-*•▪●◦‣∙–]\s*|\d{1,2}[.)]\s+)")
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+PHONE_RE = re.compile(r"\+?\d[\d\s().-]{7,}\d")
+LINK_RE = re.compile(r"(?:https?://|www\.)\S+|(?:linkedin|github)\.com/\S+", re.IGNORECASE)
+YEAR_RE = re.compile(r"\b(?:19|20)\d{2}\b|\bpresent\b", re.IGNORECASE)
+SKILL_SPLIT_RE = re.compile(r"\s*[,;|•·]\s*|\s{2,}")
+# Words a styled heading may add around a section keyword ("Experience Highlights")
+HEADING_FILLER = {"and", "&", "my", "other", "additional", "selected", "relevant", "key", "core",
+                  "summary", "overview", "highlights", "details", "section"}
+# Common in employer and product names ("Acme Tools"), so never a heading hint on their own
+HINT_EXCLUDED = ("tools", "about")
+ENTRY_SECTIONS = ("experience", "projects")
+LIST_SECTIONS = ("education", "certifications")
+
+
+def styled_lines_from_chars(chars: list, size_ratio: float = 1.15) -> set:
+    """Normalized text of lines that look like headings in a pdfplumber page.
+
+    A line qualifies when its font is noticeably larger than the page's
+    dominant size or most of its characters are bold.
+    """
+    lines = {}
+    for ch in chars:
+        text = ch.get("text", "")
+        if not text.strip():
+            text = " "
+        line = lines.setdefault(round(ch.get("top", 0)), [[], 0.0, 0, 0])
+        line[0].append(text)
+        line[1] = max(line[1], ch.get("size", 0) or 0)
+        line[2] += 1
+        line[3] += "bold" in (ch.get("fontname") or "").lower()
+    if not lines:
+        return set()
+    sizes = Counter()
+    for _, size, count, _ in lines.values():
+        sizes[round(size, 1)] += count
+    body_size = sizes.most_common(1)[0][0]
+    hints = set()
+    for parts, size, count, bold in lines.values():
+        if size >= body_size * size_ratio or bold > count / 2:
+            hints.add(normalize_line("".join(parts)))
+    return hints
+
+
+def normalize_line(line: str) -> str:
+    return " ".join(line.split()).strip(" :#").lower()
+
+
+def heading_section(line: str, heading_hints: set = frozenset()):
+    """Section type if `line` is a heading, else None."""
+    match = HEADING_RE.match(line)
+    if match:
+        return KEYWORD_TO_SECTION[match.group(1).lower()]
+    normalized = normalize_line(line)
+    words = normalized.split()
+    if normalized in heading_hints and len(words) <= 4:
+        # The keyword as whole words at either end, the rest only filler
+        for keyword, section in KEYWORD_TO_SECTION.items():
+            if keyword in HINT_EXCLUDED:
+                continue
+            keyword_words = keyword.split()
+            size = len(keyword_words)
+            if words[:size] == keyword_words and all(word in HEADING_FILLER for word in words[size:]):
+                return section
+            if words[-size:] == keyword_words and all(word in HEADING_FILLER for word in words[:-size]):
+                return section
+    return None
+
+
+def _contact(lines: list) -> dict:
+    block = "\n".join(lines)
+    contact = {}
+    name = next((line for line in lines if not EMAIL_RE.search(line) and not PHONE_RE.search(line)), None)
+    if name:
+        contact["name"] = name.split("|")[0].strip()
+    if email := EMAIL_RE.search(block):
+        contact["email"] = email.group(0)
+    if phone := PHONE_RE.search(block):
+        contact["phone"] = phone.group(0).strip()
+    links = LINK_RE.findall(block)
+    if links:
+        contact["links"] = links
+    return contact
+
+
+def _looks_like_entry_header(line: str) -> bool:
+    return bool(YEAR_RE.search(line)) or "|" in line or " at " in line \
+        or (line[:1].isupper() and len(line.split()) <= 8 and not line.endswith("."))
+
+
+def _entries(lines: list) -> list:
+    """Group lines into {header, bullets} entries (jobs, projects)."""
+    entries = []
+    previous_was_bullet = False
+    for line in lines:
+        if BULLET_RE.match(line) and entries:
+            entries[-1]["bullets"].append(BULLET_RE.sub("", line, count=1).strip())
+            previous_was_bullet = True
+        elif not entries or (previous_was_bullet and _looks_like_entry_header(line)):
+            entries.append({"header": line, "bullets": []})
+            previous_was_bullet = False
+        elif entries[-1]["bullets"]:
+            # wrapped continuation of the previous bullet
+            entries[-1]["bullets"][-1] += " " + line
+        else:
+            entries[-1]["header"] += " | " + line
+    return entries
+
+
+def _skills(lines: list) -> list:
+    skills = []
+    for line in lines:
+        line = BULLET_RE.sub("", line, count=1)
+        if ":" in line:
+            line = line.split(":", 1)[1]
+        skills.extend(part.strip() for part in SKILL_SPLIT_RE.split(line) if part.strip())
+    return list(dict.fromkeys(skills))
+
+
+def segment_resume(text: str, heading_hints: set = frozenset()) -> dict:
+    """Compact structured representation of a resume.
+
+    Returns only the sections that were found, e.g.
+    {"contact": {...}, "summary": "...", "experience": [{"header", "bullets"}],
+     "projects": [...], "skills": [...], "education": [...], "certifications": [...]}.
+    Lines before any recognised heading, beyond the first few contact
+    lines, are kept in "other".
+    """
+    buckets = {"contact": []}
+    current = "contact"
+    for raw_line in (text or "").splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+        section = heading_section(line, heading_hints)
+        if section:
+            current = section
+            buckets.setdefault(current, [])
+            continue
+        if current == "contact" and len(buckets["contact"]) >= 6:
+            # no heading near the top: treat the rest as unlabelled content
+            current = "other"
+        buckets.setdefault(current, []).append(line)
+
+    sections = {}
+    for section, lines in buckets.items():
+        if not lines:
+            continue
+        if section == "contact":
+            sections["contact"] = _contact(lines)
+        elif section in ENTRY_SECTIONS:
+            sections[section] = _entries(lines)
+        elif section == "skills":
+            sections["skills"] = _skills(lines)
+        elif section in LIST_SECTIONS:
+            sections[section] = [BULLET_RE.sub("", line, count=1).strip() for line in lines]
+        else:
+            sections[section] = " ".join(lines)
+    return sections
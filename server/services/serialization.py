@@ -0,0 +1,32 @@
+import orjson
+from fastapi.responses import JSONResponse
+from models import ResumeAnalysisResponse
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson instead of the stdlib encoder."""
+
+    def render(self, content) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return orjson.dumps(content)
+
+
+def validate_analysis(raw, response_model=ResumeAnalysisResponse):
+    """Validate an analysis result exactly once.
+
+    Accepts the raw LLM output as a JSON string/bytes (parsed and validated in a
+    single pydantic-core pass), an already-decoded dict, or a model instance
+    (returned unchanged). Compact depths pass their own response model; fields
+    it does not declare are dropped.
+    """
+    if isinstance(raw, response_model):
+        return raw
+    if isinstance(raw, (str, bytes)):
+        return response_model.model_validate_json(raw)
+    return response_model.model_validate(raw)
+
+
+def dump_analysis(analysis) -> dict:
+    """JSON-compatible payload that is both stored and returned to the client."""
+    return analysis.model_dump(mode="json")
@@ -0,0 +1,303 @@
+import math
+import os
+import struct
+import threading
+import zlib
+from collections import Counter
+import models
+from services.ats_scorer import canonical_terms
+from services.jd_preprocessor import jd_fingerprint
+from services.lazy import lazy_import
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines
+    fcntl = None
+
+np = lazy_import("numpy")
+
+# Nearest-neighbour search over stored analyses. Resumes are embedded with a
+# signed hashing vectorizer (no vocabulary to fit or store) over the same
+# canonical terms the ATS scorer uses, plus a separately hashed target-role
+# component. Vectors are appended to a flat file of fixed-size records that
+# every worker memory-maps, so the index is shared through the page cache
+# and a new analysis only costs one appended record.
+#
+# Without SIMILARITY_INDEX_PATH each worker keeps its own in-memory index.
+# Either way, queries first catch the index up with rows other workers (or
+# the write-behind buffer) stored, one bounded batch at a time; the full
+# initial backfill runs in warm-up, off the request path. Catch-up starts
+# from the index's DB watermark (every id up to it has been looked at), not
+# from its highest id, which this worker's own inserts can push past rows
+# other workers stored in between; ids committed out of order within the
+# last RECHECK_IDS below the watermark are re-checked too.
+
+DIM = int(os.getenv("SIMILARITY_DIM", 512))
+ROLE_WEIGHT = 0.2  # share of the cosine contributed by the target role
+QUERY_CHUNK = 8192
+CATCH_UP_ROWS = 1000  # per query; warm-up does the rest
+RECHECK_IDS = 1000
+# Above this cosine, a stored analysis for the same role and JD is reused as-is
+REUSE_THRESHOLD = float(os.getenv("SIMILAR_REUSE_THRESHOLD", 0.98))
+MAGIC = b"RSIM"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sII")
+
+
+def _hash_features(terms: list, dim: int, prefix: str = "") -> "np.ndarray":
+    vector = np.zeros(dim, dtype=np.float32)
+    if not terms:
+        return vector
+    counts = Counter(terms)
+    features = list(counts)
+    hashes = np.array([zlib.crc32((prefix + feature).encode()) for feature in features], dtype=np.uint32)
+    weights = np.array([1 + math.log(counts[feature]) for feature in features], dtype=np.float32)
+    signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+    np.add.at(vector, (hashes % dim).astype(np.int64), signs * weights)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def embed(resume_text: str, target_role: str = None, dim: int = DIM) -> "np.ndarray":
+    """Unit-length float32 embedding of a resume for a target role."""
+    terms = canonical_terms(resume_text or "")
+    bigrams = [f"{a} {b}" for a, b in zip(terms, terms[1:])]
+    text_vector = _hash_features(terms + bigrams, dim)
+    role_vector = _hash_features(canonical_terms(target_role or ""), dim, prefix="role:")
+    vector = math.sqrt(1 - ROLE_WEIGHT) * text_vector + math.sqrt(ROLE_WEIGHT) * role_vector
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def record_dtype(dim: int) -> "np.dtype":
+    return np.dtype([("id", "<i8"), ("user_id", "<i8"), ("vector", "<f4", (dim,))])
+
+
+class SimilarityIndex:
+    """Top-k cosine index of (analysis id, user id, embedding) records.
+
+    With a `path`, records live in an append-only file (16-byte header,
+    then fixed-size records) that is memory-mapped for queries and re-mapped
+    whenever another worker has appended to it. Without one it is purely
+    in-memory.
+    """
+
+    def __init__(self, path: str = None, dim: int = DIM):
+        self.path = path
+        self.dim = dim
+        self.dtype = record_dtype(dim)
+        self._lock = threading.Lock()
+        self._records = np.zeros(0, dtype=self.dtype)
+        self._count = 0
+        self._max_id = 0
+        self._mapped_size = -1
+        self.synced_id = 0  # DB watermark of backfill(), per process
+        if path:
+            self._refresh()
+
+    def __len__(self) -> int:
+        with self._lock:
+            if self.path:
+                self._refresh()
+            return self._count
+
+    def _refresh(self):
+        """(Re)map the file if its size changed since the last mapping."""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        if size == self._mapped_size:
+            return
+        count = max(size - HEADER.size, 0) // self.dtype.itemsize
+        if count:
+            with open(self.path, "rb") as f:
+                magic, version, dim = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version != FORMAT_VERSION or dim != self.dim:
+                raise ValueError(f"{self.path} is not a {self.dim}-dimensional similarity index")
+            self._records = np.memmap(self.path, dtype=self.dtype, mode="r", offset=HEADER.size, shape=(count,))
+        else:
+            self._records = np.zeros(0, dtype=self.dtype)
+        # Appends only: the max over the new tail is enough unless the file shrank
+        tail = self._records[self._count:count] if count >= self._count else self._records
+        self._max_id = max(self._max_id if count >= self._count else 0,
+                           int(tail["id"].max()) if len(tail) else 0)
+        self._count = count
+        self._mapped_size = size
+
+    def max_id(self) -> int:
+        with self._lock:
+            if self.path:
+                self._refresh()
+            return self._max_id
+
+    def missing(self, ids: list) -> list:
+        """The given analysis ids that have no record yet."""
+        with self._lock:
+            if self.path:
+                self._refresh()
+            present = self._records["id"][:self._count]
+        return [int(i) for i in np.asarray(ids)[~np.isin(ids, present)]] if len(ids) else []
+
+    def add_many(self, rows: list):
+        """Append (analysis id, user id, vector) rows."""
+        if not rows:
+            return
+        batch = np.zeros(len(rows), dtype=self.dtype)
+        for i, (analysis_id, user_id, vector) in enumerate(rows):
+            batch[i] = (analysis_id, user_id or 0, vector)
+        with self._lock:
+            if not self.path:
+                self._records = np.concatenate([self._records[:self._count], batch])
+                self._count = len(self._records)
+                self._max_id = max(self._max_id, int(batch["id"].max()))
+                return
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            with open(self.path, "ab") as f:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    size = os.fstat(f.fileno()).st_size
+                    if size == 0:
+                        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, self.dim))
+                    elif (size - HEADER.size) % self.dtype.itemsize:
+                        # Drop a record torn by a crash mid-write
+                        f.truncate(size - (size - HEADER.size) % self.dtype.itemsize)
+                    f.write(batch.tobytes())
+                    f.flush()
+                finally:
+                    if fcntl:
+                        fcntl.flock(f, fcntl.LOCK_UN)
+            self._refresh()
+
+    def add(self, analysis_id: int, user_id: int, vector):
+        self.add_many([(analysis_id, user_id, vector)])
+
+    def query(self, vector, k: int = 5, user_id: int = None, exclude_ids=()) -> list:
+        """[(analysis id, cosine similarity)] of the k nearest records, best first."""
+        query = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            if self.path:
+                self._refresh()
+            records, count = self._records, self._count
+        best_ids, best_scores = [], []
+        for start in range(0, count, QUERY_CHUNK):
+            chunk = records[start:start + QUERY_CHUNK]
+            if user_id is not None:
+                chunk = chunk[chunk["user_id"] == user_id]
+            if exclude_ids:
+                chunk = chunk[~np.isin(chunk["id"], list(exclude_ids))]
+            if not len(chunk):
+                continue
+            scores = chunk["vector"] @ query
+            # 2k per chunk: a record appended twice (catch-up racing an insert) is returned once
+            top = np.argpartition(-scores, 2 * k)[:2 * k] if len(scores) > 2 * k else np.arange(len(scores))
+            best_ids.extend(chunk["id"][top].tolist())
+            best_scores.extend(scores[top].tolist())
+        results, seen = [], set()
+        for i in sorted(range(len(best_ids)), key=lambda i: -best_scores[i]):
+            if best_ids[i] not in seen and len(results) < k:
+                seen.add(best_ids[i])
+                results.append((best_ids[i], round(best_scores[i], 4)))
+        return results
+
+
+def backfill(db, index: SimilarityIndex, batch_size: int = 1000, max_rows: int = None) -> int:
+    """Index stored analyses the index lacks (at most `max_rows`); returns rows added."""
+    analysis = models.ResumeAnalysis
+    added = 0
+    last_id = max(index.synced_id - RECHECK_IDS, 0)
+    while max_rows is None or added < max_rows:
+        ids = [row_id for (row_id,) in db.query(analysis.id).filter(analysis.id > last_id)
+               .order_by(analysis.id).limit(batch_size)]
+        if not ids:
+            break
+        missing = index.missing(ids)
+        if max_rows is not None and len(missing) > max_rows - added:
+            missing = missing[:max_rows - added]
+            ids = [row_id for row_id in ids if row_id <= missing[-1]]
+        if missing:
+            rows = (
+                db.query(analysis.id, analysis.user_id, analysis.original_text, analysis.target_role)
+                .filter(analysis.id.in_(missing))
+                .order_by(analysis.id)
+                .all()
+            )
+            index.add_many([(row.id, row.user_id, embed(row.original_text, row.target_role)) for row in rows])
+            added += len(rows)
+        last_id = ids[-1]
+        index.synced_id = max(index.synced_id, last_id)
+    return added
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_similarity_index() -> SimilarityIndex:
+    """Process-wide index (SIMILARITY_INDEX_PATH, in-memory when unset)."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SimilarityIndex(os.getenv("SIMILARITY_INDEX_PATH") or None)
+    return _index
+
+
+def warm_similarity_index() -> int:
+    """Full catch-up of the process-wide index; run by warm-up, never fatal."""
+    from database import SessionLocal
+    session = SessionLocal()
+    try:
+        return backfill(session, get_similarity_index())
+    except Exception as e:
+        print(f"Similarity index warm-up Error: {e}")
+        return 0
+    finally:
+        session.close()
+
+
+def index_analysis(db, analysis: models.ResumeAnalysis):
+    """Add a freshly stored analysis; failures never block the request."""
+    try:
+        get_similarity_index().add(analysis.id, analysis.user_id,
+                                   embed(analysis.original_text, analysis.target_role))
+    except Exception as e:
+        print(f"Similarity index update failed: {e}")
+
+
+def similar_analyses(db, resume_text: str, target_role: str, user_id: int, k: int = 5,
+                     exclude_ids=()) -> list:
+    """[(ResumeAnalysis, similarity)] for the user's k most similar stored analyses."""
+    index = get_similarity_index()
+    backfill(db, index, max_rows=CATCH_UP_ROWS)  # other workers' rows; usually none
+    hits = index.query(embed(resume_text, target_role), k=k, user_id=user_id, exclude_ids=exclude_ids)
+    if not hits:
+        return []
+    rows = {row.id: row for row in db.query(models.ResumeAnalysis).filter(
+        models.ResumeAnalysis.id.in_([analysis_id for analysis_id, _ in hits]))}
+    return [(rows[analysis_id], score) for analysis_id, score in hits if analysis_id in rows]
+
+
+def nearest_same_target(db, resume_text: str, target_role: str, job_description: str, user_id: int,
+                        k: int = 10):
+    """The user's most similar analysis for the same role and JD as (row, similarity), or (None, 0.0)."""
+    jd_hash = jd_fingerprint(job_description)
+    for row, score in similar_analyses(db, resume_text, target_role, user_id, k=k):
+        if row.target_role == target_role and row.jd_hash == jd_hash:
+            return row, score
+    return None, 0.0
+
+
+if __name__ == "__main__":
+    # Build or catch up the on-disk index: SIMILARITY_INDEX_PATH=... python -m services.similarity_index
+    from dotenv import load_dotenv
+    load_dotenv()
+    from database import SessionLocal
+    session = SessionLocal()
+    try:
+        target = SimilarityIndex(os.getenv("SIMILARITY_INDEX_PATH") or "similarity.index")
+        print(f"Indexed {backfill(session, target)} analyses into {target.path} ({len(target)} total).")
+    finally:
+        session.close()
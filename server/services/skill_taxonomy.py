@@ -0,0 +1,197 @@
+import hashlib
+import json
+import marshal
+import os
+import re
+import tempfile
+import threading
+from collections import deque
+
+# Word-level Aho-Corasick automaton over a skill taxonomy. Every alias is a
+# sequence of word tokens, so matching is a single pass over the text's
+# tokens regardless of how many skills the taxonomy holds, and matches always
+# fall on word boundaries.
+#
+# Matching ignores case except for the aliases an entry lists under
+# case_sensitive (true means just its name): "Go" and "Excel" are also
+# everyday words, while "golang" and "microsoft excel" are not. A
+# single-letter skill (C, R) must also stand alone: not joined to another
+# word by "&" or "+" (R&D) and not a label after words like "plan" (plan C).
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "skill_taxonomy.json")
+CACHE_FORMAT_VERSION = 2
+
+# Keeps dotted/symbol names together (node.js, c++, c#, .net); "/" separates
+WORD_RE = re.compile(r"\.?[A-Za-z0-9+#]+(?:[.\-][A-Za-z0-9+#]+)*")
+JOINERS = {"&", "+"}
+# Words after which a single letter is a label, not a language
+LETTER_LABEL_WORDS = {"plan", "grade", "type", "class", "option", "section", "part", "series", "level",
+                      "tier", "phase", "step", "group", "team", "unit", "vitamin", "appendix", "exhibit"}
+
+
+def tokenize(text: str) -> list:
+    return WORD_RE.findall(text)
+
+
+def _standalone_letter(text: str, words: list, position: int) -> bool:
+    word = words[position]
+    before = text[word.start() - 1] if word.start() else ""
+    after = text[word.end()] if word.end() < len(text) else ""
+    if before in JOINERS or after in JOINERS:
+        return False
+    return not position or words[position - 1].group().lower() not in LETTER_LABEL_WORDS
+
+
+class SkillIndex:
+    """Compiled automaton; build with SkillIndex.build() or load_skill_index()."""
+
+    def __init__(self, names, categories, vocab, goto, fail, outputs):
+        self.names = names            # skill id -> canonical name
+        self.categories = categories  # skill id -> category
+        self.vocab = vocab            # lower-cased token -> token id
+        self.goto = goto              # state -> {token id: next state}
+        self.fail = fail              # state -> failure state
+        self.outputs = outputs        # state -> ((skill id, alias length, exact alias or None), ...)
+
+    @classmethod
+    def build(cls, entries: list) -> "SkillIndex":
+        names, categories, vocab = [], [], {}
+        goto, outputs = [{}], [[]]
+        for skill_id, entry in enumerate(entries):
+            names.append(entry["name"])
+            categories.append(entry.get("category", "skill"))
+            exact = entry.get("case_sensitive", False)
+            exact = {entry["name"]} if exact is True else set(exact or ())
+            for alias in [entry["name"], *entry.get("aliases", [])]:
+                tokens = tokenize(alias)
+                if not tokens:
+                    continue
+                state = 0
+                for token in tokens:
+                    token_id = vocab.setdefault(token.lower(), len(vocab))
+                    next_state = goto[state].get(token_id)
+                    if next_state is None:
+                        next_state = len(goto)
+                        goto[state][token_id] = next_state
+                        goto.append({})
+                        outputs.append([])
+                    state = next_state
+                outputs[state].append((skill_id, len(tokens), tuple(tokens) if alias in exact else None))
+
+        # Breadth-first failure links; each state inherits its fallback's outputs
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token_id, child in goto[state].items():
+                queue.append(child)
+                if state:
+                    fallback = fail[state]
+                    while fallback and token_id not in goto[fallback]:
+                        fallback = fail[fallback]
+                    fail[child] = goto[fallback].get(token_id, 0)
+                outputs[child].extend(outputs[fail[child]])
+        return cls(names, categories, vocab, goto, fail, [tuple(out) for out in outputs])
+
+    def find(self, text: str) -> list:
+        """Leftmost-longest, non-overlapping matches as (skill name, start token, end token)."""
+        words = list(WORD_RE.finditer(text))
+        tokens = [word.group() for word in words]
+        vocab, goto, fail, outputs = self.vocab, self.goto, self.fail, self.outputs
+        candidates = []
+        state = 0
+        for position, token in enumerate(tokens):
+            token_id = vocab.get(token.lower())
+            if token_id is None:
+                state = 0
+                continue
+            while state and token_id not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token_id, 0)
+            for skill_id, length, exact in outputs[state]:
+                start = position - length + 1
+                if exact is not None and tuple(tokens[start:position + 1]) != exact:
+                    continue
+                if length == 1 and len(token) == 1 and not _standalone_letter(text, words, position):
+                    continue
+                candidates.append((start, -length, skill_id))
+
+        matches, covered_until = [], 0
+        for start, negative_length, skill_id in sorted(candidates):
+            if start >= covered_until:
+                matches.append((self.names[skill_id], start, start - negative_length))
+                covered_until = start - negative_length
+        return matches
+
+    def extract(self, text: str) -> list:
+        """Distinct canonical skill names in order of first appearance."""
+        return list(dict.fromkeys(name for name, _, _ in self.find(text or "")))
+
+    def dumps(self) -> bytes:
+        return marshal.dumps((CACHE_FORMAT_VERSION, self.names, self.categories, self.vocab,
+                              self.goto, self.fail, self.outputs))
+
+    @classmethod
+    def loads(cls, data: bytes) -> "SkillIndex":
+        version, *state = marshal.loads(data)
+        if version != CACHE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported skill index cache version {version}")
+        return cls(*state)
+
+
+def load_skill_index(taxonomy_path: str = DEFAULT_TAXONOMY_PATH, cache_dir: str = None) -> SkillIndex:
+    """Load the compiled automaton from the on-disk cache, compiling it on a miss.
+
+    The cache file name carries a hash of the taxonomy, so editing the
+    taxonomy invalidates it automatically.
+    """
+    with open(taxonomy_path, "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw + str(CACHE_FORMAT_VERSION).encode()).hexdigest()[:16]
+    cache_dir = cache_dir or os.getenv("SKILL_INDEX_CACHE_DIR", tempfile.gettempdir())
+    cache_path = os.path.join(cache_dir, f"skill-index-{digest}.marshal")
+
+    try:
+        with open(cache_path, "rb") as f:
+            return SkillIndex.loads(f.read())
+    except (OSError, ValueError, EOFError, TypeError):
+        pass
+
+    index = SkillIndex.build(json.loads(raw))
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write-then-rename so concurrent workers never read a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(index.dumps())
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Skill index cache write failed: {e}")
+    return index
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_skill_index() -> SkillIndex:
+    """Process-wide index, compiled (or loaded from cache) once."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = load_skill_index(os.getenv("SKILL_TAXONOMY_PATH", DEFAULT_TAXONOMY_PATH))
+    return _index
+
+
+def prune_present_skills(missing_skills: list, resume_text: str) -> list:
+    """Drop 'missing' skills that the resume demonstrably mentions."""
+    index = get_skill_index()
+    present = set(index.extract(resume_text))
+    kept = []
+    for skill in missing_skills:
+        known = index.extract(skill)
+        if len(known) == 1 and known[0] in present:
+            continue
+        kept.append(skill)
+    return kept
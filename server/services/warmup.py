@@ -0,0 +1,44 @@
+import threading
+import time
+from services.lazy import ensure_loaded
+from services.skill_taxonomy import get_skill_index
+
+_state = {"ready": False, "warming": False, "duration_ms": None, "error": None}
+_lock = threading.Lock()
+
+
+def warm_up() -> dict:
+    """Load parsers, the LLM SDK, the skill index, export templates and the similarity index off the request path."""
+    from services import resume_parser, ai_analyzer, ats_scorer, exporter, similarity_index
+
+    with _lock:
+        if _state["ready"]:
+            return readiness()
+        _state["warming"] = True
+        started = time.perf_counter()
+        try:
+            for module in (resume_parser.pdfplumber, resume_parser.pdfium, resume_parser.docx, ai_analyzer.groq, ats_scorer.np):
+                ensure_loaded(module)
+            get_skill_index()
+            exporter.warm_templates()
+            similarity_index.warm_similarity_index()
+            _state["ready"] = True
+            _state["error"] = None
+        except Exception as e:
+            print(f"Warm-up Error: {e}")
+            _state["error"] = str(e)
+        finally:
+            _state["warming"] = False
+            _state["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return readiness()
+
+
+def start_warm_up() -> threading.Thread:
+    """Run warm_up in the background so the server accepts connections immediately."""
+    thread = threading.Thread(target=warm_up, name="warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+def readiness() -> dict:
+    return dict(_state)
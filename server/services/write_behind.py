@@ -0,0 +1,317 @@
+import datetime
+import glob
+import os
+import threading
+import time
+import uuid
+import zlib
+from collections import Counter
+import orjson
+import models
+from services.conditional import bump_analyses_version
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines
+    fcntl = None
+
+# Write-behind persistence for analysis results. store_analysis hands the
+# row to an in-process buffer instead of committing it on the request path;
+# a background thread inserts buffered rows in one transaction per batch
+# (WRITE_BEHIND_BATCH rows or WRITE_BEHIND_DELAY_MS, whichever comes first).
+#
+# Every row is first appended to a local journal and fsynced (concurrent
+# requests share one fsync), so a crash loses nothing: on startup any
+# journal whose owner is gone is replayed. Rows carry a write_id, which
+# makes replaying a batch that did commit before the crash a no-op. Each
+# worker owns one journal file, held under an exclusive flock.
+#
+# Pending rows are not visible to queries until flushed, so quota checks
+# add pending_count() (or pending_tokens() under QUOTA=tokens) for the user
+# to the stored total.
+
+WRITE_BEHIND_DIR = os.getenv("WRITE_BEHIND_DIR")  # unset: commit on the request path
+WRITE_BEHIND_BATCH = int(os.getenv("WRITE_BEHIND_BATCH", 64))
+WRITE_BEHIND_DELAY = int(os.getenv("WRITE_BEHIND_DELAY_MS", 200)) / 1000
+# Start a fresh journal once this much has been written and everything is committed
+JOURNAL_ROTATE_BYTES = 16 * 1024 * 1024
+
+COLUMNS = ("write_id", "user_id", "original_text", "analysis_json", "target_role", "jd_hash", "sections_json",
+           "llm_model", "llm_route", "llm_latency_ms", "analysis_depth", "usage_cost", "upgraded_from",
+           "analysis_mode", "llm_calls", "prompt_tokens", "completion_tokens", "created_at")
+
+
+def encode_record(record: dict) -> bytes:
+    """One journal line: crc32 of the JSON body, a space, the body. orjson never emits raw newlines."""
+    body = orjson.dumps(record)
+    return b"%08x " % zlib.crc32(body) + body + b"\n"
+
+
+def read_journal(path: str) -> list:
+    """Rows appended to a journal and not marked committed, in order; a torn last line is dropped."""
+    rows, committed = {}, set()
+    with open(path, "rb") as journal:
+        for line in journal:
+            checksum, _, body = line.rstrip(b"\n").partition(b" ")
+            if not line.endswith(b"\n") or checksum != b"%08x" % zlib.crc32(body):
+                break  # torn write at the tail: nothing after it was acknowledged
+            record = orjson.loads(body)
+            if "committed" in record:
+                committed.update(record["committed"])
+            else:
+                rows[record["write_id"]] = record
+    return [row for write_id, row in rows.items() if write_id not in committed]
+
+
+def _to_model(row: dict) -> models.ResumeAnalysis:
+    values = dict(row)
+    if isinstance(values.get("created_at"), str):
+        values["created_at"] = datetime.datetime.fromisoformat(values["created_at"])
+    return models.ResumeAnalysis(**values)
+
+
+def _tokens(row: dict) -> int:
+    return (row["prompt_tokens"] or 0) + (row["completion_tokens"] or 0)
+
+
+class WriteBehindBuffer:
+    def __init__(self, directory: str, session_factory, batch_size: int = WRITE_BEHIND_BATCH,
+                 delay: float = WRITE_BEHIND_DELAY, after_commit=None):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.delay = delay
+        self.after_commit = after_commit  # called with (session, committed rows)
+        self.stats = {"buffered": 0, "flushed": 0, "batches": 0, "replayed": 0, "fsyncs": 0, "errors": 0}
+
+        self._rows = []  # buffered, in arrival order
+        self._pending = Counter()  # user_id -> rows not committed yet
+        self._pending_tokens = Counter()  # user_id -> LLM tokens of those rows
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._sync_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._synced = 0
+        self._stopping = False
+
+        self.stats["replayed"] = self.recover()
+        self._open_journal()
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    # --- journal ---
+
+    def _open_journal(self) -> None:
+        self.journal_path = os.path.join(self.directory, f"journal-{os.getpid()}-{uuid.uuid4().hex[:8]}.log")
+        self._journal = open(self.journal_path, "ab")
+        if fcntl:
+            fcntl.flock(self._journal, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        self._synced = 0
+
+    def _append(self, record: dict) -> int:
+        """Append under the buffer lock; returns the offset to sync up to."""
+        self._journal.write(encode_record(record))
+        self._journal.flush()
+        return self._journal.tell()
+
+    def _sync(self, offset: int, journal) -> None:
+        # Group commit: whoever gets the lock fsyncs everything written so far
+        with self._sync_lock:
+            if journal is not self._journal:
+                return  # rotated: only happens once all its rows are committed
+            if self._synced >= offset:
+                return
+            with self._lock:
+                written = journal.tell()
+            try:
+                os.fsync(journal.fileno())
+            except ValueError:
+                return  # closed by a rotation in the meantime, so already committed
+            self.stats["fsyncs"] += 1
+            self._synced = max(self._synced, written)
+
+    def recover(self) -> int:
+        """Replay journals left by workers that are no longer running; returns rows inserted."""
+        replayed = 0
+        for path in sorted(glob.glob(os.path.join(self.directory, "journal-*.log"))):
+            with open(path, "rb") as journal:
+                if fcntl:
+                    try:
+                        fcntl.flock(journal, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except OSError:
+                        continue  # a live worker's journal
+                rows = read_journal(path)
+                if rows:
+                    replayed += self._insert(rows, skip_existing=True)
+                os.remove(path)
+        return replayed
+
+    # --- request path ---
+
+    def submit(self, **columns) -> None:
+        """Journal the row durably, then buffer it for the next batch."""
+        row = {name: columns.get(name) for name in COLUMNS}
+        row["write_id"] = uuid.uuid4().hex
+        row["created_at"] = row["created_at"] or datetime.datetime.utcnow()
+        with self._lock:
+            journal = self._journal
+            offset = self._append(row)
+            self._rows.append(row)
+            self._pending[row["user_id"]] += 1
+            self._pending_tokens[row["user_id"]] += _tokens(row)
+            self.stats["buffered"] += 1
+            if len(self._rows) in (1, self.batch_size):
+                self._wake.notify()
+        self._sync(offset, journal)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {**self.stats, "buffered_now": len(self._rows)}
+
+    def pending_count(self, user_id: int) -> int:
+        with self._lock:
+            return self._pending[user_id]
+
+    def pending_tokens(self, user_id: int) -> int:
+        with self._lock:
+            return self._pending_tokens[user_id]
+
+    # --- flusher ---
+
+    def _insert(self, rows: list, skip_existing: bool = False, on_commit=None) -> int:
+        session = self.session_factory()
+        try:
+            if skip_existing:
+                existing = {
+                    write_id for (write_id,) in session.query(models.ResumeAnalysis.write_id)
+                    .filter(models.ResumeAnalysis.write_id.in_([row["write_id"] for row in rows]))
+                }
+                rows = [row for row in rows if row["write_id"] not in existing]
+            instances = [_to_model(row) for row in rows]
+            session.add_all(instances)
+            bump_analyses_version(session, [row["user_id"] for row in rows])
+            session.commit()
+            if on_commit is not None:
+                on_commit()
+            if self.after_commit is not None and instances:
+                self.after_commit(session, instances)
+            return len(instances)
+        finally:
+            session.close()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if not self._rows and not self._stopping:
+                    self._wake.wait()  # until the first row arrives
+                if len(self._rows) < self.batch_size and not self._stopping:
+                    self._wake.wait(self.delay)  # until the batch fills or the delay passes
+                if self._stopping and not self._rows:
+                    return
+            self.flush()
+
+    def flush(self) -> int:
+        """Commit everything buffered so far in batches; returns rows committed."""
+        with self._flush_lock:
+            return self._flush()
+
+    def _flush(self) -> int:
+        committed = 0
+        while True:
+            with self._lock:
+                batch = self._rows[:self.batch_size]
+            if not batch:
+                return committed
+            try:
+                self._insert(batch, on_commit=lambda: self._committed(batch))
+            except Exception as e:
+                # Rows stay buffered and journaled; retry on the next tick
+                self.stats["errors"] += 1
+                print(f"Write-behind flush failed: {e}")
+                time.sleep(self.delay)
+                return committed
+            committed += len(batch)
+
+    def _committed(self, batch: list) -> None:
+        # Right after the commit, before the similarity/analytics hooks, so a
+        # row is counted twice (stored and pending) only for a moment and never missed
+        with self._lock:
+            del self._rows[:len(batch)]
+            for row in batch:
+                self._pending[row["user_id"]] -= 1
+                if not self._pending[row["user_id"]]:
+                    del self._pending[row["user_id"]]
+                self._pending_tokens[row["user_id"]] -= _tokens(row)
+                if not self._pending_tokens[row["user_id"]]:
+                    del self._pending_tokens[row["user_id"]]
+            self._append({"committed": [row["write_id"] for row in batch]})
+            self.stats["flushed"] += len(batch)
+            self.stats["batches"] += 1
+            if not self._rows and self._journal.tell() > JOURNAL_ROTATE_BYTES:
+                self._rotate()
+
+    def _rotate(self) -> None:
+        # Everything in the current journal is committed: start a new file, drop the old one
+        old_journal, old_path = self._journal, self.journal_path
+        self._open_journal()
+        old_journal.close()
+        os.remove(old_path)
+
+    def close(self) -> None:
+        """Flush everything and stop; the journal is removed once it holds no uncommitted rows."""
+        with self._lock:
+            self._stopping = True
+            self._wake.notify()
+        self._thread.join()
+        self.flush()
+        with self._lock:
+            clean = not self._rows
+            self._journal.close()
+        if clean:
+            os.remove(self.journal_path)
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def _after_commit(session, rows: list) -> None:
+    from services.analytics import record_analysis
+    from services.similarity_index import index_analysis
+
+    for row in rows:
+        index_analysis(session, row)
+        record_analysis(session, row)
+
+
+def start_write_behind(directory: str = WRITE_BEHIND_DIR):
+    """Start the process-wide buffer when WRITE_BEHIND_DIR is set, replaying orphaned journals first."""
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None and directory:
+            from database import SessionLocal
+            _buffer = WriteBehindBuffer(directory, SessionLocal, after_commit=_after_commit)
+    return _buffer
+
+
+def get_write_behind():
+    return _buffer
+
+
+def stop_write_behind() -> None:
+    global _buffer
+    with _buffer_lock:
+        if _buffer is not None:
+            _buffer.close()
+            _buffer = None
+
+
+def pending_count(user_id: int) -> int:
+    buffer = _buffer
+    return buffer.pending_count(user_id) if buffer is not None else 0
+
+
+def pending_tokens(user_id: int) -> int:
+    buffer = _buffer
+    return buffer.pending_tokens(user_id) if buffer is not None else 0
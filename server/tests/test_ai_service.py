@@ -7,7 +7,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from services.ai_analyzer import analyze_resume_with_ai
 
 # We need to mock the Groq client entirely
-@patch("services.ai_analyzer.Groq")
+@patch("services.ai_analyzer.groq.Groq")
 def test_ai_analyze_valid_json(mock_groq_class):
     """Test correct parsing of a valid JSON response from AI."""
     # Setup mock response content
@@ -36,7 +36,7 @@ def test_ai_analyze_valid_json(mock_groq_class):
     assert result["overall_score"] == 90
     assert result["strengths"] == ["Leadership"]
 
-@patch("services.ai_analyzer.Groq")
+@patch("services.ai_analyzer.groq.Groq")
 def test_ai_analyze_markdown_strip(mock_groq_class):
     """Test stripping of markdown code blocks ```json ... ```"""
     json_str = '{"overall_score": 50, "strengths": [], "weaknesses": [], "ats_issues": [], "role_alignment_feedback": "", "optimized_bullets": [], "missing_skills": [], "final_suggestions": "", "optimized_resume_content": ""}'
@@ -70,7 +70,7 @@ def test_ai_analyze_markdown_strip(mock_groq_class):
          # If it somehow passed
          assert result["overall_score"] == 50
 
-@patch("services.ai_analyzer.Groq")
+@patch("services.ai_analyzer.groq.Groq")
 def test_ai_analyze_malformed_json_fallback(mock_groq_class):
     """Test handling of invalid JSON response (fallback)."""
     mock_chat_completion = MagicMock()
@@ -0,0 +1,134 @@
+import sys
+import os
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app, get_db
+from models import Base, User, ResumeAnalysis, GapAnalysisResponse, ScoreAnalysisResponse
+from auth import get_current_user
+from services.ai_analyzer import DEPTH_MODELS, analysis_prompt, analyze_resume_with_ai
+from services.llm_stub import StubClient
+
+engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+RESUME = "Jane Doe\nEXPERIENCE\nBackend engineer at Acme\n- Built billing APIs in Go\n- Cut latency by 40%"
+JD = "Senior backend engineer.\nRequirements:\n- Go\n- Kubernetes\n- PostgreSQL"
+
+
+def test_compact_prompts_ask_only_for_their_fields():
+    score = analysis_prompt(RESUME, "Engineer", depth="score")
+    assert '"overall_score"' in score and '"role_alignment_feedback"' in score
+    assert "optimized_resume_content" not in score and "XYZ formula" not in score
+    gaps = analysis_prompt(RESUME, "Engineer", depth="gaps")
+    assert '"missing_skills"' in gaps and "optimized_bullets" not in gaps
+    assert "MARKDOWN" in analysis_prompt(RESUME, "Engineer")
+    assert set(GapAnalysisResponse.model_fields) > set(ScoreAnalysisResponse.model_fields)
+
+
+def test_stub_output_validates_per_depth():
+    with patch("services.ai_analyzer.create_client", return_value=StubClient()):
+        for depth, model in DEPTH_MODELS.items():
+            result = analyze_resume_with_ai(RESUME, "Engineer", depth=depth)
+            assert set(result) == set(model.model_fields)
+            model.model_validate(result)
+
+
+def override_get_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def client():
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = lambda: User(id=1500, email="depth@example.com")
+    with patch("services.ai_analyzer.create_client", return_value=StubClient()), \
+         patch("main.parse_resume", return_value=RESUME):
+        yield TestClient(app)
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(previous)
+
+
+def analyze(client, **data):
+    return client.post("/api/analyze-resume", data={"target_role": "Engineer", **data},
+                       files={"resume_file": ("resume.pdf", b"%PDF", "application/pdf")})
+
+
+def rows(user_id: int = 1500) -> list:
+    db = TestingSessionLocal()
+    try:
+        return db.query(ResumeAnalysis).filter(ResumeAnalysis.user_id == user_id).order_by(ResumeAnalysis.id).all()
+    finally:
+        db.close()
+
+
+def test_score_only_is_compact_and_cheap(client):
+    response = analyze(client, depth="score", job_description=JD)
+    assert response.status_code == 200
+    assert set(response.json()) == {"overall_score", "role_alignment_feedback"}
+    row = rows()[-1]
+    assert (row.analysis_depth, row.usage_cost) == ("score", 0.2)
+    assert client.get("/api/users/me").json()["usage_count"] == 0.2
+
+    assert analyze(client, depth="summary").status_code == 400
+    assert analyze(client, depth="gaps", mode="parallel").status_code == 400
+
+
+def test_upgrade_reuses_stored_text_and_charges_the_difference(client):
+    analyze(client, depth="gaps", job_description=JD, target_role="Platform Engineer")
+    prior = [row for row in rows() if row.target_role == "Platform Engineer"][-1]
+    before = client.get("/api/users/me").json()["usage_count"]
+
+    with patch("main.analyze_resume_with_ai", wraps=analyze_resume_with_ai) as llm:
+        response = client.post(f"/api/analyses/{prior.id}/upgrade", data={"depth": "rewrite"})
+    assert response.status_code == 200
+    assert response.json()["upgraded_from"] == prior.id and response.json()["optimized_resume_content"]
+    kwargs = llm.call_args.kwargs
+    assert kwargs["text"] == RESUME and kwargs["depth"] == "rewrite"
+    assert "Kubernetes" in kwargs["job_description"]  # from the stored JD profile
+
+    upgraded = rows()[-1]
+    assert (upgraded.analysis_depth, upgraded.usage_cost, upgraded.upgraded_from) == ("rewrite", 0.5, prior.id)
+    assert upgraded.jd_hash == prior.jd_hash and upgraded.target_role == "Platform Engineer"
+    assert client.get("/api/users/me").json()["usage_count"] == before + 0.5
+
+    assert client.post(f"/api/analyses/{upgraded.id}/upgrade").status_code == 400
+    assert client.post("/api/analyses/999999/upgrade").status_code == 404
+    listed = client.get("/api/analyses?limit=2").json()
+    assert [(item["analysis_id"], item["depth"]) for item in listed] == [(upgraded.id, "rewrite"),
+                                                                          (prior.id, "gaps")]
+
+
+def test_quota_counts_depth_cost():
+    db = TestingSessionLocal()
+    db.add_all(ResumeAnalysis(user_id=1501, original_text="old", analysis_json={}) for _ in range(49))
+    db.add(ResumeAnalysis(user_id=1501, original_text="old", analysis_json={}, analysis_depth="score",
+                          usage_cost=0.2))
+    db.commit()
+    db.close()
+
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = lambda: User(id=1501, email="quota@example.com")
+    try:
+        with patch("services.ai_analyzer.create_client", return_value=StubClient()), \
+             patch("main.parse_resume", return_value=RESUME):
+            client = TestClient(app)
+            assert analyze(client, depth="rewrite").status_code == 403  # 49.2 + 1 is over 50
+            assert analyze(client, depth="gaps").status_code == 200
+            assert client.get("/api/users/me").json()["usage_count"] == 49.7
+    finally:
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(previous)
@@ -0,0 +1,142 @@
+import sys
+import os
+import datetime
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import auth
+from main import app, get_db
+from models import Base, User, ResumeAnalysis, AnalyticsSkillCounter
+from auth import get_current_user
+from services import analytics
+from services.ai_analyzer import error_result
+from services.analytics import analytics_summary, backfill, record_analysis
+
+engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def store(db, role, score, skills, days_ago=0):
+    analysis = ResumeAnalysis(
+        user_id=1, original_text="text", target_role=role,
+        analysis_json={"overall_score": score, "missing_skills": skills},
+        created_at=datetime.datetime.utcnow() - datetime.timedelta(days=days_ago),
+    )
+    db.add(analysis)
+    db.commit()
+    record_analysis(db, analysis)
+
+
+def test_rollups_follow_inserts(db):
+    store(db, "Backend Engineer", 72, ["Kubernetes", "Go"], days_ago=1)
+    store(db, "backend  engineer", 100, ["kubernetes"])
+    store(db, "Designer", 40, ["Figma"])
+    store(db, None, 55, [])
+
+    summary = analytics_summary(db)
+    assert summary["analyses"] == 4
+    assert summary["score_histogram"][7] == 1 and summary["score_histogram"][10] == 1
+    assert [day["analyses"] for day in summary["per_day"]] == [1, 3]
+    assert summary["per_day"][1]["average_score"] == 65.0
+    assert summary["top_missing_skills"][0] == {"skill": "kubernetes", "count": 2, "error": 0}
+    assert summary["top_roles"][0] == {"role": "backend engineer", "analyses": 2}
+
+    backend = analytics_summary(db, role="BACKEND ENGINEER")
+    assert backend["analyses"] == 2
+    assert [skill["skill"] for skill in backend["top_missing_skills"]] == ["kubernetes", "go"]
+    assert analytics_summary(db, role="Designer", days=1)["per_day"] == summary["per_day"][1:]
+
+
+def test_failed_and_unscored_analyses_are_not_counted(db):
+    store(db, "Engineer", 80, ["Go"])
+    failed = ResumeAnalysis(user_id=1, original_text="text", target_role="Engineer",
+                            analysis_json=error_result(ValueError("boom")))
+    db.add(failed)
+    db.commit()
+    record_analysis(db, failed)
+    store(db, "Engineer", None, ["Go"])  # no score: its skills still count
+
+    incremental = analytics_summary(db)
+    backfill(db)
+    for summary in (incremental, analytics_summary(db)):
+        assert summary["analyses"] == 1 and summary["score_histogram"][0] == 0
+        assert summary["per_day"] == [{"day": summary["per_day"][0]["day"], "analyses": 1, "average_score": 80.0}]
+        assert summary["top_missing_skills"][0] == {"skill": "go", "count": 2, "error": 0}
+
+
+def test_sketch_is_bounded_and_keeps_heavy_hitters(db, monkeypatch):
+    monkeypatch.setattr(analytics, "SKETCH_CAPACITY", 3)
+    for i in range(20):
+        store(db, "Engineer", 50, ["Docker", f"rare-{i}"])
+    assert db.query(AnalyticsSkillCounter).filter(AnalyticsSkillCounter.role == "engineer").count() == 3
+    top = analytics_summary(db, role="Engineer")["top_missing_skills"][0]
+    assert top == {"skill": "docker", "count": 20, "error": 0}
+
+
+def test_eviction_clash_falls_back_to_increment(db, monkeypatch):
+    monkeypatch.setattr(analytics, "SKETCH_CAPACITY", 2)
+    store(db, "Engineer", 50, ["Docker", "Go"])
+    store(db, "Engineer", 50, ["Docker"])
+    # Another worker inserted "go" for the role between our lookup and the eviction
+    stale_smallest = type("Counter", (), {"skill": "docker", "count": 2})
+    analytics._evict(db, "engineer", "go", stale_smallest)
+    db.commit()
+    counts = {row.skill: (row.count, row.error) for row in db.query(AnalyticsSkillCounter).filter_by(role="engineer")}
+    assert counts == {"docker": (2, 0), "go": (2, 0)}
+
+
+def test_backfill_matches_incremental(db):
+    store(db, "Backend Engineer", 72, ["Kubernetes", "Go"], days_ago=2)
+    store(db, "Designer", 40, ["Figma", "Go"])
+    incremental = analytics_summary(db)
+    db.add(ResumeAnalysis(user_id=1, original_text="text", analysis_json={"overall_score": 90, "missing_skills": ["Go"]}))
+    db.commit()  # stored before rollups existed
+
+    assert backfill(db, batch_size=1) == 3
+    rebuilt = analytics_summary(db)
+    assert rebuilt["analyses"] == incremental["analyses"] + 1
+    assert rebuilt["top_missing_skills"][0] == {"skill": "go", "count": 3, "error": 0}
+    assert sum(day["analyses"] for day in rebuilt["per_day"]) == 3
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    def override_get_db():
+        session = TestingSessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    monkeypatch.setattr(auth, "ADMIN_EMAILS", {"admin@example.com"})
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(previous)
+
+
+def test_admin_endpoint(client, db):
+    store(db, "Engineer", 80, ["Go"])
+    app.dependency_overrides[get_current_user] = lambda: User(id=1, email="someone@example.com")
+    assert client.get("/api/admin/analytics").status_code == 403
+
+    app.dependency_overrides[get_current_user] = lambda: User(id=2, email="Admin@Example.com")
+    response = client.get("/api/admin/analytics?role=engineer&top=5")
+    assert response.status_code == 200
+    assert response.json()["analyses"] == 1
+    assert response.json()["top_missing_skills"] == [{"skill": "go", "count": 1, "error": 0}]
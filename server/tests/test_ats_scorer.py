@@ -0,0 +1,143 @@
+import sys
+import os
+import json
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app, get_db
+from models import Base, User, ResumeAnalysis, ResumeAnalysisResponse
+from auth import get_current_user
+from services.ats_scorer import canonical_terms, extract_requirements, score_resume, stem
+
+JD = """Senior Backend Engineer. Must have Python, PostgreSQL, Docker and Kubernetes.
+Experience with REST APIs and CI/CD on AWS. Nice to have: Kafka, machine learning."""
+
+RESUME = """Jane Doe | jane@example.com | +1 555 123 4567
+EXPERIENCE
+- Built RESTful services in Python/Flask handling 2M requests per day
+- Deployed containers with Docker on Amazon Web Services, cutting costs 30%
+- Tuned Postgres queries, reducing p95 latency by 40%
+SKILLS
+Python, Docker, Jenkins, CI
+EDUCATION
+BSc Computer Science"""
+
+# --- Database Setup (Isolated) ---
+engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+@pytest.fixture
+def client():
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    db = TestingSessionLocal()
+    if not db.get(User, 400):
+        db.add(User(id=400, email="ats@example.com", hashed_password="pw"))
+        db.commit()
+    db.close()
+
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = lambda: User(id=400, email="ats@example.com")
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(previous)
+
+
+def stored_count():
+    db = TestingSessionLocal()
+    count = db.query(ResumeAnalysis).filter(ResumeAnalysis.user_id == 400).count()
+    db.close()
+    return count
+
+
+def test_stem_and_synonyms():
+    assert stem("deploying") == stem("deployed") == stem("deploys")
+    assert canonical_terms("k8s and Postgres") == ["kubernetes", "postgresql"]
+    assert "rest api" in canonical_terms("RESTful services")
+    assert not {"computer vision", "rest api"} & set(canonical_terms("CV attached; led the rest of the team"))
+    assert canonical_terms("Python/Flask") == ["python", "flask"]
+
+
+def test_extract_requirements_weights_technical_terms():
+    terms = dict(extract_requirements(JD, "Backend Engineer"))
+    assert "python" in terms and "kubernetes" in terms
+    assert "experience" not in terms
+    assert terms["python"] > terms.get("senior", 0)
+
+
+def test_score_resume_matches_and_missing():
+    result = score_resume(RESUME, "Backend Engineer", JD)
+    ResumeAnalysisResponse(**result)
+    missing = [skill.lower() for skill in result["missing_skills"]]
+    assert 0 < result["overall_score"] < 100
+    assert "kubernetes" in missing
+    assert "kafka" in missing
+    # synonyms and aliases count as matches
+    for term in ("python", "postgresql", "aws", "rest apis", "docker"):
+        assert term not in missing
+
+
+def test_score_is_deterministic_and_ats_issues():
+    assert score_resume(RESUME, "Dev", JD) == score_resume(RESUME, "Dev", JD)
+    issues = score_resume("Just a name", "Dev", JD)["ats_issues"]
+    assert any("Experience" in issue for issue in issues)
+    assert any("email" in issue for issue in issues)
+
+
+def test_score_without_job_description():
+    result = score_resume(RESUME, "Python Developer")
+    assert result["overall_score"] > 0
+
+
+def test_fast_mode_skips_llm_and_storage(client):
+    before = stored_count()
+    with patch("main.analyze_resume_with_ai") as mock_ai, \
+         patch("main.parse_resume") as mock_parser:
+        mock_parser.return_value = RESUME
+        files = {"resume_file": ("resume.pdf", b"content", "application/pdf")}
+        data = {"target_role": "Backend Engineer", "job_description": JD, "mode": "fast"}
+        response = client.post("/api/analyze-resume", files=files, data=data)
+
+    assert response.status_code == 200
+    assert "Kubernetes" in response.json()["missing_skills"]
+    mock_ai.assert_not_called()
+    assert stored_count() == before
+
+
+def test_progressive_mode_streams_pre_score_then_final(client):
+    final = score_resume(RESUME, "Backend Engineer", JD) | {"overall_score": 91}
+    before = stored_count()
+    with patch("main.analyze_resume_with_ai") as mock_ai, \
+         patch("main.parse_resume") as mock_parser:
+        mock_ai.return_value = final
+        mock_parser.return_value = RESUME
+        files = {"resume_file": ("resume.pdf", b"content", "application/pdf")}
+        data = {"target_role": "Backend Engineer", "job_description": JD, "mode": "progressive"}
+        response = client.post("/api/analyze-resume", files=files, data=data)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["stage"] for line in lines] == ["pre_score", "final"]
+    assert lines[1]["result"]["overall_score"] == 91
+    assert stored_count() == before + 1
+
+
+def test_invalid_mode_rejected(client):
+    files = {"resume_file": ("resume.pdf", b"content", "application/pdf")}
+    response = client.post("/api/analyze-resume", files=files, data={"target_role": "Dev", "mode": "turbo"})
+    assert response.status_code == 400
@@ -0,0 +1,170 @@
+import sys
+import os
+import asyncio
+import gzip
+import zlib
+import orjson
+import pytest
+from unittest.mock import patch
+from fastapi import Depends
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app, get_db
+from models import Base, User, ResumeAnalysis
+from auth import get_current_user
+from services import compression
+from services.compression import CompressionMiddleware, negotiate
+from services.conditional import etag_matches
+from services.ats_scorer import score_resume
+
+engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+USER_ID = 1300
+TEXT = "Jane Doe\nEXPERIENCE\nBackend engineer. Python, Go, Docker, AWS."
+
+
+def test_negotiates_by_q_value():
+    assert negotiate("gzip, deflate, br", ("br", "gzip")) == "br"
+    assert negotiate("gzip;q=1.0, br;q=0.5", ("br", "gzip")) == "gzip"
+    assert negotiate("br", ("gzip",)) is None  # brotli not installed
+    assert negotiate("*;q=0.3, gzip;q=0", ("br", "gzip")) == "br"
+    assert negotiate("identity", ("br", "gzip")) is None
+    assert negotiate("", ("gzip",)) is None
+    assert negotiate("GZIP;q=bad, gzip", ("gzip",)) == "gzip"
+
+
+def call(body_chunks: list, content_type: bytes, accept: bytes = b"gzip", minimum_size: int = 100) -> list:
+    async def inner(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", content_type), (b"etag", b'"v1"')]})
+        for index, chunk in enumerate(body_chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": index < len(body_chunks) - 1})
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "headers": [(b"accept-encoding", accept)]}
+    middleware = CompressionMiddleware(inner, minimum_size=minimum_size, encodings=("gzip",))
+    asyncio.run(middleware(scope, None, send))
+    return messages
+
+
+def test_compresses_large_json_only():
+    body = orjson.dumps({"optimized_resume_content": "## Experience\n- Cut latency by 40%\n" * 200})
+    start, message = call([body], b"application/json")
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == b"gzip" and headers[b"vary"] == b"Accept-Encoding"
+    assert headers[b"etag"] == b'W/"v1"'  # another representation: only weakly equal
+    assert int(headers[b"content-length"]) == len(message["body"]) < len(body) / 5
+    assert gzip.decompress(message["body"]) == body
+
+    start, message = call([b'{"ok": true}'], b"application/json")
+    assert b"content-encoding" not in dict(start["headers"]) and message["body"] == b'{"ok": true}'
+    assert dict(start["headers"])[b"vary"] == b"Accept-Encoding"
+
+    start, message = call([b"%PDF" * 1000], b"application/pdf")  # already compressed
+    assert start["headers"] == [(b"content-type", b"application/pdf"), (b"etag", b'"v1"')]
+
+    start, message = call([body], b"application/json", accept=b"identity")
+    assert message["body"] == body
+
+
+def test_streams_each_chunk_decodable_on_arrival():
+    lines = [orjson.dumps({"stage": "pre_score"}) + b"\n", orjson.dumps({"stage": "final", "x": "y" * 5000}) + b"\n"]
+    start, first, second = call(lines, b"application/x-ndjson")
+    assert dict(start["headers"])[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in dict(start["headers"])
+    decoder = zlib.decompressobj(31)
+    assert decoder.decompress(first["body"]) == lines[0]  # the pre-score is not held back
+    assert decoder.decompress(second["body"]) == lines[1] and decoder.eof
+    assert second["more_body"] is False
+
+
+def test_brotli_when_installed():
+    brotli = pytest.importorskip("brotli")
+    body = b'{"text": "' + b"resume " * 1000 + b'"}'
+    compressor = compression._Compressor("br")
+    assert brotli.decompress(compressor.chunk(body[:100]) + compressor.finish(body[100:])) == body
+
+
+@pytest.fixture
+def client():
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def current_user(db=Depends(get_db)):
+        # Loaded from the database like auth does, so the version stamp is real
+        return db.get(User, USER_ID)
+
+    db = TestingSessionLocal()
+    if db.get(User, USER_ID) is None:
+        db.add(User(id=USER_ID, email="etag@example.com"))
+        db.commit()
+    db.close()
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = current_user
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(previous)
+
+
+def analyze(client):
+    with patch("main.analyze_resume_with_ai", return_value=score_resume(TEXT, "Engineer")), \
+         patch("main.parse_resume", return_value=TEXT):
+        response = client.post("/api/analyze-resume", data={"target_role": "Engineer"},
+                               files={"resume_file": ("resume.pdf", b"%PDF", "application/pdf")})
+    assert response.status_code == 200
+    return response
+
+
+def test_users_me_revalidates_until_an_analysis_is_stored(client):
+    first = client.get("/api/users/me")
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and "no-cache" in first.headers["cache-control"]
+    with patch("main.usage_units") as count:
+        revalidated = client.get("/api/users/me", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304 and revalidated.content == b""
+    count.assert_not_called()  # answered from the stamp alone
+
+    analyze(client)
+    changed = client.get("/api/users/me", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert changed.json()["usage_count"] == first.json()["usage_count"] + 1
+
+
+def test_stored_analysis_read_and_compression(client):
+    db = TestingSessionLocal()
+    analysis_json = {"overall_score": 72, "optimized_resume_content": "## Experience\n- Cut latency by 40%\n" * 100}
+    own, other = (ResumeAnalysis(user_id=USER_ID, original_text=TEXT, analysis_json=analysis_json),
+                  ResumeAnalysis(user_id=USER_ID + 1, original_text="other", analysis_json={}))
+    db.add_all([own, other])
+    db.commit()
+    analysis_id, other_id = own.id, other.id
+    db.close()
+
+    response = client.get(f"/api/analyses/{analysis_id}", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200 and response.json()["analysis"] == analysis_json
+    assert response.json()["id"] == analysis_id
+    assert response.headers["content-encoding"] == "gzip"  # decoded transparently by the client
+
+    etag = response.headers["etag"]
+    assert etag_matches(f'"other", {etag}', etag)
+    assert client.get(f"/api/analyses/{analysis_id}", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get(f"/api/analyses/{other_id}").status_code == 404
+
+    stats = client.get("/api/health/compression").json()
+    assert stats["compressed"] >= 1 and stats["bytes_saved"] > 0 and stats["encodings"][-1] == "gzip"
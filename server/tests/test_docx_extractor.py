@@ -0,0 +1,91 @@
+import sys
+import os
+import io
+import zipfile
+import docx
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.docx_extractor import extract_docx_streaming
+from services.resume_parser import extract_docx_with_layout, parse_document
+
+
+def build_docx(with_table: bool = True) -> bytes:
+    document = docx.Document()
+    header = document.sections[0].header
+    header.paragraphs[0].text = "Jane Doe | jane@doe.io | +1 555 123 4567"
+    document.sections[0].footer.paragraphs[0].text = "References available on request"
+    document.add_heading("Experience", level=1)
+    document.add_paragraph("Senior Engineer at Acme (2021 - Present)")
+    document.add_paragraph("Cut latency by 40%", style="List Bullet")
+    bold = document.add_paragraph()
+    bold.add_run("Skills").bold = True
+    if with_table:
+        table = document.add_table(rows=2, cols=2)
+        for row, values in zip(table.rows, (("Python", "Go"), ("Docker", "AWS"))):
+            for cell, value in zip(row.cells, values):
+                cell.text = value
+    document.add_paragraph("Education")
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def test_reads_headers_tables_and_footers_in_order():
+    text, hints = extract_docx_streaming(build_docx())
+    lines = [line for line in text.splitlines() if line]
+    assert lines == [
+        "Jane Doe | jane@doe.io | +1 555 123 4567",
+        "Experience",
+        "Senior Engineer at Acme (2021 - Present)",
+        "Cut latency by 40%",
+        "Skills",
+        "Python | Go",
+        "Docker | AWS",
+        "Education",
+        "References available on request",
+    ]
+    assert {"experience", "skills"} <= hints
+
+
+def test_matches_python_docx_on_plain_paragraphs():
+    data = build_docx(with_table=False)
+    legacy, legacy_hints = extract_docx_with_layout(data)
+    streamed, hints = extract_docx_streaming(data)
+    body = streamed.splitlines()[1:-1]  # minus header and footer
+    assert body == legacy.splitlines()
+    assert hints == legacy_hints
+
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+MC_NS = "http://schemas.openxmlformats.org/markup-compatibility/2006"
+DOCUMENT_XML = f"""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document xmlns:w="{W_NS}" xmlns:mc="{MC_NS}"><w:body>
+<w:p><w:r><w:rPr><w:b w:val="0"/></w:rPr><w:t>Not bold</w:t></w:r></w:p>
+<w:p><w:r><mc:AlternateContent>
+  <mc:Choice Requires="wps"><w:txbxContent><w:p><w:r><w:t>Text box skills</w:t></w:r></w:p></w:txbxContent></mc:Choice>
+  <mc:Fallback><w:txbxContent><w:p><w:r><w:t>Text box skills</w:t></w:r></w:p></w:txbxContent></mc:Fallback>
+</mc:AlternateContent></w:r><w:r><w:t xml:space="preserve">Anchor</w:t><w:tab/><w:t>line</w:t></w:r></w:p>
+<w:tbl><w:tr>
+  <w:tc><w:p><w:r><w:t>Left one</w:t></w:r></w:p><w:p><w:r><w:t>Left two</w:t></w:r></w:p></w:tc>
+  <w:tc><w:tbl><w:tr><w:tc><w:p><w:r><w:t>Nested</w:t></w:r></w:p></w:tc></w:tr></w:tbl></w:tc>
+</w:tr></w:tbl>
+</w:body></w:document>"""
+
+
+def test_text_boxes_once_and_nested_tables():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("word/document.xml", DOCUMENT_XML)
+    text, hints = extract_docx_streaming(buffer.getvalue())
+    assert text.splitlines() == ["Not bold", "Text box skills", "Anchor\tline", "Left one", "Left two", "Nested"]
+    assert hints == set()
+
+
+def test_parse_document_falls_back_to_python_docx():
+    data = build_docx(with_table=False)
+    with patch("services.resume_parser.extract_docx_streaming", side_effect=KeyError("word/document.xml")):
+        parsed = parse_document(data + b"\0", "resume.docx")  # distinct bytes: bypass the parse cache
+    assert "Jane Doe" not in parsed.text  # python-docx ignores headers
+    assert "Senior Engineer at Acme (2021 - Present)" in parsed.text
@@ -0,0 +1,140 @@
+import sys
+import os
+import io
+import pytest
+import pdfplumber
+import docx
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app, get_db
+from models import Base, User, ResumeAnalysis
+from auth import get_current_user
+from services import exporter
+from services.exporter import ExportCache, TEMPLATES, parse_markdown, render_docx, render_pdf
+
+MARKDOWN = """# Jane Doe
+**jane@doe.io** | **+1 555 123 4567**
+
+## SUMMARY
+Backend engineer focused on reliable (and fast) systems.
+
+## EXPERIENCE
+**Senior Engineer at Acme (2021 - Present)**
+* Cut p95 latency by 40% by adding a caching layer in front of PostgreSQL
+* Led the migration of 30 services to Kubernetes
+
+## SKILLS
+* **Skills**: Python, Go"""
+
+
+def pdf_text(data: bytes) -> str:
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        return "\n".join(page.extract_text() or "" for page in pdf.pages)
+
+
+def test_parse_markdown_blocks():
+    kinds = [kind for kind, _ in parse_markdown(MARKDOWN)]
+    assert kinds[:3] == ["title", "paragraph", "blank"]
+    assert "heading" in kinds and "bullet" in kinds
+    assert parse_markdown("* **Skills**: Go")[0] == ("bullet", [("Skills", True), (": Go", False)])
+
+
+def test_pdf_is_text_extractable_in_reading_order():
+    text = pdf_text(render_pdf(MARKDOWN, TEMPLATES["classic"]))
+    assert text.splitlines()[0] == "Jane Doe"
+    assert text.index("SUMMARY") < text.index("EXPERIENCE") < text.index("SKILLS")
+    assert "reliable (and fast) systems" in text
+    assert "Skills: Python, Go" in text
+
+
+def test_pdf_paginates_long_content():
+    with pdfplumber.open(io.BytesIO(render_pdf(MARKDOWN * 10, TEMPLATES["compact"]))) as pdf:
+        assert len(pdf.pages) > 1
+
+
+def test_docx_render():
+    document = docx.Document(io.BytesIO(render_docx(MARKDOWN, "classic")))
+    paragraphs = [paragraph for paragraph in document.paragraphs if paragraph.text]
+    assert paragraphs[0].text == "Jane Doe" and paragraphs[0].runs[0].bold
+    bullets = [paragraph.text for paragraph in paragraphs if paragraph.style.name == "List Bullet"]
+    assert bullets[-1] == "Skills: Python, Go"
+
+
+def test_cache_is_byte_bounded(tmp_path):
+    cache = ExportCache(max_bytes=10, directory=str(tmp_path))
+    cache.put("a", b"123456")
+    cache.put("b", b"123456")
+    assert list(cache._items) == ["b"]
+    assert cache.get("a") == b"123456"  # still on disk for other workers
+    assert cache.get("missing") is None
+
+
+engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+@pytest.fixture
+def client():
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = lambda: User(id=800, email="export@example.com")
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(previous)
+
+
+def stored(user_id: int, markdown: str) -> int:
+    db = TestingSessionLocal()
+    analysis = ResumeAnalysis(user_id=user_id, original_text="text",
+                              analysis_json={"optimized_resume_content": markdown})
+    db.add(analysis)
+    db.commit()
+    analysis_id = analysis.id
+    db.close()
+    return analysis_id
+
+
+def test_export_endpoint_caches_and_revalidates(client, monkeypatch):
+    monkeypatch.setattr(exporter, "export_cache", ExportCache())
+    analysis_id = stored(800, MARKDOWN)
+    calls = []
+    real_render = exporter.render
+    monkeypatch.setattr(exporter, "render", lambda *args: calls.append(args) or real_render(*args))
+
+    response = client.get(f"/api/analyses/{analysis_id}/export?format=pdf")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    assert "private" in response.headers["cache-control"]
+    assert "Jane Doe" in pdf_text(response.content)
+
+    again = client.get(f"/api/analyses/{analysis_id}/export?format=pdf")
+    assert again.content == response.content and len(calls) == 1
+
+    etag = response.headers["etag"]
+    assert client.get(f"/api/analyses/{analysis_id}/export", headers={"If-None-Match": etag}).status_code == 304
+
+    docx_response = client.get(f"/api/analyses/{analysis_id}/export?format=docx&template=compact")
+    assert docx_response.status_code == 200 and docx_response.headers["etag"] != etag
+    assert len(calls) == 2
+
+
+def test_export_errors(client):
+    own = stored(800, "")
+    other = stored(801, MARKDOWN)
+    assert client.get(f"/api/analyses/{other}/export").status_code == 404
+    assert client.get(f"/api/analyses/{own}/export").status_code == 404
+    assert client.get(f"/api/analyses/{own}/export?format=rtf").status_code == 400
+    assert client.get(f"/api/analyses/{own}/export?template=fancy").status_code == 400
@@ -0,0 +1,126 @@
+import sys
+import os
+import asyncio
+import datetime
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app, get_db
+from models import Base, User, ResumeAnalysis, IdempotencyKey
+from auth import get_current_user
+from services import idempotency
+from services.idempotency import IdempotencyError, claim_key, complete_key, sweep_expired
+from services.ats_scorer import score_resume
+
+RESUME = "Jane Doe\nEXPERIENCE\nBackend engineer. Python, Go, PostgreSQL, Docker."
+
+engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+@pytest.fixture
+def client():
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = lambda: User(id=1100, email="retry@example.com")
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(previous)
+
+
+def analyze(client, key, role="Backend Engineer", fail=False):
+    with patch("main.analyze_resume_with_ai") as mock_ai, patch("main.parse_resume", return_value=RESUME):
+        mock_ai.return_value = score_resume(RESUME, role)
+        if fail:
+            mock_ai.side_effect = RuntimeError("LLM timeout")
+        response = client.post("/api/analyze-resume", headers={"Idempotency-Key": key},
+                               files={"resume_file": ("resume.pdf", b"%PDF-1.4 resume", "application/pdf")},
+                               data={"target_role": role})
+    return response, mock_ai.call_count
+
+
+def stored_count() -> int:
+    db = TestingSessionLocal()
+    try:
+        return db.query(ResumeAnalysis).filter(ResumeAnalysis.user_id == 1100).count()
+    finally:
+        db.close()
+
+
+def test_retry_replays_without_new_work(client):
+    first, calls = analyze(client, "upload-1")
+    assert first.status_code == 200 and calls == 1
+    retry, calls = analyze(client, "upload-1")
+    assert retry.status_code == 200 and calls == 0
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert retry.content == first.content
+    assert stored_count() == 1
+
+    assert analyze(client, "upload-1", role="Designer")[0].status_code == 422
+    assert analyze(client, "x" * 300)[0].status_code == 400
+
+
+def test_failed_request_releases_key(client):
+    before = stored_count()
+    assert analyze(client, "upload-2", fail=True)[0].status_code == 500
+    response, calls = analyze(client, "upload-2")
+    assert response.status_code == 200 and calls == 1
+    assert stored_count() == before + 1
+
+
+def test_concurrent_retry_waits_for_the_original():
+    owner, retry = TestingSessionLocal(), TestingSessionLocal()
+
+    async def scenario():
+        assert await claim_key(owner, 1101, "k", "hash") is None
+
+        async def finish():
+            await asyncio.sleep(0.2)
+            complete_key(owner, 1101, "k", 200, b'{"overall_score": 70}')
+
+        entry, _ = await asyncio.gather(claim_key(retry, 1101, "k", "hash"), finish())
+        return entry
+
+    entry = asyncio.run(scenario())
+    assert entry.status == "done" and entry.response_body == b'{"overall_score": 70}'
+
+    async def still_running():
+        assert await claim_key(owner, 1101, "slow", "hash") is None
+        await claim_key(retry, 1101, "slow", "hash", wait=0.1)
+
+    with pytest.raises(IdempotencyError) as error:
+        asyncio.run(still_running())
+    assert error.value.status_code == 409
+    owner.close()
+    retry.close()
+
+
+def test_abandoned_and_expired_entries(monkeypatch):
+    db = TestingSessionLocal()
+    old = datetime.datetime.utcnow() - datetime.timedelta(hours=1)
+    db.add(IdempotencyKey(user_id=1102, key="crashed", request_hash="hash", status="pending",
+                          created_at=old, expires_at=old + datetime.timedelta(days=1)))
+    db.add(IdempotencyKey(user_id=1102, key="expired", request_hash="hash", status="done",
+                          created_at=old, expires_at=old + datetime.timedelta(minutes=1)))
+    db.commit()
+
+    assert asyncio.run(claim_key(db, 1102, "crashed", "hash", wait=0)) is None  # taken over
+    assert sweep_expired(db, force=True) == 1
+    monkeypatch.setattr(idempotency, "_last_sweep", float("inf"))
+    assert sweep_expired(db) == 0  # throttled
+    assert db.query(IdempotencyKey).filter(IdempotencyKey.user_id == 1102).count() == 1
+    db.close()
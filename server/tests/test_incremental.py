@@ -0,0 +1,187 @@
+import sys
+import os
+import json
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app, get_db
+from database import init_db
+from models import Base, User, ResumeAnalysis, ResumeAnalysisResponse
+from auth import get_current_user
+from services.incremental import analyze_incremental, build_history, entry_key, jd_fingerprint, plan_reuse
+from services.section_segmenter import segment_resume
+from services.ai_analyzer import error_result, is_error_result
+
+RESUME = """Jane Doe
+jane@doe.io
+EXPERIENCE
+Senior Engineer at Acme (2021 - Present)
+- Cut latency by adding caching
+- Led migration to Kubernetes
+Engineer at Beta (2018 - 2021)
+- Built billing pipeline
+PROJECTS
+Resume Parser (Python)
+- Parsed resumes
+SKILLS
+Python, Go"""
+
+EDITED = RESUME.replace("Built billing pipeline", "Built billing pipeline processing $2M per month")
+
+
+class RecordingClient:
+    """Fake LLM client that records which entry headers were sent for rewriting."""
+
+    def __init__(self):
+        self.rewrites = []
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, messages, model, **kwargs):
+        self.calls += 1
+        prompt = messages[0]["content"]
+        if "rewritten_bullets" in prompt:
+            header = prompt.split("<User_Input>")[1].strip().splitlines()[0].strip()
+            self.rewrites.append(header)
+            content = {"rewritten_bullets": [f"{header} rewritten"]}
+        else:
+            content = {
+                "overall_score": 77, "strengths": [], "weaknesses": [], "ats_issues": [],
+                "role_alignment_feedback": "Fine", "missing_skills": [], "final_suggestions": "Ok",
+                "optimized_summary": "Engineer.",
+            }
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(content)))])
+
+
+def test_entry_key_ignores_case_and_spacing():
+    entry = {"header": "Engineer at Beta", "bullets": ["Built  billing pipeline"]}
+    same = {"header": "engineer at beta", "bullets": ["Built billing pipeline "]}
+    assert entry_key("experience", entry) == entry_key("experience", same)
+    assert entry_key("experience", entry) != entry_key("projects", entry)
+    assert jd_fingerprint(" Python  dev ") == jd_fingerprint("python dev")
+
+
+def test_plan_reuse_only_matches_unchanged_entries():
+    before, after = segment_resume(RESUME), segment_resume(EDITED)
+    rewritten = {("experience", 0): ["a"], ("experience", 1): ["b"], ("projects", 0): ["c"]}
+    reuse = plan_reuse(build_history(before, rewritten), after)
+    assert reuse == {("experience", 0): ["a"], ("projects", 0): ["c"]}
+
+
+def test_only_edited_entries_are_sent_to_the_llm():
+    first = RecordingClient()
+    with patch("services.section_analysis.create_client", return_value=first):
+        _, history, _ = analyze_incremental(None, RESUME, segment_resume(RESUME), "Backend Engineer")
+    assert len(first.rewrites) == 3
+
+    prior = SimpleNamespace(original_text=RESUME, sections_json=history, analysis_json={})
+    second = RecordingClient()
+    with patch("services.section_analysis.create_client", return_value=second):
+        result, _, report = analyze_incremental(prior, EDITED, segment_resume(EDITED), "Backend Engineer")
+
+    assert second.rewrites == ["Engineer at Beta (2018 - 2021)"]
+    ResumeAnalysisResponse(**result)
+    assert "Senior Engineer at Acme (2021 - Present) rewritten" in result["optimized_bullets"]
+    assert [entry["recomputed"] for entry in report["entries"]] == [False, True, False]
+
+
+def test_identical_resume_reuses_stored_result():
+    prior = SimpleNamespace(original_text=RESUME, sections_json=build_history(segment_resume(RESUME)),
+                            analysis_json={"overall_score": 64})
+    client = RecordingClient()
+    with patch("services.section_analysis.create_client", return_value=client):
+        result, _, report = analyze_incremental(prior, RESUME, segment_resume(RESUME), "Backend Engineer")
+    assert client.calls == 0
+    assert result == {"overall_score": 64}
+    assert report["scoring"] is False
+
+
+def test_failed_prior_is_not_replayed():
+    prior = SimpleNamespace(id=9, original_text=RESUME, sections_json=build_history(segment_resume(RESUME)),
+                            analysis_json=error_result(ValueError("boom")))
+    client = RecordingClient()
+    with patch("services.section_analysis.create_client", return_value=client):
+        result, _, report = analyze_incremental(prior, RESUME, segment_resume(RESUME), "Backend Engineer")
+    assert client.calls > 0 and report["scoring"] is True and "replayed_from" not in report
+    assert not is_error_result(result)
+
+
+# --- Endpoint ---
+engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+@pytest.fixture
+def client():
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    db = TestingSessionLocal()
+    if not db.get(User, 500):
+        db.add(User(id=500, email="incremental@example.com", hashed_password="pw"))
+        db.commit()
+    db.close()
+
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = lambda: User(id=500, email="incremental@example.com")
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(previous)
+
+
+def test_incremental_mode_endpoint(client):
+    data = {"target_role": "Backend Engineer", "job_description": "Python services", "mode": "incremental"}
+    fake = RecordingClient()
+    with patch("main.parse_resume", side_effect=[RESUME, EDITED]), \
+         patch("services.section_analysis.create_client", return_value=fake):
+        first = client.post("/api/analyze-resume", files={"resume_file": ("a.pdf", b"v1", "application/pdf")}, data=data)
+        second = client.post("/api/analyze-resume", files={"resume_file": ("a.pdf", b"v2", "application/pdf")}, data=data)
+
+    assert first.status_code == 200 and second.status_code == 200
+    assert all(entry["recomputed"] for entry in first.json()["recomputed"]["entries"])
+    assert sum(entry["recomputed"] for entry in second.json()["recomputed"]["entries"]) == 1
+    assert len(fake.rewrites) == 4
+
+    db = TestingSessionLocal()
+    stored = db.query(ResumeAnalysis).filter(ResumeAnalysis.user_id == 500).order_by(ResumeAnalysis.id).all()
+    db.close()
+    assert len(stored) == 2
+    assert stored[-1].target_role == "Backend Engineer"
+    assert stored[-1].jd_hash == jd_fingerprint("python services")
+    assert "recomputed" not in stored[-1].analysis_json
+
+
+def test_identical_resubmission_is_not_stored_or_charged(client):
+    data = {"target_role": "Replay Engineer", "mode": "incremental"}
+    with patch("main.parse_resume", return_value=RESUME), \
+         patch("services.section_analysis.create_client", return_value=RecordingClient()):
+        first = client.post("/api/analyze-resume", files={"resume_file": ("a.pdf", b"v1", "application/pdf")}, data=data)
+        usage = client.get("/api/users/me").json()["usage_count"]
+        again = client.post("/api/analyze-resume", files={"resume_file": ("a.pdf", b"v1", "application/pdf")}, data=data)
+
+    assert again.status_code == 200 and again.json()["recomputed"]["replayed_from"]
+    assert again.json()["overall_score"] == first.json()["overall_score"]
+    assert client.get("/api/users/me").json()["usage_count"] == usage
+
+
+def test_init_db_adds_history_columns_to_existing_table():
+    old = create_engine("sqlite:///:memory:", poolclass=StaticPool)
+    with old.begin() as conn:
+        conn.execute(text("CREATE TABLE resume_analyses (id INTEGER PRIMARY KEY, user_id INTEGER, "
+                          "original_text TEXT, analysis_json JSON, created_at DATETIME)"))
+    init_db(bind=old)
+    columns = {column["name"] for column in inspect(old).get_columns("resume_analyses")}
+    assert {"target_role", "jd_hash", "sections_json"} <= columns
@@ -0,0 +1,147 @@
+import sys
+import os
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app, get_db
+from models import Base, User, JobDescription
+from auth import get_current_user
+from services import jd_preprocessor
+from services.jd_preprocessor import build_profile, get_jd_profile, jd_cache_stats, jd_fingerprint
+from services.ats_scorer import score_resume
+
+JD = """Senior Backend Engineer
+Acme is building the future of payments.
+
+What You'll Do
+- Design and build REST APIs in Python
+- Own services running on Kubernetes
+
+Requirements:
+- 5+ years of Python experience
+- Experience with PostgreSQL and Docker
+- AWS experience is a plus
+
+Nice to have
+- Kafka
+
+Benefits
+- 401(k) matching
+- Unlimited PTO
+
+Acme is an equal opportunity employer and does not discriminate based on race, color or gender identity."""
+
+RESUME = """Jane Doe | jane@example.com
+EXPERIENCE
+- Built REST APIs in Python and PostgreSQL
+- Ran Docker workloads on Kubernetes
+SKILLS
+Python, Docker"""
+
+engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    jd_preprocessor.reset_jd_cache()
+    yield
+    jd_preprocessor.reset_jd_cache()
+
+
+def test_profile_splits_requirements_and_strips_boilerplate():
+    profile = build_profile(JD)
+    assert profile["must_have"] == ["5+ years of Python experience", "Experience with PostgreSQL and Docker"]
+    assert profile["nice_to_have"] == ["AWS experience is a plus", "Kafka"]
+    assert profile["responsibilities"][0] == "Design and build REST APIs in Python"
+    compact = profile["compact"]
+    for boilerplate in ("401(k)", "PTO", "equal opportunity"):
+        assert boilerplate not in compact
+    assert "Kafka" in profile["skills"]["nice"] and "Kafka" not in profile["skills"]["must"]
+
+
+def test_benefit_words_in_requirements_are_kept():
+    profile = build_profile("""We offer health insurance, dental and a 401k.
+Must pass a background check.
+Requirements:
+- Experience with dental practice-management software
+- Built wellness tracking apps""")
+    assert profile["must_have"] == ["Must pass a background check.",
+                                    "Experience with dental practice-management software",
+                                    "Built wellness tracking apps"]
+    assert "health insurance" not in profile["compact"]
+
+
+def test_numbers_are_not_bullet_markers():
+    profile = build_profile("Requirements:\n3.5+ years of Go\n1. Kubernetes in production")
+    assert profile["must_have"] == ["3.5+ years of Go", "Kubernetes in production"]
+
+
+def test_unstructured_posting_keeps_sentences():
+    profile = build_profile("We want someone great. Must know Go. Kubernetes is a plus.")
+    assert profile["must_have"] == ["Must know Go."]
+    assert profile["nice_to_have"] == ["Kubernetes is a plus."]
+    assert profile["summary"] == "We want someone great."
+
+
+def test_shared_cache_hits_across_sessions_and_counts_tokens():
+    db = TestingSessionLocal()
+    first = get_jd_profile(db, JD)
+    again = get_jd_profile(db, "  " + JD.upper() + "\n")  # same posting, different whitespace/case
+    db.close()
+
+    jd_preprocessor._memory.clear()  # another worker: only the table is shared
+    db = TestingSessionLocal()
+    from_table = get_jd_profile(db, JD)
+    assert db.get(JobDescription, jd_fingerprint(JD)) is not None
+    db.close()
+
+    assert first == again == from_table
+    stats = jd_cache_stats()
+    assert (stats["misses"], stats["memory_hits"], stats["db_hits"]) == (1, 1, 1)
+    assert stats["hit_rate"] == pytest.approx(2 / 3, abs=1e-3)
+    assert stats["prompt_tokens_saved"] > 0
+    assert get_jd_profile(db, "   ") is None
+
+
+def test_scorer_weights_nice_to_have_below_must_have():
+    profile = build_profile("Requirements:\n- Python\n- Go\nNice to have:\n- Rust")
+    without_rust = score_resume("Python and Go developer", "Engineer", sections={}, jd_profile=profile)
+    without_go = score_resume("Python and Rust developer", "Engineer", sections={}, jd_profile=profile)
+    assert without_rust["overall_score"] > without_go["overall_score"]
+    assert without_rust["missing_skills"] == ["Rust"]
+
+
+def test_endpoint_prompts_with_compact_job_description():
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = lambda: User(id=600, email="jd@example.com")
+    try:
+        with patch("main.analyze_resume_with_ai") as mock_ai, patch("main.parse_resume", return_value=RESUME):
+            mock_ai.return_value = score_resume(RESUME, "Backend Engineer", JD)
+            files = {"resume_file": ("resume.pdf", b"content", "application/pdf")}
+            data = {"target_role": "Backend Engineer", "job_description": JD}
+            response = TestClient(app).post("/api/analyze-resume", files=files, data=data)
+            stats = TestClient(app).get("/api/health/jd-cache").json()
+    finally:
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(previous)
+
+    assert response.status_code == 200
+    prompt_jd = mock_ai.call_args.kwargs["job_description"]
+    assert prompt_jd.startswith("Summary:") and "401(k)" not in prompt_jd
+    assert stats["lookups"] == 1
@@ -0,0 +1,115 @@
+import sys
+import os
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from models import ResumeAnalysisResponse, GapAnalysisResponse
+from services import json_repair
+from services.ai_analyzer import analyze_resume_with_ai
+from services.json_repair import coerce_fields, parse_llm_json, repair_json
+from services.llm_stub import StubClient
+
+RESUME = "Jane Doe\nEXPERIENCE\nBackend engineer at Acme\n- Built billing APIs in Go\n- Cut latency by 40%"
+
+
+class TruncatingClient:
+    """StubClient whose first completion is cut off after `keep` characters, like a token-limit stop."""
+
+    def __init__(self, keep: int = None, content: str = None):
+        self.stub = StubClient()
+        self.keep = keep
+        self.content = content
+        self.prompts = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        self.prompts.append(kwargs["messages"][-1]["content"])
+        completion = self.stub.chat.completions.create(**kwargs)
+        if len(self.prompts) == 1:
+            content = self.content if self.content is not None else completion.choices[0].message.content[:self.keep]
+            completion.choices[0].message.content = content
+        return completion
+
+
+def test_repair_closes_truncated_structures():
+    assert json.loads(repair_json('{"a": 1, "b": [1, 2, "x')) == {"a": 1}
+    assert json.loads(repair_json('{"a": {"b": 1}, "c": "half')) == {"a": {"b": 1}}
+    assert json.loads(repair_json('{"a": "x", "b"')) == {"a": "x"}
+    assert json.loads(repair_json('{"a": "x",')) == {"a": "x"}
+    assert repair_json("nothing here") is None
+
+
+def test_repair_cuts_back_at_missing_commas_and_empty_values():
+    # Always valid JSON; the fields from the break on are left for the follow-up
+    assert json.loads(repair_json('{"a": 1 "b": 2}')) == {"a": 1}
+    assert json.loads(repair_json('{"a": ["x" "y"]}')) == {}
+    assert json.loads(repair_json('{"a": 1, "b":}')) == {"a": 1}
+    assert json.loads(repair_json('{"a": 1, "b" 2, "c": 3}')) == {"a": 1}
+    assert json.loads(repair_json('{"a": {"b": 1}, "c": 2 {"d": 3}}')) == {"a": {"b": 1}, "c": 2}
+
+
+def test_repair_fixes_sloppy_syntax():
+    fenced = '```json\n{"a": [1, 2,], "b": "line one\nline two",}\n```'
+    assert parse_llm_json(fenced) == {"a": [1, 2], "b": "line one\nline two"}
+    assert parse_llm_json('Here you go: {"a": true} Hope that helps!') == {"a": True}
+    commented = '{"a": 1, // note\n "b": 2, /* block, "c": 3 */ "d": [null, -1.5e2] note}'
+    assert parse_llm_json(commented) == {"a": 1, "b": 2, "d": [None, -150.0]}
+    assert parse_llm_json('{"a": n/a, "b": [1, none, 2]}') == {"a": None, "b": [1, 2]}
+    try:
+        parse_llm_json("Not JSON content")
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+
+def test_coerce_fields_to_response_model():
+    values, missing = coerce_fields({
+        "overall_score": "85/100",
+        "strengths": "- Go\n- Billing",
+        "weaknesses": [{"area": "tests"}],
+        "ats_issues": [],
+        "missing_skills": "Kubernetes",
+        "role_alignment_feedback": ["Good", "fit"],
+    }, GapAnalysisResponse)
+    assert values["overall_score"] == 85
+    assert values["strengths"] == ["Go", "Billing"]
+    assert values["weaknesses"] == ["area: tests"]
+    assert values["role_alignment_feedback"] == "Good\nfit"
+    assert missing == ["final_suggestions"]
+
+
+def test_truncated_response_re_requests_only_missing_fields(monkeypatch):
+    monkeypatch.setattr(json_repair, "repair_stats", dict.fromkeys(json_repair.repair_stats, 0))
+    client = TruncatingClient(keep=600)
+    with patch("services.ai_analyzer.create_client", return_value=client):
+        result = analyze_resume_with_ai(RESUME, "Engineer")
+
+    ResumeAnalysisResponse.model_validate(result)
+    assert len(client.prompts) == 2
+    followup = client.prompts[1]
+    assert "<Previous_Answer>" in followup and '"overall_score"' not in followup.split("<Output_Format>")[1]
+    assert '"optimized_resume_content"' in followup
+    stats = json_repair.repair_summary()
+    assert (stats["responses"], stats["followups"], stats["salvaged"]) == (1, 1, 1)
+    assert stats["salvage_rate"] == 1.0 and stats["followup_tokens"] > 0
+
+
+def test_clean_repaired_and_failed_outcomes(monkeypatch):
+    monkeypatch.setattr(json_repair, "repair_stats", dict.fromkeys(json_repair.repair_stats, 0))
+    with patch("services.ai_analyzer.create_client", return_value=StubClient()):
+        analyze_resume_with_ai(RESUME, "Engineer", depth="score")
+    sloppy = TruncatingClient(content='```json\n{"overall_score": "72%", "role_alignment_feedback": "Fits",}\n```')
+    with patch("services.ai_analyzer.create_client", return_value=sloppy):
+        assert analyze_resume_with_ai(RESUME, "Engineer", depth="score")["overall_score"] == 72
+    with patch("services.ai_analyzer.create_client", return_value=TruncatingClient(content="Not JSON content")):
+        failed = analyze_resume_with_ai(RESUME, "Engineer", depth="score")
+    assert failed["overall_score"] == 0 and len(sloppy.prompts) == 1
+
+    stats = TestClient(app).get("/api/health/llm-repair").json()
+    assert (stats["clean"], stats["repaired"], stats["failed"]) == (1, 1, 1)
+    assert stats["salvage_rate"] == 0.5 and stats["tokens_saved"] > 0
@@ -0,0 +1,123 @@
+import sys
+import os
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import auth
+import main
+from main import app, get_db
+from models import Base, User, ResumeAnalysis, LlmUsageDaily
+from auth import get_current_user
+from services.ai_analyzer import complete
+from services.analytics import backfill, llm_usage_summary
+from services.llm_stub import StubClient
+from services.llm_usage import submit_in_context, usage_meter
+
+engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+RESUME = "Jane Doe\nEXPERIENCE\nBackend engineer at Acme\n- Built billing APIs in Go\n- Cut latency by 40%"
+PROMPT = '<Output_Format>{"overall_score": <int>, "role_alignment_feedback": "<string>"}</Output_Format>'
+
+
+def test_meter_counts_calls_across_threads():
+    client = StubClient()
+    complete(client, PROMPT)  # outside any meter: not counted anywhere
+    with usage_meter() as meter:
+        completion = complete(client, PROMPT)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            for future in [submit_in_context(pool, complete, client, PROMPT) for _ in range(4)]:
+                future.result()
+    assert meter.calls == 5
+    assert meter.prompt_tokens == 5 * completion.usage.prompt_tokens
+    assert meter.completion_tokens == 5 * completion.usage.completion_tokens
+
+
+def override_get_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(auth, "ADMIN_EMAILS", {"admin@example.com"})
+    monkeypatch.setenv("LLM_BACKEND", "stub")
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = lambda: User(id=1600, email="spender@example.com")
+    with patch("main.parse_resume", return_value=RESUME):
+        yield TestClient(app)
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(previous)
+
+
+def analyze(client, **data):
+    return client.post("/api/analyze-resume", data={"target_role": "Engineer", **data},
+                       files={"resume_file": ("resume.pdf", b"%PDF", "application/pdf")})
+
+
+def test_analyses_record_tokens_in_row_and_ledger(client):
+    assert analyze(client).status_code == 200
+    assert analyze(client, mode="parallel").status_code == 200
+
+    db = TestingSessionLocal()
+    full, parallel = db.query(ResumeAnalysis).filter(ResumeAnalysis.user_id == 1600).order_by(ResumeAnalysis.id)
+    ledger = {row.mode: row for row in db.query(LlmUsageDaily).filter(LlmUsageDaily.user_id == 1600)}
+    db.close()
+    assert (full.analysis_mode, full.llm_calls) == ("full", 1)
+    assert full.prompt_tokens > 0 and full.completion_tokens > 0
+    assert parallel.analysis_mode == "parallel" and parallel.llm_calls >= 2  # scoring plus a rewrite per entry
+    assert (ledger["full"].analyses, ledger["full"].calls) == (1, 1)
+    assert ledger["full"].completion_tokens == full.completion_tokens
+    assert ledger["parallel"].prompt_tokens == parallel.prompt_tokens
+
+    app.dependency_overrides[get_current_user] = lambda: User(id=1601, email="admin@example.com")
+    by_mode = client.get("/api/admin/llm-usage?group_by=mode").json()
+    assert {group["mode"] for group in by_mode["groups"]} >= {"full", "parallel"}
+    by_user = client.get("/api/admin/llm-usage?group_by=user").json()
+    spender = next(group for group in by_user["groups"] if group["user"] == 1600)
+    assert spender["total_tokens"] == sum(row.prompt_tokens + row.completion_tokens for row in (full, parallel))
+    assert client.get("/api/admin/llm-usage?group_by=weekday").status_code == 400
+
+
+def test_backfill_rebuilds_ledger(client):
+    analyze(client, target_role="Data Engineer")
+    db = TestingSessionLocal()
+    try:
+        before = llm_usage_summary(db, group_by="role")
+        backfill(db)
+        assert llm_usage_summary(db, group_by="role") == before
+    finally:
+        db.close()
+
+
+def test_token_quota(client, monkeypatch):
+    app.dependency_overrides[get_current_user] = lambda: User(id=1602, email="tokens@example.com")
+    monkeypatch.setattr(main, "QUOTA", "tokens")
+    monkeypatch.setattr(main, "TOKEN_LIMIT", 100)
+    assert analyze(client, depth="score").status_code == 200  # nothing spent yet
+    db = TestingSessionLocal()
+    db.query(LlmUsageDaily).filter(LlmUsageDaily.user_id == 1602).delete()  # ledger lost; rows still count
+    db.commit()
+    row = db.query(ResumeAnalysis).filter(ResumeAnalysis.user_id == 1602).one()
+    db.close()
+    used = client.get("/api/users/me").json()["usage_tokens"]
+    assert used == row.prompt_tokens + row.completion_tokens > 100
+    response = analyze(client, depth="score")
+    assert response.status_code == 403 and "100 LLM tokens" in response.json()["detail"]
+
+    # Results still in the write-behind buffer count too
+    app.dependency_overrides[get_current_user] = lambda: User(id=1603, email="buffered@example.com")
+    with patch("main.pending_tokens", return_value=100):
+        assert analyze(client, depth="score").status_code == 403
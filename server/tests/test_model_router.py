@@ -0,0 +1,133 @@
+import importlib.util
+import sys
+import os
+import time
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app, get_db
+from models import Base, User, ResumeAnalysis
+from auth import get_current_user
+from services import model_router
+from services.ai_analyzer import complete_json
+from services.ats_scorer import score_resume
+from services.llm_stub import StubClient
+from services.model_router import MODEL_TIERS, LatencyTracker, preferred_tier, route_model
+
+engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+FAST, BALANCED, STRONG = (model for _, model in MODEL_TIERS)
+SHORT = "Jane Doe\nEXPERIENCE\nBackend engineer. Python, Go."
+LONG = "Led the migration of billing services to Kubernetes, cutting costs by 30%. " * 200
+JD = "We need a senior backend engineer with Kubernetes, Go and PostgreSQL experience."
+
+
+@pytest.fixture
+def routing(monkeypatch):
+    monkeypatch.setattr(model_router, "LLM_ROUTING", True)
+
+
+def tracker_with(**p95_ms) -> LatencyTracker:
+    tracker = LatencyTracker(min_samples=5)
+    for model, latency in p95_ms.items():
+        for _ in range(10):
+            tracker.observe(model, latency / 1000)
+    return tracker
+
+
+def test_preferred_tier_follows_input():
+    assert MODEL_TIERS[preferred_tier(SHORT)][1] == FAST
+    assert MODEL_TIERS[preferred_tier(SHORT, JD)][1] == BALANCED
+    assert MODEL_TIERS[preferred_tier(LONG, JD)][1] == STRONG
+    assert MODEL_TIERS[preferred_tier(LONG, JD, "parallel")][1] == BALANCED  # small concurrent calls
+
+
+def test_falls_back_when_p95_exceeds_budget(routing):
+    route = route_model(LONG, JD, budget_ms=10000, tracker=LatencyTracker())
+    assert (route.model, route.reason) == (STRONG, "preferred")  # no samples yet: assumed to fit
+
+    slow = tracker_with(**{STRONG: 25000, BALANCED: 8000})
+    route = route_model(LONG, JD, budget_ms=10000, tracker=slow)
+    assert (route.model, route.tier, route.reason) == (BALANCED, "balanced", "p95 over budget (strong)")
+    assert route_model(LONG, JD, budget_ms=30000, tracker=slow).model == STRONG
+
+    everything_slow = tracker_with(**{STRONG: 25000, BALANCED: 20000, FAST: 15000})
+    route = route_model(LONG, JD, budget_ms=10000, tracker=everything_slow)
+    assert route.model == FAST and route.reason == "p95 over budget (strong)"
+    assert route.columns(1.2345) == {"llm_model": FAST, "llm_route": "fast: p95 over budget (strong)",
+                                     "llm_latency_ms": 1234}
+
+
+def test_p95_uses_recent_window():
+    tracker = LatencyTracker(window=20, min_samples=10)
+    for _ in range(20):
+        tracker.observe("m", 30.0)
+    assert tracker.p95("m") == 30000
+    for _ in range(20):
+        tracker.observe("m", 1.0)
+    assert tracker.p95("m") == 1000
+
+    stale = LatencyTracker(min_samples=1, max_age=60)
+    stale.observe("m", 30.0)
+    with patch("services.model_router.time.monotonic", return_value=time.monotonic() + 120):
+        assert stale.p95("m") is None  # aged out: the tier gets probed again
+
+
+def test_routing_is_opt_in(monkeypatch):
+    monkeypatch.delenv("LLM_ROUTING", raising=False)
+    spec = importlib.util.spec_from_file_location("model_router_defaults", model_router.__file__)
+    defaults = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(defaults)
+    assert defaults.LLM_ROUTING is False
+    monkeypatch.setattr(model_router, "LLM_ROUTING", False)
+    route = route_model(SHORT)
+    assert (route.model, route.reason) == (STRONG, "routing off")
+
+
+def test_complete_json_observes_latency(monkeypatch):
+    tracker = LatencyTracker(min_samples=1)
+    monkeypatch.setattr("services.ai_analyzer.latency_tracker", tracker)
+    complete_json(StubClient(), '<Output_Format>{"overall_score": <int>}</Output_Format>', FAST)
+    assert tracker.snapshot()[FAST]["calls"] == 1
+
+
+@pytest.fixture
+def client():
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = lambda: User(id=1400, email="router@example.com")
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(previous)
+
+
+def test_endpoint_records_route_and_latency(client, routing):
+    with patch("main.analyze_resume_with_ai", return_value=score_resume(SHORT, "Engineer")) as analyze, \
+         patch("main.parse_resume", return_value=SHORT):
+        response = client.post("/api/analyze-resume",
+                               data={"target_role": "Engineer", "latency_budget_ms": "5000"},
+                               files={"resume_file": ("resume.pdf", b"%PDF", "application/pdf")})
+    assert response.status_code == 200
+    assert analyze.call_args.kwargs["model"] == FAST
+
+    db = TestingSessionLocal()
+    row = db.query(ResumeAnalysis).filter(ResumeAnalysis.user_id == 1400).one()
+    db.close()
+    assert (row.llm_model, row.llm_route) == (FAST, "fast: preferred")
+    assert row.llm_latency_ms >= 0
+    assert client.get("/api/health/model-router").json()["routes"]["fast: preferred"] >= 1
@@ -0,0 +1,135 @@
+import sys
+import os
+import time
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app, get_db
+from models import Base, User
+from auth import get_current_user
+from services import parser_pool, resume_parser
+from services.parser_pool import ParserError, ParserPool
+from services.exporter import TEMPLATES, render_pdf
+
+RESUME_PDF = render_pdf("# Jane Doe\n## EXPERIENCE\n* Cut p95 latency by 40% with Python and Go", TEMPLATES["classic"])
+
+
+# Jobs run inside the worker processes; they must be importable module-level functions
+def spin(file_bytes, filename, max_pages):
+    while True:
+        pass
+
+
+def hang(file_bytes, filename, max_pages):
+    time.sleep(60)
+
+
+def balloon(file_bytes, filename, max_pages):
+    return "ok", bytearray(4 * 1024 ** 3), False
+
+
+@pytest.fixture
+def pool():
+    pools = []
+
+    def make(**kwargs):
+        pools.append(ParserPool(**{"size": 1, "timeout": 10, **kwargs}))
+        return pools[-1]
+
+    yield make
+    for each in pools:
+        each.close()
+
+
+def test_parses_in_worker_and_recycles(pool):
+    workers = pool(max_jobs=2, max_pages=3)
+    pids = set()
+    for _ in range(3):
+        parsed = workers.parse(RESUME_PDF, "resume.pdf")
+        assert parsed.text.startswith("Jane Doe") and parsed.engine == "pdfplumber"
+        assert "experience" in parsed.sections
+        pids.add(workers._idle.queue[0].process.pid)
+    assert len(pids) == 2
+    long_pdf = render_pdf("# J\n" + "\n".join(f"* line {i}" for i in range(400)), TEMPLATES["classic"])
+    with pytest.raises(ParserError) as error:
+        workers.parse(long_pdf, "resume.pdf")
+    assert error.value.reason == "too_many_pages"
+    with pytest.raises(ParserError, match="Could not parse resume"):
+        workers.parse(b"not a pdf", "resume.pdf")
+    assert workers.parse(RESUME_PDF, "resume.pdf").text.startswith("Jane Doe")  # worker survived
+    stats = workers.stats()
+    assert (stats["ok"], stats["too_many_pages"], stats["errors"], stats["recycled"]) == (4, 1, 1, 3)
+
+
+def test_cpu_limit_kills_worker(pool):
+    workers = pool(cpu_seconds=1, job=spin)
+    with pytest.raises(ParserError) as error:
+        workers.parse(b"x", "resume.pdf")
+    assert error.value.reason == "killed"
+    assert workers.stats()["killed"] == 1 and workers.stats()["idle"] == 1  # replaced
+
+
+def test_wall_clock_timeout(pool):
+    workers = pool(timeout=0.5, job=hang)
+    started = time.perf_counter()
+    with pytest.raises(ParserError) as error:
+        workers.parse(b"x", "resume.pdf")
+    assert error.value.reason == "timeout" and time.perf_counter() - started < 5
+    assert workers.stats()["timeouts"] == 1 and workers.stats()["started"] == 2
+
+
+def test_memory_limit(pool):
+    workers = pool(memory_mb=256, job=balloon)
+    with pytest.raises(ParserError) as error:
+        workers.parse(b"x", "resume.pdf")
+    assert error.value.reason == "memory"
+    assert workers.stats()["memory"] == 1 and workers.stats()["started"] == 2
+
+
+engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+@pytest.fixture
+def client():
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = lambda: User(id=900, email="sandbox@example.com")
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(previous)
+
+
+def test_endpoint_rejects_what_the_sandbox_refuses(client):
+    with patch("main.parse_resume", side_effect=ParserError("timeout", "Resume took longer than 20s to parse.")):
+        response = client.post("/api/analyze-resume", data={"target_role": "Engineer"},
+                               files={"resume_file": ("resume.pdf", b"%PDF", "application/pdf")})
+    assert response.status_code == 422
+    assert "longer than" in response.json()["detail"]
+
+
+def test_parse_document_uses_running_pool(monkeypatch):
+    calls = []
+
+    class FakePool:
+        def parse(self, file_bytes, filename):
+            calls.append(filename)
+            return resume_parser.extract_document(file_bytes, filename)
+
+    monkeypatch.setattr(parser_pool, "_pool", FakePool())
+    parsed = resume_parser.parse_document(RESUME_PDF + b"\n", "resume.pdf")  # distinct bytes: bypass the parse cache
+    assert calls == ["resume.pdf"] and parsed.text.startswith("Jane Doe")
@@ -0,0 +1,65 @@
+import sys
+import os
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import resume_parser
+from services.resume_parser import PDF_ENGINES, extract_pdf, looks_broken, parse_document, text_quality
+from services.exporter import TEMPLATES, render_pdf
+
+PAGE = "## EXPERIENCE\n" + "\n".join(
+    f"* Improved service {i} throughput by {10 + i}% by redesigning caching in Python and Go" for i in range(30)
+)
+
+
+def pdf(copies: int) -> bytes:
+    return render_pdf("# Jane Doe\n" + "\n".join([PAGE] * copies), TEMPLATES["classic"])
+
+
+@pytest.fixture(autouse=True)
+def auto_policy(monkeypatch):
+    monkeypatch.setattr(resume_parser, "PDF_ENGINE", "auto")
+    monkeypatch.setattr(resume_parser, "pdf_engine_stats", {"engines": {}, "fallbacks": 0})
+
+
+def test_engines_agree_on_text():
+    data = pdf(1)
+    # pdfminer groups the bullet glyphs into their own column; compare the words
+    words = {name: [word for word in engine(data)[0].split() if word != "•"] for name, engine in PDF_ENGINES.items()}
+    assert words["pdfium"] == words["pdfminer"] == words["pdfplumber"]
+    assert "Jane" in words["pdfium"]
+
+
+def test_short_resume_uses_layout_engine_long_document_fast_engine():
+    assert extract_pdf(pdf(1))[2] == "pdfplumber"
+    long_pdf = pdf(5)
+    assert resume_parser.pdf_page_count(long_pdf) > resume_parser.PDF_LAYOUT_MAX_PAGES
+    text, hints, engine = extract_pdf(long_pdf)
+    assert engine == "pdfium" and hints == set()
+    assert text.count("Improved service 29") == 5
+    assert resume_parser.pdf_engine_stats == {"engines": {"pdfplumber": 1, "pdfium": 1}, "fallbacks": 0}
+
+
+def test_broken_fast_output_falls_back(monkeypatch):
+    monkeypatch.setitem(PDF_ENGINES, "pdfium", lambda data: ("(cid:12)(cid:7) " * 400, set()))
+    text, _, engine = extract_pdf(pdf(5))
+    assert engine == "pdfplumber" and "(cid:" not in text
+    assert resume_parser.pdf_engine_stats["fallbacks"] == 1
+
+    monkeypatch.setattr(resume_parser, "PDF_ACCURATE_MAX_PAGES", 2)
+    assert extract_pdf(pdf(5))[2] == "pdfium"  # too long to pay for pdfplumber
+
+
+def test_forced_engine(monkeypatch):
+    monkeypatch.setattr(resume_parser, "PDF_ENGINE", "pdfminer")
+    data = pdf(1) + b"\n"  # distinct bytes: bypass the parse cache
+    assert parse_document(data, "resume.pdf").engine == "pdfminer"
+
+
+def test_quality_heuristic():
+    assert looks_broken("", 1)
+    assert looks_broken("x" * 150, 1)
+    assert looks_broken("word " * 100 + "�" * 40, 1)
+    assert not looks_broken("word " * 100, 1)
+    assert text_quality("(cid:1)abc", 1)["garbage_ratio"] == pytest.approx(7 / 10)
@@ -0,0 +1,88 @@
+import sys
+import os
+import time
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import auth
+from main import app
+from models import User
+from auth import create_access_token, get_current_user
+from services import profiling
+from services.profiling import ProfilingMiddleware, list_reports, report_path
+
+
+def busy_wait(seconds: float) -> int:
+    total, deadline = 0, time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        total += sum(range(100))
+    return total
+
+
+@pytest.fixture
+def profiled(tmp_path, monkeypatch):
+    monkeypatch.setattr(auth, "ADMIN_EMAILS", {"admin@example.com"})
+    inner = FastAPI()
+
+    @inner.get("/slow")
+    def slow():
+        blob = [bytearray(1024) for _ in range(2000)]
+        busy_wait(0.15)
+        return {"blocks": len(blob)}
+
+    inner.add_middleware(ProfilingMiddleware, directory=str(tmp_path), sample_rate=0, keep=2, interval=0.002)
+    return TestClient(inner), str(tmp_path)
+
+
+def bearer(email: str) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': email})}", "X-Profile": "1"}
+
+
+def test_only_admins_can_request_a_profile(profiled):
+    client, directory = profiled
+    assert client.get("/slow", headers=bearer("user@example.com")).status_code == 200
+    assert client.get("/slow", headers={"X-Profile": "1"}).status_code == 200
+    assert list_reports(directory) == []
+
+    assert client.get("/slow", headers=bearer("admin@example.com")).status_code == 200
+    [report] = list_reports(directory)
+    assert report["path"] == "/slow" and report["status"] == 200 and report["trigger"] == "header"
+    assert report["duration_ms"] >= 150 and report["samples"] > 10
+    with open(report_path(report["id"], "folded", directory)) as folded:
+        stacks = folded.read()
+    assert "busy_wait (test_profiling.py:" in stacks
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in stacks.splitlines())
+    with open(report_path(report["id"], "alloc", directory)) as alloc:
+        assert "test_profiling.py" in alloc.read()
+    assert report["peak_traced_bytes"] > 2000 * 1024
+
+
+def test_reports_are_bounded_and_ids_validated(profiled):
+    client, directory = profiled
+    for _ in range(3):
+        client.get("/slow", headers=bearer("admin@example.com"))
+    reports = list_reports(directory)
+    assert len(reports) == 2 and len(os.listdir(directory)) == 6
+    assert report_path("../../etc/passwd", "folded", directory) is None
+    assert report_path(reports[0]["id"], "json", directory) is None
+
+
+def test_admin_endpoints(tmp_path, monkeypatch, profiled):
+    assert all(middleware.cls is not ProfilingMiddleware for middleware in app.user_middleware)  # PROFILE_DIR unset
+    client, directory = profiled
+    client.get("/slow", headers=bearer("admin@example.com"))
+    monkeypatch.setattr(profiling, "PROFILE_DIR", directory)
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides[get_current_user] = lambda: User(id=1, email="admin@example.com")
+    try:
+        api = TestClient(app)
+        [report] = api.get("/api/admin/profiles").json()
+        response = api.get(f"/api/admin/profiles/{report['id']}/folded")
+        assert response.status_code == 200 and "busy_wait" in response.text
+        assert api.get(f"/api/admin/profiles/{report['id']}/pstats").status_code == 404
+    finally:
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(previous)
@@ -0,0 +1,161 @@
+import sys
+import os
+import time
+import pytest
+from datetime import timedelta
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import auth
+import database
+from main import app
+from models import Base, User, ResumeAnalysis
+from database import ReadRouter, get_db, make_engine
+from services.ats_scorer import score_resume
+
+RESUME = "Jane Doe\nEXPERIENCE\nBackend engineer. Python, Go."
+
+
+@pytest.fixture
+def instances(tmp_path, monkeypatch):
+    """Two SQLite files standing in for a primary and its replica, each with the same user."""
+    primary = make_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = make_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for engine in (primary, replica):
+        Base.metadata.create_all(bind=engine)
+        with sessionmaker(bind=engine)() as db:
+            db.add(User(id=1, email="reader@example.com"))
+            db.commit()
+    # Only the replica has this row, so reads show where they were served from
+    with sessionmaker(bind=replica)() as db:
+        db.add(ResumeAnalysis(user_id=1, original_text="old", target_role="From Replica", analysis_json={}))
+        db.commit()
+
+    PrimarySession = sessionmaker(autocommit=False, autoflush=False, bind=primary)
+
+    def override_get_db():
+        db = PrimarySession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    router = ReadRouter(replica, window=5, check_interval=60)
+    monkeypatch.setattr(database, "read_router", router)
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides.clear()
+    app.dependency_overrides[get_db] = override_get_db
+    yield router, replica
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(previous)
+    primary.dispose()
+    replica.dispose()
+
+
+def headers(expires_minutes: int = 60) -> dict:
+    # Different expiries give different tokens, i.e. different clients of the same user
+    token = auth.create_access_token({"sub": "reader@example.com"}, timedelta(minutes=expires_minutes))
+    return {"Authorization": f"Bearer {token}"}
+
+
+def roles(client, client_headers) -> list:
+    response = client.get("/api/analyses", headers=client_headers)
+    assert response.status_code == 200
+    return [item["target_role"] for item in response.json()]
+
+
+def test_reads_go_to_replica_and_writes_pin_the_client(instances):
+    router, _ = instances
+    client, other_client = TestClient(app), TestClient(app)  # separate cookie jars
+    writer, other = headers(60), headers(61)
+    assert roles(client, writer) == ["From Replica"]
+    assert client.get("/api/users/me", headers=writer).json()["email"] == "reader@example.com"
+
+    with patch("main.analyze_resume_with_ai", return_value=score_resume(RESUME, "Engineer")), \
+         patch("main.parse_resume", return_value=RESUME):
+        response = client.post("/api/analyze-resume", data={"target_role": "Written"}, headers=writer,
+                               files={"resume_file": ("resume.pdf", b"%PDF", "application/pdf")})
+    assert response.status_code == 200
+    assert float(response.headers["x-read-after"]) > time.time() and client.cookies.get("read_after")
+
+    assert roles(client, writer) == ["Written"]  # read-your-writes: served by the primary
+    assert roles(other_client, other) == ["From Replica"]
+    with patch("database.time.monotonic", return_value=time.monotonic() + 10), \
+         patch("database.time.time", return_value=time.time() + 10):
+        assert roles(client, writer) == ["From Replica"]  # window over
+    stats = client.get("/api/health/db-routing").json()
+    assert stats["reads"]["pinned"] == 1 and stats["reads"]["replica"] >= 4
+
+
+def test_pin_travels_with_the_client_across_workers(instances, monkeypatch):
+    router, replica = instances
+    client = TestClient(app)
+    with patch("main.analyze_resume_with_ai", return_value=score_resume(RESUME, "Engineer")), \
+         patch("main.parse_resume", return_value=RESUME):
+        response = client.post("/api/analyze-resume", data={"target_role": "Written"}, headers=headers(),
+                               files={"resume_file": ("resume.pdf", b"%PDF", "application/pdf")})
+    read_after = response.headers["x-read-after"]
+
+    # Another worker: no process-local pin, only what the client sends back
+    monkeypatch.setattr(database, "read_router", ReadRouter(replica, window=5, check_interval=60))
+    assert roles(client, headers()) == ["Written"]  # cookie
+    assert roles(TestClient(app), {**headers(), "X-Read-After": read_after}) == ["Written"]  # header
+    far_future = str(time.time() + 3600)  # never pins for longer than one window
+    assert roles(TestClient(app), {**headers(), "X-Read-After": far_future}) == ["From Replica"]
+
+
+def test_signup_pins_the_new_user_to_the_primary(instances, monkeypatch):
+    router, replica = instances
+    client = TestClient(app)
+    response = client.post("/api/auth/signup", json={"email": "new@example.com", "password": "pw"})
+    assert response.status_code == 200 and response.headers["x-read-after"]
+    token = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    assert client.get("/api/users/me", headers=token).json()["email"] == "new@example.com"
+
+    # Another worker: only the cookie or header keeps the lagging replica from answering "no such user"
+    monkeypatch.setattr(database, "read_router", ReadRouter(replica, window=5, check_interval=60))
+    assert TestClient(app).get("/api/users/me", headers=token).status_code == 401
+    assert client.get("/api/users/me", headers=token).status_code == 200
+    header = {**token, "X-Read-After": response.headers["x-read-after"]}
+    assert TestClient(app).get("/api/users/me", headers=header).status_code == 200
+
+
+def test_lag_beyond_the_pin_window_is_unhealthy():
+    assert ReadRouter(None, window=5, max_lag=30).max_lag == 5
+
+
+def test_fails_over_to_primary_and_back(instances):
+    router, replica = instances
+    client = TestClient(app)
+    with patch.object(replica, "connect", side_effect=OSError("replica down")):
+        router._next_check = 0.0
+        assert roles(client, headers()) == []  # primary has no analyses
+    assert router.stats()["replica_healthy"] is False and router.counts["failovers"] == 1
+
+    router._next_check = 0.0  # next scheduled check finds it healthy again
+    assert roles(client, headers()) == ["From Replica"]
+    assert router.stats()["replica_healthy"] is True
+
+
+def test_replica_query_errors_mark_it_unhealthy(instances):
+    router, replica = instances
+    client = TestClient(app)
+    ResumeAnalysis.__table__.drop(bind=replica)  # replica broken mid-flight
+    with pytest.raises(Exception):
+        client.get("/api/analyses", headers=headers())
+    assert router.stats()["replica_healthy"] is False
+    assert roles(client, headers()) == []  # served by the primary until the next check
+
+
+def test_replica_sessions_are_read_only(instances):
+    router, _ = instances
+    db = router.replica_session()
+    try:
+        db.add(User(email="nope@example.com"))
+        with pytest.raises(RuntimeError):
+            db.flush()
+    finally:
+        db.close()
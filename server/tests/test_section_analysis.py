@@ -0,0 +1,87 @@
+import sys
+import os
+import json
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import ResumeAnalysisResponse
+from services.ai_analyzer import analyze_resume_with_ai
+from services.section_analysis import analyze_resume_sectioned
+from services.section_segmenter import segment_resume
+
+RESUME = """Jane Doe
+jane@doe.io
+EXPERIENCE
+Senior Engineer at Acme (2021 - Present)
+- Cut latency by adding caching
+- Led migration to Kubernetes
+Engineer at Beta (2018 - 2021)
+- Built billing pipeline
+PROJECTS
+Resume Parser (Python)
+- Parsed resumes
+SKILLS
+Python, Go"""
+
+
+class OutOfOrderClient:
+    """Answers bullet rewrites for earlier entries last, to prove the merge is ordered."""
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, messages, model, **kwargs):
+        prompt = messages[0]["content"]
+        if "rewritten_bullets" in prompt:
+            header = prompt.split("<User_Input>")[1].strip().splitlines()[0].strip()
+            if self.fail_on and self.fail_on in header:
+                raise RuntimeError("rate limited")
+            time.sleep({"Senior": 0.05, "Engineer": 0.02}.get(header.split()[0], 0))
+            content = {"rewritten_bullets": [f"{header} rewritten {i}" for i in range(3)]}
+        else:
+            content = {
+                "overall_score": 81, "strengths": ["Python"], "weaknesses": [], "ats_issues": [],
+                "role_alignment_feedback": "Good", "missing_skills": ["Rust"], "final_suggestions": "Ship it",
+                "optimized_summary": "Backend engineer focused on reliability.",
+            }
+        message = SimpleNamespace(content=json.dumps(content))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def test_parallel_merge_is_deterministic():
+    sections = segment_resume(RESUME)
+    with patch("services.section_analysis.create_client", return_value=OutOfOrderClient()):
+        result = analyze_resume_sectioned(RESUME, sections, "Backend Engineer")
+
+    ResumeAnalysisResponse(**result)
+    assert result["overall_score"] == 81
+    assert [bullet.split(" rewritten")[0] for bullet in result["optimized_bullets"][::3]] == [
+        "Senior Engineer at Acme (2021 - Present)", "Engineer at Beta (2018 - 2021)", "Resume Parser (Python)",
+    ]
+    content = result["optimized_resume_content"]
+    assert content.startswith("# Jane Doe")
+    assert content.index("## SUMMARY") < content.index("## EXPERIENCE") < content.index("## PROJECTS")
+    assert "Backend engineer focused on reliability." in content
+
+
+def test_failed_rewrite_keeps_original_bullets():
+    sections = segment_resume(RESUME)
+    with patch("services.section_analysis.create_client", return_value=OutOfOrderClient(fail_on="Beta")):
+        result = analyze_resume_sectioned(RESUME, sections, "Backend Engineer")
+    assert "Built billing pipeline" in result["optimized_bullets"]
+
+
+def test_falls_back_to_monolithic_without_entries():
+    with patch("services.section_analysis.analyze_resume_with_ai") as mock_ai:
+        mock_ai.return_value = {"overall_score": 5}
+        assert analyze_resume_sectioned("just text", {}, "Dev") == {"overall_score": 5}
+
+
+def test_stub_backend_matches_response_schema(monkeypatch):
+    monkeypatch.setenv("LLM_BACKEND", "stub")
+    ResumeAnalysisResponse(**analyze_resume_with_ai(RESUME, "Backend Engineer"))
+    ResumeAnalysisResponse(**analyze_resume_sectioned(RESUME, segment_resume(RESUME), "Backend Engineer"))
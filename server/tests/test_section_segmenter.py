@@ -0,0 +1,100 @@
+import sys
+import os
+from unittest.mock import patch, MagicMock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.section_segmenter import heading_section, segment_resume, styled_lines_from_chars
+from services import resume_parser
+
+RESUME = """Jane Doe
+Backend Engineer | jane@doe.io | +1 (555) 123-4567 | github.com/jane
+SUMMARY
+Engineer with 6 years building APIs.
+WORK EXPERIENCE
+Senior Engineer at Acme (2021 - Present)
+• Cut p95 latency by 40% by adding caching
+  across 12 services
+• Led migration to Kubernetes
+Engineer | Beta Corp | 2018 - 2021
+- Built billing pipeline in Python
+Projects
+Resume Parser (Python, FastAPI)
+- Parsed 10k resumes per hour
+Technical Skills:
+Languages: Python, Go, SQL
+Tools: Docker, Kubernetes | Terraform
+EDUCATION
+BSc Computer Science, MIT, 2018
+Certifications
+- AWS Certified Developer (2022)"""
+
+
+def chars_for(line: str, top: float, size: float, fontname: str = "Helvetica") -> list:
+    return [{"text": ch, "top": top, "size": size, "fontname": fontname} for ch in line]
+
+
+def test_segment_typed_sections():
+    sections = segment_resume(RESUME)
+    assert sections["contact"] == {
+        "name": "Jane Doe", "email": "jane@doe.io", "phone": "+1 (555) 123-4567", "links": ["github.com/jane"],
+    }
+    assert sections["summary"] == "Engineer with 6 years building APIs."
+    assert [entry["header"] for entry in sections["experience"]] == [
+        "Senior Engineer at Acme (2021 - Present)", "Engineer | Beta Corp | 2018 - 2021",
+    ]
+    # wrapped bullet lines are joined back together
+    assert sections["experience"][0]["bullets"][0] == "Cut p95 latency by 40% by adding caching across 12 services"
+    assert sections["projects"][0]["bullets"] == ["Parsed 10k resumes per hour"]
+    assert sections["skills"] == ["Python", "Go", "SQL", "Docker", "Kubernetes", "Terraform"]
+    assert sections["education"] == ["BSc Computer Science, MIT, 2018"]
+    assert sections["certifications"] == ["AWS Certified Developer (2022)"]
+
+
+def test_segment_without_headings_keeps_text():
+    sections = segment_resume("\n".join(f"line {i}" for i in range(10)))
+    assert "other" in sections
+    assert segment_resume("") == {}
+
+
+def test_layout_hints_promote_styled_headings():
+    text = "Jane Doe\nExperience Highlights\nEngineer at Acme 2020\n- Shipped things"
+    assert "experience" not in segment_resume(text)
+    chars = chars_for("Jane Doe", 10, 18) + chars_for("Experience Highlights", 40, 10, "Arial-BoldMT") \
+        + chars_for("Engineer at Acme 2020", 60, 10) + chars_for("- Shipped things", 80, 10)
+    hints = styled_lines_from_chars(chars)
+    assert hints == {"jane doe", "experience highlights"}
+    assert segment_resume(text, hints)["experience"][0]["bullets"] == ["Shipped things"]
+
+
+def test_styled_employer_lines_are_not_headings():
+    hints = {"acme tools", "education technology inc", "key skills"}
+    assert heading_section("Acme Tools", hints) is None
+    assert heading_section("Education Technology Inc", hints) is None
+    assert heading_section("Key Skills", hints) == "skills"
+
+
+def test_numbers_are_not_bullet_markers():
+    text = "EDUCATION\nBSc Computer Science\n3.9 GPA\nEXPERIENCE\nEngineer at Acme\n2019) Lead role\n1. Built APIs"
+    sections = segment_resume(text)
+    assert "3.9 GPA" in "\n".join(map(str, sections["education"]))
+    assert sections["experience"][0]["bullets"] == ["Built APIs"]
+    assert "2019) Lead role" in sections["experience"][0]["header"]
+
+
+@patch("services.resume_parser.pdfplumber.open")
+def test_parse_document_caches_text_and_sections(mock_pdf_open):
+    page = MagicMock()
+    page.extract_text.return_value = RESUME
+    page.chars = []
+    mock_pdf = MagicMock()
+    mock_pdf.pages = [page]
+    mock_pdf_open.return_value.__enter__.return_value = mock_pdf
+
+    file_bytes = b"%PDF-segmenter-cache-test"
+    first = resume_parser.parse_document(file_bytes, "resume.pdf")
+    second = resume_parser.parse_document(file_bytes, "resume.pdf")
+    assert first is second
+    assert mock_pdf_open.call_count == 1
+    assert resume_parser.parse_resume(file_bytes, "resume.pdf") == RESUME
+    assert resume_parser.get_sections(file_bytes, RESUME)["skills"][0] == "Python"
@@ -0,0 +1,51 @@
+import sys
+import os
+import datetime
+from sqlalchemy import create_engine, text
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import auth
+from create_test_user import SEED_PASSWORD, seed_database
+
+
+def dump(bind) -> tuple:
+    with bind.connect() as conn:
+        users = conn.execute(text("SELECT id, email, created_at FROM users ORDER BY id")).all()
+        analyses = conn.execute(text(
+            "SELECT id, user_id, original_text, analysis_json, created_at, target_role, jd_hash "
+            "FROM resume_analyses ORDER BY id")).all()
+    return users, analyses
+
+
+def test_seed_is_reproducible_across_worker_counts(tmp_path):
+    dumps = []
+    for workers in (1, 3):
+        bind = create_engine(f"sqlite:///{tmp_path}/seed-{workers}.db")
+        stats = seed_database(bind, users=25, mean_analyses=6, seed=11, workers=workers, chunk_size=10,
+                              as_of=datetime.date(2026, 1, 1), log=lambda message: None)
+        assert stats["users"] == 25 and stats["rows_per_second"] > 0
+        dumps.append(dump(bind))
+    assert dumps[0] == dumps[1]
+
+    users, analyses = dumps[0]
+    assert [user.id for user in users] == list(range(1, 26))
+    assert len(analyses) == stats["analyses"] > 0
+    assert max(sum(1 for row in analyses if row.user_id == user.id) for user in users) <= 50
+
+
+def test_seeded_rows_work_with_the_app(tmp_path):
+    from sqlalchemy.orm import sessionmaker
+    import models
+
+    bind = create_engine(f"sqlite:///{tmp_path}/seed.db")
+    seed_database(bind, users=5, mean_analyses=4, seed=1, workers=1, log=lambda message: None)
+    seed_database(bind, users=5, mean_analyses=4, seed=1, workers=1, log=lambda message: None)  # appends
+    db = sessionmaker(bind=bind)()
+    assert db.query(models.User).count() == 10
+    user = db.query(models.User).order_by(models.User.id.desc()).first()
+    assert user.email == "seed1-user10@example.com"
+    assert auth.verify_password(SEED_PASSWORD, user.hashed_password)
+    analysis = db.query(models.ResumeAnalysis).first()
+    assert 0 <= analysis.analysis_json["overall_score"] <= 100 and analysis.created_at.year > 2000
+    db.close()
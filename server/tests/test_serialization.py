@@ -0,0 +1,99 @@
+import sys
+import os
+import json
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app, get_db
+from models import Base, User, ResumeAnalysis, ResumeAnalysisResponse
+from auth import get_current_user
+from services.serialization import FastJSONResponse, validate_analysis, dump_analysis
+
+# --- Database Setup (Isolated) ---
+engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+VALID_RESULT = {
+    "overall_score": 77,
+    "strengths": ["Python"],
+    "weaknesses": [],
+    "ats_issues": [],
+    "role_alignment_feedback": "Solid",
+    "optimized_bullets": ["Shipped X by doing Y resulting in Z"],
+    "missing_skills": ["Go"],
+    "final_suggestions": "Add metrics",
+    "optimized_resume_content": "# Resume",
+}
+
+
+@pytest.fixture
+def client():
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    db = TestingSessionLocal()
+    if not db.get(User, 300):
+        db.add(User(id=300, email="serial@example.com", hashed_password="pw"))
+        db.commit()
+    db.close()
+
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = lambda: User(id=300, email="serial@example.com")
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(previous)
+
+
+def test_validate_analysis_from_raw_json():
+    """Raw LLM output is parsed and validated in one step."""
+    analysis = validate_analysis(json.dumps(VALID_RESULT))
+    assert isinstance(analysis, ResumeAnalysisResponse)
+    assert analysis.overall_score == 77
+
+
+def test_validate_analysis_returns_model_unchanged():
+    """An already validated model is not validated again."""
+    analysis = ResumeAnalysisResponse(**VALID_RESULT)
+    assert validate_analysis(analysis) is analysis
+
+
+def test_validate_analysis_rejects_schema_violation():
+    """Missing fields raise before anything is stored."""
+    with pytest.raises(ValidationError):
+        validate_analysis({"overall_score": 50})
+
+
+def test_fast_json_response_renders_payload():
+    payload = dump_analysis(validate_analysis(VALID_RESULT))
+    response = FastJSONResponse(payload)
+    assert json.loads(response.body) == VALID_RESULT
+    assert response.headers["content-type"] == "application/json"
+
+
+def test_stored_payload_matches_response(client):
+    """The validated payload is stored as-is and returned to the client."""
+    with patch("main.analyze_resume_with_ai") as mock_ai, \
+         patch("main.parse_resume") as mock_parser:
+        mock_ai.return_value = VALID_RESULT
+        mock_parser.return_value = "text"
+        files = {"resume_file": ("resume.pdf", b"content", "application/pdf")}
+        response = client.post("/api/analyze-resume", files=files, data={"target_role": "Dev"})
+
+    assert response.status_code == 200
+    db = TestingSessionLocal()
+    stored = db.query(ResumeAnalysis).filter(ResumeAnalysis.user_id == 300).order_by(ResumeAnalysis.id.desc()).first()
+    db.close()
+    assert stored.analysis_json == response.json() == VALID_RESULT
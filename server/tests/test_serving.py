@@ -0,0 +1,41 @@
+import sys
+import os
+import importlib.util
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.pool import StaticPool
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import init_db
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_gunicorn_conf():
+    spec = importlib.util.spec_from_file_location("gunicorn_conf", os.path.join(SERVER_DIR, "gunicorn.conf.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_init_db_creates_tables_idempotently():
+    """Running schema setup repeatedly (as every worker might) is safe."""
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    init_db(bind=engine)
+    init_db(bind=engine)
+    tables = inspect(engine).get_table_names()
+    assert "users" in tables
+    assert "resume_analyses" in tables
+
+
+def test_worker_count_from_env(monkeypatch):
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    assert load_gunicorn_conf().workers == 3
+
+
+def test_worker_count_defaults_to_cpus(monkeypatch):
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    conf = load_gunicorn_conf()
+    assert conf.workers == conf.available_cpus() >= 1
+    assert conf.preload_app is True
+    assert conf.max_requests > 0
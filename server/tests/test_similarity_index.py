@@ -0,0 +1,209 @@
+import sys
+import os
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app, get_db
+from models import Base, User, ResumeAnalysis
+from auth import get_current_user
+from services import similarity_index
+from services.similarity_index import HEADER, SimilarityIndex, backfill, embed, index_analysis
+from services.ai_analyzer import error_result
+from services.jd_preprocessor import jd_fingerprint
+from services.ats_scorer import score_resume
+
+BACKEND = """Jane Doe | jane@example.com
+EXPERIENCE
+- Built REST APIs in Python and PostgreSQL serving 2M requests per day
+- Ran Docker workloads on Kubernetes across three regions
+SKILLS
+Python, Docker, Kubernetes, PostgreSQL"""
+BACKEND_EDIT = BACKEND.replace("three regions", "three AWS regions")
+NURSE = """John Roe | john@example.com
+EXPERIENCE
+- Registered nurse in a 30-bed intensive care unit
+- Trained new staff on patient triage protocols"""
+
+engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+@pytest.fixture(autouse=True)
+def fresh_index(monkeypatch):
+    monkeypatch.delenv("SIMILARITY_INDEX_PATH", raising=False)
+    similarity_index._index = None
+    yield
+    similarity_index._index = None
+
+
+def test_embedding_ranks_near_duplicates_first():
+    query = embed(BACKEND, "Backend Engineer")
+    assert float(query @ embed(BACKEND_EDIT, "Backend Engineer")) > 0.95
+    assert float(query @ embed(BACKEND, "Backend Engineer")) > float(query @ embed(BACKEND, "Data Scientist"))
+    assert float(query @ embed(NURSE, "Nurse")) < 0.3
+
+
+def test_file_index_is_shared_and_survives_torn_writes(tmp_path):
+    path = str(tmp_path / "analyses.index")
+    writer = SimilarityIndex(path)
+    writer.add(1, 7, embed(BACKEND, "Backend Engineer"))
+    reader = SimilarityIndex(path)
+    writer.add(2, 7, embed(NURSE, "Nurse"))
+    writer.add(3, 8, embed(BACKEND_EDIT, "Backend Engineer"))
+
+    # The reader re-maps when the file grows; other users' records are filtered out
+    assert [hit[0] for hit in reader.query(embed(BACKEND, "Backend Engineer"), k=2, user_id=7)] == [1, 2]
+    assert reader.query(embed(BACKEND, "Backend Engineer"), k=1, exclude_ids=(1,))[0][0] == 3
+
+    with open(path, "ab") as f:
+        f.write(b"\x00" * 10)  # crash mid-append
+    writer.add(4, 7, embed(BACKEND, "Backend Engineer"))
+    assert len(SimilarityIndex(path)) == 4
+    assert (os.path.getsize(path) - HEADER.size) % writer.dtype.itemsize == 0
+
+
+def test_backfill_only_indexes_new_rows():
+    db = TestingSessionLocal()
+    db.add_all([
+        ResumeAnalysis(user_id=700, original_text=BACKEND, target_role="Backend Engineer", analysis_json={}),
+        ResumeAnalysis(user_id=700, original_text=NURSE, target_role="Nurse", analysis_json={}),
+    ])
+    db.commit()
+    index = SimilarityIndex()
+    assert backfill(db, index) == db.query(ResumeAnalysis).count()
+    assert backfill(db, index) == 0
+    db.close()
+
+
+def test_interleaved_workers_index_each_others_rows():
+    db = TestingSessionLocal()
+    worker_a, worker_b = SimilarityIndex(), SimilarityIndex()  # two processes, in-memory indexes
+    backfill(db, worker_a)
+    backfill(db, worker_b)
+
+    def store(worker, text, role):
+        row = ResumeAnalysis(user_id=704, original_text=text, target_role=role, analysis_json={})
+        db.add(row)
+        db.commit()
+        worker.add(row.id, row.user_id, embed(text, role))  # index_analysis in the storing worker
+        return row.id
+
+    # A's own later insert must not hide B's row in between
+    ids = {store(worker_a, BACKEND, "Backend Engineer"), store(worker_b, NURSE, "Nurse"),
+           store(worker_a, BACKEND_EDIT, "Backend Engineer")}
+    assert backfill(db, worker_a) == 1 and backfill(db, worker_b) == 2
+    for worker in (worker_a, worker_b):
+        assert {hit[0] for hit in worker.query(embed(NURSE, "Nurse"), k=5, user_id=704)} == ids
+    assert backfill(db, worker_a) == 0 and backfill(db, worker_b) == 0
+    db.close()
+
+
+def test_queries_catch_up_with_other_workers_rows(monkeypatch):
+    monkeypatch.setattr(similarity_index, "CATCH_UP_ROWS", 1)
+    db = TestingSessionLocal()
+    backfill(db, similarity_index.get_similarity_index())  # what warm-up does at startup
+    # Stored by another worker: never passed through this process's index_analysis
+    db.add_all([
+        ResumeAnalysis(user_id=703, original_text=NURSE, target_role="Nurse", analysis_json={}),
+        ResumeAnalysis(user_id=703, original_text=BACKEND, target_role="Backend Engineer", analysis_json={}),
+    ])
+    db.commit()
+    first = similarity_index.similar_analyses(db, BACKEND, "Backend Engineer", 703)
+    assert [row.target_role for row, _ in first] == ["Nurse"]  # one row per query on the request path
+    second = similarity_index.similar_analyses(db, BACKEND, "Backend Engineer", 703)
+    assert [row.target_role for row, _ in second] == ["Backend Engineer", "Nurse"]
+    db.close()
+
+
+@pytest.fixture
+def client():
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    db = TestingSessionLocal()
+    for user_id in (701, 702):
+        if not db.get(User, user_id):
+            db.add(User(id=user_id, email=f"similar{user_id}@example.com", hashed_password="pw"))
+    db.commit()
+    db.close()
+
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = lambda: User(id=701, email="similar701@example.com")
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(previous)
+
+
+def analyze(client, text, **data):
+    with patch("main.analyze_resume_with_ai") as mock_ai, patch("main.parse_resume", return_value=text):
+        mock_ai.return_value = score_resume(text, "Backend Engineer")
+        files = {"resume_file": ("resume.pdf", text.encode(), "application/pdf")}
+        response = client.post("/api/analyze-resume", files=files, data={"target_role": "Backend Engineer", **data})
+    return response, mock_ai
+
+
+def test_similar_endpoint_lists_own_analyses(client):
+    db = TestingSessionLocal()
+    other = ResumeAnalysis(user_id=702, original_text=BACKEND, target_role="Backend Engineer", analysis_json={})
+    db.add(other)
+    db.commit()
+    other_id = other.id
+    db.close()
+
+    analyze(client, BACKEND)
+    analyze(client, NURSE)
+    analyze(client, BACKEND_EDIT)
+    db = TestingSessionLocal()
+    latest = db.query(ResumeAnalysis).filter(ResumeAnalysis.user_id == 701).order_by(ResumeAnalysis.id.desc()).first()
+    db.close()
+
+    response = client.get(f"/api/analyses/{latest.id}/similar?k=2")
+    assert response.status_code == 200
+    hits = response.json()
+    assert len(hits) == 2 and hits[0]["similarity"] > hits[1]["similarity"]
+    assert latest.id not in [hit["analysis_id"] for hit in hits]
+    assert other_id not in [hit["analysis_id"] for hit in hits]
+    assert client.get(f"/api/analyses/{other_id}/similar").status_code == 404
+
+
+def test_reuse_similar_skips_llm_for_near_duplicate(client):
+    analyze(client, NURSE, job_description="ICU nurse")
+    response, mock_ai = analyze(client, NURSE + "\n", job_description="ICU nurse", reuse_similar="true")
+    assert response.status_code == 200
+    assert response.json()["reused_from"]["similarity"] >= similarity_index.REUSE_THRESHOLD
+    mock_ai.assert_not_called()
+
+    db = TestingSessionLocal()
+    reused = db.query(ResumeAnalysis).filter(ResumeAnalysis.user_id == 701).order_by(ResumeAnalysis.id.desc()).first()
+    db.close()
+    assert reused.usage_cost == 0.0  # no LLM call, no charge
+
+    # A different JD never reuses
+    response, mock_ai = analyze(client, NURSE, job_description="Pediatric nurse", reuse_similar="true")
+    assert "reused_from" not in response.json()
+    mock_ai.assert_called_once()
+
+
+def test_reuse_similar_skips_failed_analyses(client):
+    db = TestingSessionLocal()
+    failed = ResumeAnalysis(user_id=701, original_text=NURSE, target_role="Backend Engineer",
+                            jd_hash=jd_fingerprint("Night nurse"), analysis_json=error_result(ValueError("boom")))
+    db.add(failed)
+    db.commit()
+    index_analysis(db, failed)
+    db.close()
+    response, mock_ai = analyze(client, NURSE, job_description="Night nurse", reuse_similar="true")
+    assert "reused_from" not in response.json()
+    mock_ai.assert_called_once()
@@ -0,0 +1,78 @@
+import sys
+import os
+import json
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.skill_taxonomy import SkillIndex, load_skill_index, get_skill_index, prune_present_skills
+
+ENTRIES = [
+    {"name": "Java", "category": "language"},
+    {"name": "JavaScript", "category": "language", "aliases": ["js"]},
+    {"name": "Machine Learning", "category": "concept", "aliases": ["ml"]},
+    {"name": "Google Cloud", "category": "platform", "aliases": ["gcp", "google cloud platform"]},
+    {"name": "Go", "category": "language", "aliases": ["golang"], "case_sensitive": True},
+    {"name": "B C", "category": "test"},
+    {"name": "A B D", "category": "test"},
+]
+
+
+def test_matches_whole_words_and_aliases():
+    index = SkillIndex.build(ENTRIES)
+    assert index.extract("JavaScript and ML, not Java-like") == ["JavaScript", "Machine Learning"]
+    assert index.extract("Deployed on GCP and java") == ["Google Cloud", "Java"]
+
+
+def test_leftmost_longest_match_wins():
+    index = SkillIndex.build(ENTRIES)
+    matches = index.find("google cloud platform")
+    assert matches == [("Google Cloud", 0, 3)]
+
+
+def test_failure_links_recover_partial_matches():
+    """'a b c' must still find 'b c' after the 'a b d' branch fails."""
+    index = SkillIndex.build(ENTRIES)
+    assert index.extract("a b c") == ["B C"]
+
+
+def test_case_sensitive_entries():
+    index = SkillIndex.build(ENTRIES)
+    assert index.extract("let us go home") == []
+    assert index.extract("Go and golang") == ["Go"]
+
+
+def test_case_sensitivity_is_per_alias():
+    index = get_skill_index()
+    assert index.extract("Golang services") == ["Go"]
+    assert index.extract("Express.js API") == ["Express"]
+    assert index.extract("go to market; excel at planning") == []
+
+
+def test_single_letter_skills_stand_alone():
+    index = get_skill_index()
+    assert index.extract("Led R&D team") == []
+    assert index.extract("Plan A and plan C") == []
+    assert index.extract("Wrote C and R for embedded analytics") == ["C", "R"]
+
+
+def test_disk_cache_round_trip(tmp_path):
+    taxonomy = tmp_path / "taxonomy.json"
+    taxonomy.write_text(json.dumps(ENTRIES))
+    built = load_skill_index(str(taxonomy), cache_dir=str(tmp_path))
+    cached = list(tmp_path.glob("skill-index-*.marshal"))
+    assert len(cached) == 1
+
+    loaded = load_skill_index(str(taxonomy), cache_dir=str(tmp_path))
+    assert loaded.goto == built.goto
+    assert loaded.extract("ML on GCP") == ["Machine Learning", "Google Cloud"]
+
+    # Editing the taxonomy invalidates the cache
+    taxonomy.write_text(json.dumps(ENTRIES + [{"name": "Rust"}]))
+    assert load_skill_index(str(taxonomy), cache_dir=str(tmp_path)).extract("Rust") == ["Rust"]
+    assert len(list(tmp_path.glob("skill-index-*.marshal"))) == 2
+
+
+def test_default_taxonomy_and_prune():
+    index = get_skill_index()
+    assert index.extract("k8s, Postgres and C++") == ["Kubernetes", "PostgreSQL", "C++"]
+    assert prune_present_skills(["Kubernetes", "Docker", "Ownership"], "Ran k8s clusters") == ["Docker", "Ownership"]
@@ -0,0 +1,50 @@
+import sys
+import os
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from services.lazy import lazy_import, ensure_loaded
+from services import warmup
+
+client = TestClient(app)
+
+
+def test_lazy_import_defers_execution(tmp_path, monkeypatch):
+    """The module body only runs on first attribute access."""
+    (tmp_path / "heavy_mod_for_test.py").write_text("import builtins\nbuiltins._heavy_loaded = True\nVALUE = 42\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    import builtins
+
+    module = lazy_import("heavy_mod_for_test")
+    assert not getattr(builtins, "_heavy_loaded", False)
+    assert module.VALUE == 42
+    assert builtins._heavy_loaded
+    del builtins._heavy_loaded
+    sys.modules.pop("heavy_mod_for_test")
+
+
+def test_ensure_loaded_and_reuse(tmp_path, monkeypatch):
+    (tmp_path / "other_mod_for_test.py").write_text("VALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    module = lazy_import("other_mod_for_test")
+    ensure_loaded(module)
+    assert lazy_import("other_mod_for_test") is module
+    sys.modules.pop("other_mod_for_test")
+
+
+def test_readiness_reports_warm_up(monkeypatch):
+    """Readiness is 503 until warm-up has loaded the heavy modules."""
+    monkeypatch.setitem(warmup._state, "ready", False)
+    response = client.get("/api/health/ready")
+    assert response.status_code == 503
+    assert response.json()["ready"] is False
+
+    state = warmup.warm_up()
+    assert state["ready"] is True
+    assert state["duration_ms"] is not None
+
+    response = client.get("/api/health/ready")
+    assert response.status_code == 200
+    assert response.json()["ready"] is True
@@ -0,0 +1,127 @@
+import sys
+import os
+import time
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app, get_db
+from models import Base, User, ResumeAnalysis
+from auth import get_current_user
+from services import write_behind
+from services.write_behind import WriteBehindBuffer, encode_record, read_journal
+from services.ats_scorer import score_resume
+
+# Bound per module run below: the flusher thread and the test thread each need
+# their own connection, which a shared in-memory StaticPool connection is not
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+
+@pytest.fixture(autouse=True, scope="module")
+def database(tmp_path_factory):
+    path = tmp_path_factory.mktemp("write_behind") / "app.db"
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    TestingSessionLocal.configure(bind=engine)
+    yield
+    engine.dispose()
+
+
+def stored(user_id: int) -> list:
+    db = TestingSessionLocal()
+    try:
+        return [row.original_text for row in
+                db.query(ResumeAnalysis).filter(ResumeAnalysis.user_id == user_id).order_by(ResumeAnalysis.id)]
+    finally:
+        db.close()
+
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert condition()
+
+
+def test_batches_by_size_and_time(tmp_path):
+    committed = []
+    buffer = WriteBehindBuffer(str(tmp_path), TestingSessionLocal, batch_size=3, delay=0.2,
+                               after_commit=lambda session, rows: committed.append(len(rows)))
+    for i in range(4):
+        buffer.submit(user_id=1200, original_text=f"resume {i}", analysis_json={"overall_score": i},
+                      prompt_tokens=10, completion_tokens=5 if i else None)
+    assert buffer.pending_count(1200) + len(stored(1200)) >= 4  # quota never undercounts
+    wait_for(lambda: len(stored(1200)) == 4 and buffer.pending_count(1200) == 0)
+    assert committed == [3, 1] and buffer.pending_count(1200) == 0 and buffer.pending_tokens(1200) == 0
+    assert stored(1200) == [f"resume {i}" for i in range(4)]
+
+    journal = buffer.journal_path
+    assert read_journal(journal) == []  # everything marked committed
+    buffer.close()
+    assert not os.path.exists(journal)
+
+
+def test_crash_replays_journal_once(tmp_path):
+    crashed = WriteBehindBuffer(str(tmp_path), TestingSessionLocal, batch_size=100, delay=3600)
+    for i in range(3):
+        crashed.submit(user_id=1201, original_text=f"resume {i}", analysis_json={})
+    journal = crashed.journal_path
+    rows = read_journal(journal)
+    # The first row made it into the database before the crash, its commit marker did not
+    db = TestingSessionLocal()
+    db.add(write_behind._to_model(rows[0]))
+    db.commit()
+    db.close()
+    with open(journal, "ab") as tail:
+        tail.write(encode_record({"write_id": "torn", "user_id": 1201})[:-5])
+    crashed._journal.close()  # the process dies: its flock goes away
+
+    recovered = WriteBehindBuffer(str(tmp_path), TestingSessionLocal)
+    assert recovered.stats["replayed"] == 2
+    assert stored(1201) == ["resume 0", "resume 1", "resume 2"]
+    assert not os.path.exists(journal)
+    recovered.close()
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    buffer = WriteBehindBuffer(str(tmp_path), TestingSessionLocal, batch_size=100, delay=3600)
+    monkeypatch.setattr(write_behind, "_buffer", buffer)
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = lambda: User(id=1202, email="buffered@example.com")
+    yield TestClient(app), buffer
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(previous)
+    buffer.close()
+
+
+def test_endpoint_counts_pending_writes(client):
+    client, buffer = client
+    text = "Jane Doe\nEXPERIENCE\nBackend engineer. Python, Go."
+    with patch("main.analyze_resume_with_ai", return_value=score_resume(text, "Engineer")), \
+         patch("main.parse_resume", return_value=text):
+        response = client.post("/api/analyze-resume", data={"target_role": "Engineer"},
+                               files={"resume_file": ("resume.pdf", b"%PDF", "application/pdf")})
+    assert response.status_code == 200
+    assert stored(1202) == []
+    assert client.get("/api/users/me").json()["usage_count"] == 1
+
+    with patch.object(buffer, "pending_count", return_value=50):
+        assert client.post("/api/analyze-resume", data={"target_role": "Engineer"},
+                           files={"resume_file": ("resume.pdf", b"%PDF", "application/pdf")}).status_code == 403
+
+    assert buffer.flush() == 1
+    assert stored(1202) == [text]
+    assert client.get("/api/users/me").json()["usage_count"] == 1